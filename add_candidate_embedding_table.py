@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+添加候选人简历向量表 candidate_embedding，为已上传简历的候选人计算向量，并构建职位/候选人 ANN 索引
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db, embeddings
+from app.ann_index import get_index
+from app.models import User, CandidateEmbedding
+from app.utils import get_user_resume_text
+
+
+def add_candidate_embedding_table(force=False):
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始创建 candidate_embedding 表...')
+			CandidateEmbedding.__table__.create(db.engine, checkfirst=True)
+			print('✅ candidate_embedding 表已就绪')
+
+			if not embeddings.available():
+				print('⚠️ 未安装 numpy/sentence-transformers，跳过向量计算')
+				return True
+
+			users = User.query.filter(User.cv_sha256.isnot(None), User.is_hr.isnot(True)).order_by(User.id).all()
+			encoded = 0
+			for i, user in enumerate(users, 1):
+				if embeddings.upsert_candidate_embedding(user.id, get_user_resume_text(user), force=force):
+					encoded += 1
+				if i % 50 == 0 or i == len(users):
+					print(f'   已处理 {i}/{len(users)} 位候选人')
+			print(f'✅ 新计算 {encoded} 个候选人向量，当前共 {CandidateEmbedding.query.count()} 条')
+
+			for kind in ('job', 'candidate'):
+				manager = get_index(kind)
+				manager.sync(force=True)
+				size = len(manager.index) if manager.index is not None else 0
+				backend = manager.index.backend if manager.index is not None else '-'
+				print(f'✅ {kind} 索引: {size} 条（{backend}），已保存到 {manager.path}')
+			return True
+		except Exception as e:
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_candidate_embedding_table(force='--force' in sys.argv)
+	if success:
+		print('\n🎉 候选人向量表创建完成！')
+	else:
+		print('\n💥 候选人向量表创建失败！')
+		sys.exit(1)
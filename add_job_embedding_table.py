@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+添加职位语义向量表 job_embedding，并为已有职位计算向量
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db, embeddings
+from app.models import Job, JobEmbedding
+
+BATCH_SIZE = 64
+
+
+def add_job_embedding_table(force=False):
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始创建 job_embedding 表...')
+			JobEmbedding.__table__.create(db.engine, checkfirst=True)
+			print('✅ job_embedding 表已就绪')
+
+			if not embeddings.available():
+				print('⚠️ 未安装 numpy/sentence-transformers，跳过向量计算')
+				return True
+
+			jobs = Job.query.order_by(Job.id).all()
+			encoded = 0
+			for start in range(0, len(jobs), BATCH_SIZE):
+				encoded += embeddings.upsert_job_embeddings(jobs[start:start + BATCH_SIZE], force=force)
+				print(f'   已处理 {min(start + BATCH_SIZE, len(jobs))}/{len(jobs)} 个职位')
+			print(f'✅ 新计算 {encoded} 个职位向量，当前共 {JobEmbedding.query.count()} 条（模型：{embeddings.model_name()}）')
+			return True
+		except Exception as e:
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_job_embedding_table(force='--force' in sys.argv)
+	if success:
+		print('\n🎉 职位向量表创建完成！')
+	else:
+		print('\n💥 职位向量表创建失败！')
+		sys.exit(1)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+添加职位全文索引 job_fts（SQLite FTS5，CJK 二元切分）及同步触发器，并为已有职位建立索引
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.job_search import ensure_job_fts, is_sqlite, FTS_TABLE
+
+
+def add_job_fts_table(rebuild=False):
+	app = create_app()
+	with app.app_context():
+		try:
+			if not is_sqlite():
+				print(f'⚠️ 当前数据库为 {db.engine.dialect.name}，不支持 FTS5，职位搜索将继续使用 LIKE 匹配')
+				return True
+			print('开始创建 job_fts 全文索引...')
+			ensure_job_fts(rebuild=rebuild)
+			with db.engine.connect() as conn:
+				count = conn.exec_driver_sql(f'SELECT COUNT(*) FROM {FTS_TABLE}_docsize').scalar()
+			print(f'✅ job_fts 已就绪，共索引 {count} 个职位')
+			return True
+		except Exception as e:
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_job_fts_table(rebuild='--rebuild' in sys.argv)
+	if success:
+		print('\n🎉 职位全文索引创建完成！')
+	else:
+		print('\n💥 职位全文索引创建失败！')
+		sys.exit(1)
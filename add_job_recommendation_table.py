@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+添加离线职位推荐表 job_recommendation（数据由 scripts/precompute_recommendations.py 写入）
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.models import JobRecommendation
+
+
+def add_job_recommendation_table():
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始创建 job_recommendation 表...')
+			JobRecommendation.__table__.create(db.engine, checkfirst=True)
+			print('✅ job_recommendation 表已就绪')
+			print('   运行 python scripts/precompute_recommendations.py 生成离线推荐')
+			return True
+		except Exception as e:
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_job_recommendation_table()
+	if success:
+		print('\n🎉 离线推荐表创建完成！')
+	else:
+		print('\n💥 离线推荐表创建失败！')
+		sys.exit(1)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+为 job 表添加结构化薪资字段 salary_min / salary_max / salary_period 及区间索引，并解析已有职位的薪资文本
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect
+
+from app import create_app, db
+from app.models import Job
+from app.salary import parse_salary
+
+BATCH_SIZE = 1000
+COLUMNS = [('salary_min', 'INTEGER'), ('salary_max', 'INTEGER'), ('salary_period', 'VARCHAR(10)')]
+
+
+def add_job_salary_columns(force=False):
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始添加结构化薪资字段...')
+			existing = {column['name'] for column in inspect(db.engine).get_columns('job')}
+			for name, column_type in COLUMNS:
+				if name in existing:
+					print(f'ℹ️ 字段 {name} 已存在')
+				else:
+					db.session.execute(db.text(f'ALTER TABLE job ADD COLUMN {name} {column_type}'))
+					print(f'✅ 成功添加字段 {name}')
+			db.session.commit()
+			for index in Job.__table__.indexes:
+				index.create(db.engine, checkfirst=True)
+			print('✅ 薪资区间索引已就绪')
+
+			# 默认只解析还没有结构化薪资的职位；--force 时全部重新解析（如解析规则有更新）
+			query = db.session.query(Job.id, Job.salary).order_by(Job.id)
+			if not force:
+				query = query.filter(Job.salary_period.is_(None))
+			rows = query.all()
+			parsed = 0
+			for start in range(0, len(rows), BATCH_SIZE):
+				updates = []
+				for job_id, salary in rows[start:start + BATCH_SIZE]:
+					salary_min, salary_max, salary_period = parse_salary(salary)
+					parsed += salary_period is not None
+					updates.append({'job_id': job_id, 'low': salary_min, 'high': salary_max, 'period': salary_period})
+				if updates:
+					db.session.execute(db.text(
+						'UPDATE job SET salary_min = :low, salary_max = :high, salary_period = :period WHERE id = :job_id'
+					), updates)
+				db.session.commit()
+				print(f'   已处理 {min(start + BATCH_SIZE, len(rows))}/{len(rows)} 个职位')
+			print(f'✅ 解析 {len(rows)} 个职位的薪资，其中 {parsed} 个得到薪资区间（其余为面议或无法识别）')
+			return True
+		except Exception as e:
+			db.session.rollback()
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_job_salary_columns(force='--force' in sys.argv)
+	if success:
+		print('\n🎉 结构化薪资字段添加完成！')
+	else:
+		print('\n💥 结构化薪资字段添加失败！')
+		sys.exit(1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+添加职位技能表 job_skill，并为已有职位回填技能关键词
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.job_skills import save_job_skills
+from app.models import Job, JobSkill
+
+BATCH_SIZE = 200
+
+
+def add_job_skill_table(force=False):
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始创建 job_skill 表...')
+			JobSkill.__table__.create(db.engine, checkfirst=True)
+			print('✅ job_skill 表已就绪')
+
+			query = Job.query.order_by(Job.id)
+			if not force:
+				# 默认只回填还没有技能行的职位；--force 时全部重新提取（如技能词典有更新）
+				done = db.session.query(JobSkill.job_id).distinct()
+				query = query.filter(~Job.id.in_(done))
+			job_ids = [job_id for (job_id,) in query.with_entities(Job.id)]
+			for start in range(0, len(job_ids), BATCH_SIZE):
+				for job in Job.query.filter(Job.id.in_(job_ids[start:start + BATCH_SIZE])):
+					save_job_skills(job)
+				db.session.commit()
+				print(f'   已处理 {min(start + BATCH_SIZE, len(job_ids))}/{len(job_ids)} 个职位')
+			print(f'✅ 回填 {len(job_ids)} 个职位，当前共 {JobSkill.query.count()} 条技能记录')
+			return True
+		except Exception as e:
+			db.session.rollback()
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_job_skill_table(force='--force' in sys.argv)
+	if success:
+		print('\n🎉 职位技能表创建完成！')
+	else:
+		print('\n💥 职位技能表创建失败！')
+		sys.exit(1)
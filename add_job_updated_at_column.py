@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+为 job 表添加 updated_at 字段及索引（职位编辑时间，供各 worker 的职位快照发现其它进程中的编辑），并回填已有职位
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect
+
+from app import create_app, db
+from app.models import Job
+
+
+def add_job_updated_at_column():
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始添加职位修改时间字段...')
+			existing = {column['name'] for column in inspect(db.engine).get_columns('job')}
+			if 'updated_at' in existing:
+				print('ℹ️ 字段 updated_at 已存在')
+			else:
+				db.session.execute(db.text('ALTER TABLE job ADD COLUMN updated_at DATETIME'))
+				print('✅ 成功添加字段 updated_at')
+			# 已有职位以发布时间作为最近修改时间
+			result = db.session.execute(db.text(
+				'UPDATE job SET updated_at = COALESCE(date_posted, created_at) WHERE updated_at IS NULL'))
+			db.session.commit()
+			print(f'✅ 回填 {result.rowcount} 个职位的修改时间')
+			for index in Job.__table__.indexes:
+				if 'updated_at' in index.columns:
+					index.create(db.engine, checkfirst=True)
+			print('✅ 修改时间索引已就绪')
+			return True
+		except Exception as e:
+			db.session.rollback()
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_job_updated_at_column()
+	if success:
+		print('\n🎉 职位修改时间字段添加完成！')
+	else:
+		print('\n💥 职位修改时间字段添加失败！')
+		sys.exit(1)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+为常用查询条件补建组合索引（申请、职位、反馈、反馈通知、任务评价、用户），并更新 SQLite 查询规划统计
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect
+
+from app import create_app, db
+from app.models import User, Job, Application, Feedback, FeedbackNotification, TaskEvaluation
+
+MODELS = [Application, Job, Feedback, FeedbackNotification, TaskEvaluation, User]
+
+
+def add_query_indexes():
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始创建查询索引...')
+			inspector = inspect(db.engine)
+			tables = set(inspector.get_table_names())
+			created = 0
+			for model in MODELS:
+				table = model.__table__
+				if table.name not in tables:
+					print(f'ℹ️ 表 {table.name} 不存在，跳过')
+					continue
+				columns = {column['name'] for column in inspector.get_columns(table.name)}
+				existing = {index['name'] for index in inspector.get_indexes(table.name)}
+				for index in sorted(table.indexes, key=lambda index: index.name):
+					missing = [column.name for column in index.columns if column.name not in columns]
+					if missing:
+						# 缺少的字段由对应的迁移脚本添加（如 migrate_add_is_active.py、add_user_type_field.py）
+						print(f'⚠️ 表 {table.name} 缺少字段 {", ".join(missing)}，跳过索引 {index.name}')
+					elif index.name in existing:
+						print(f'ℹ️ 索引 {index.name} 已存在')
+					else:
+						index.create(db.engine)
+						created += 1
+						print(f'✅ 成功创建索引 {index.name}')
+			if db.engine.dialect.name == 'sqlite':
+				# 让查询规划器拿到各索引的选择性统计（如 user_type 只有少数几个取值）
+				with db.engine.begin() as connection:
+					connection.execute(db.text('ANALYZE'))
+				print('✅ 已更新查询规划统计 (ANALYZE)')
+			print(f'✅ 新建 {created} 个索引')
+			return True
+		except Exception as e:
+			db.session.rollback()
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_query_indexes()
+	if success:
+		print('\n🎉 查询索引创建完成！')
+	else:
+		print('\n💥 查询索引创建失败！')
+		sys.exit(1)
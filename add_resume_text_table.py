@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+添加简历文本缓存表 resume_text，并为已有简历预先提取文本
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+from app.models import User, ResumeText
+from app.utils import extract_text_from_resume
+
+
+def add_resume_text_table():
+	app = create_app()
+	with app.app_context():
+		try:
+			print('开始创建 resume_text 表...')
+			ResumeText.__table__.create(db.engine, checkfirst=True)
+			from sqlalchemy import inspect
+			inspector = inspect(db.engine)
+			if 'resume_text' not in inspector.get_table_names():
+				print('❌ 表创建失败')
+				return False
+			print('✅ resume_text 表创建成功')
+
+			# 预热：为已上传的简历提取一次文本
+			users = User.query.filter(User.cv_sha256.isnot(None)).all()
+			for user in users:
+				extract_text_from_resume(user.cv_data, user.cv_file or '')
+			print(f'✅ 已处理 {len(users)} 份已有简历，当前缓存 {ResumeText.query.count()} 条')
+			return True
+		except Exception as e:
+			print(f'❌ 迁移失败: {e}')
+			return False
+
+
+if __name__ == '__main__':
+	success = add_resume_text_table()
+	if success:
+		print('\n🎉 简历文本缓存表创建完成！')
+	else:
+		print('\n💥 简历文本缓存表创建失败！')
+		sys.exit(1)
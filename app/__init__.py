@@ -157,6 +157,25 @@ def create_app():
             from flask import Response
             return Response(status=204)
 
+        # LLM 提供方健康状态（熔断状态、滚动延迟、响应缓存命中率），仅 HR / 高管可查看
+        @app.route('/health/llm')
+        def llm_health_status():
+            from flask import g, jsonify
+            from . import llm_health, llm_cache
+            user = getattr(g, 'user', None)
+            if user is None:
+                return jsonify({'success': False, 'message': '请先登录'}), 401
+            if not (user.is_hr or user.user_type == 'executive'):
+                return jsonify({'success': False, 'message': '无权访问'}), 403
+            return jsonify({'providers': llm_health.snapshot(), 'cache': llm_cache.stats()})
+
+        # 职位推荐缓存命中率与失效次数
+        @app.route('/health/recommendations')
+        def recommendation_cache_status():
+            from flask import jsonify
+            from smartrecruit_system.candidate_module import recommendation_cache
+            return jsonify({'cache': recommendation_cache.stats()})
+
         # 添加全局模板助手
         @app.context_processor
         def inject_user():
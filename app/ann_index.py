@@ -0,0 +1,458 @@
+"""
+近似最近邻（ANN）向量索引：职位 <-> 候选人语义检索。
+
+后端（均为内积检索，向量需已 L2 归一化，内积即余弦相似度）：
+  - FlatIndex: 精确暴力检索（小规模时使用，也是基准对照）
+  - IVFFlatIndex: NumPy 实现的倒排文件索引，球面 k-means 粗聚类，查询时只扫描 nprobe 个簇
+  - FaissIndex: 安装 faiss 时可选，IndexIDMap2(IndexHNSWFlat)
+
+所有后端支持增量 add/remove、save/load；VectorIndexManager 负责与 job_embedding /
+candidate_embedding 表同步（按 updated_at 增量拉取、按 ID 集合删除），并把索引持久化到磁盘，
+新 worker 启动时加载文件后只需增量同步，无需重新训练。
+
+Env:
+  - ANN_BACKEND: auto / flat / ivf / faiss，默认 auto（有 faiss 用 faiss；向量数达到 ANN_IVF_MIN_SIZE 用 ivf；否则 flat）
+  - ANN_IVF_MIN_SIZE: auto 模式下启用 IVF 的最小向量数，默认 5000
+  - ANN_NPROBE: IVF 查询扫描的簇数，默认 16
+  - ANN_INDEX_DIR: 索引文件目录，默认 <项目根目录>/instance/ann
+  - ANN_SYNC_INTERVAL: 检查数据库变更的最短间隔（秒），默认 30
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None  # type: ignore
+try:
+    import faiss  # type: ignore
+except Exception:
+    faiss = None  # type: ignore
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _top_k(ids, scores, k: int):
+    if len(ids) == 0 or k <= 0:
+        return []
+    k = min(k, len(ids))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [(int(ids[i]), float(scores[i])) for i in top]
+
+
+class FlatIndex:
+    """精确内积检索。"""
+    backend = 'flat'
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        self.remove(ids)
+        self.ids = np.concatenate([self.ids, ids])
+        self.vectors = np.ascontiguousarray(np.vstack([self.vectors, np.asarray(vectors, dtype=np.float32)]))
+
+    def remove(self, ids):
+        if len(self.ids) == 0:
+            return
+        keep = ~np.isin(self.ids, np.asarray(ids, dtype=np.int64))
+        if not keep.all():
+            self.ids = self.ids[keep]
+            self.vectors = np.ascontiguousarray(self.vectors[keep])
+
+    def search(self, query, k: int):
+        return _top_k(self.ids, self.vectors @ np.asarray(query, dtype=np.float32), k)
+
+    def state(self) -> dict:
+        return {'ids': self.ids, 'vectors': self.vectors}
+
+    @classmethod
+    def from_state(cls, dim: int, arrays) -> 'FlatIndex':
+        index = cls(dim)
+        index.ids = arrays['ids'].astype(np.int64)
+        index.vectors = np.ascontiguousarray(arrays['vectors'], dtype=np.float32)
+        return index
+
+
+class IVFFlatIndex:
+    """
+    倒排文件索引：球面 k-means 得到 nlist 个簇心，每个向量归入最近簇；
+    查询时先与簇心打分，只在得分最高的 nprobe 个簇内做精确检索。
+    """
+    backend = 'ivf'
+
+    def __init__(self, dim: int, nlist: int = None, nprobe: int = None):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe or _env_int('ANN_NPROBE', 16)
+        self.centroids = None
+        self.trained_size = 0
+        self._list_ids = []
+        self._list_vectors = []
+        self._where = {}  # id -> 簇编号
+
+    def __len__(self):
+        return len(self._where)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, vectors, iterations: int = 15, seed: int = 0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n = len(vectors)
+        nlist = self.nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n) if n else 1
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, size=min(n, nlist * 64), replace=False)] if n else vectors
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = centroids / norms
+        self.nlist = nlist
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.trained_size = n
+        self._list_ids = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._list_vectors = [np.zeros((0, self.dim), dtype=np.float32) for _ in range(nlist)]
+        self._where = {}
+
+    def add(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not self.is_trained:
+            self.train(vectors)
+        self.remove(ids)
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        for c in np.unique(assign):
+            mask = assign == c
+            self._list_ids[c] = np.concatenate([self._list_ids[c], ids[mask]])
+            self._list_vectors[c] = np.vstack([self._list_vectors[c], vectors[mask]])
+        for job_id, c in zip(ids.tolist(), assign.tolist()):
+            self._where[job_id] = c
+
+    def remove(self, ids):
+        by_list = {}
+        for item in np.asarray(ids, dtype=np.int64).tolist():
+            c = self._where.pop(item, None)
+            if c is not None:
+                by_list.setdefault(c, []).append(item)
+        for c, items in by_list.items():
+            keep = ~np.isin(self._list_ids[c], items)
+            self._list_ids[c] = self._list_ids[c][keep]
+            self._list_vectors[c] = self._list_vectors[c][keep]
+
+    def search(self, query, k: int, nprobe: int = None):
+        if not self.is_trained or not self._where:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        ids = np.concatenate([self._list_ids[c] for c in probe])
+        if len(ids) == 0:
+            return []
+        vectors = np.vstack([self._list_vectors[c] for c in probe])
+        return _top_k(ids, vectors @ query, k)
+
+    def state(self) -> dict:
+        ids = np.concatenate(self._list_ids) if self._list_ids else np.zeros(0, dtype=np.int64)
+        lists = np.concatenate([np.full(len(l), c, dtype=np.int32) for c, l in enumerate(self._list_ids)]) \
+            if self._list_ids else np.zeros(0, dtype=np.int32)
+        vectors = np.vstack(self._list_vectors) if self._list_vectors else np.zeros((0, self.dim), dtype=np.float32)
+        return {'ids': ids, 'vectors': vectors, 'lists': lists, 'centroids': self.centroids,
+                'trained_size': np.array([self.trained_size]), 'nprobe': np.array([self.nprobe])}
+
+    @classmethod
+    def from_state(cls, dim: int, arrays) -> 'IVFFlatIndex':
+        centroids = arrays['centroids']
+        index = cls(dim, nlist=len(centroids), nprobe=_env_int('ANN_NPROBE', int(arrays['nprobe'][0])))
+        index.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        index.trained_size = int(arrays['trained_size'][0])
+        index._list_ids = []
+        index._list_vectors = []
+        for c in range(index.nlist):
+            mask = arrays['lists'] == c
+            index._list_ids.append(arrays['ids'][mask].astype(np.int64))
+            index._list_vectors.append(np.asarray(arrays['vectors'][mask], dtype=np.float32))
+        index._where = {int(i): int(c) for i, c in zip(arrays['ids'], arrays['lists'])}
+        return index
+
+
+class FaissIndex:
+    """faiss 后端：IndexIDMap2 包装 HNSW（内积），支持按 ID 删除。"""
+    backend = 'faiss'
+
+    def __init__(self, dim: int, index=None):
+        self.dim = dim
+        if index is None:
+            hnsw = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+            index = faiss.IndexIDMap2(hnsw)
+        self.index = index
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def add(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        self.remove(ids)
+        self.index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids)
+
+    def remove(self, ids):
+        if self.index.ntotal:
+            self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+
+    def search(self, query, k: int):
+        if self.index.ntotal == 0 or k <= 0:
+            return []
+        scores, ids = self.index.search(np.asarray(query, dtype=np.float32).reshape(1, -1), min(k, self.index.ntotal))
+        return [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i != -1]
+
+
+def create_index(dim: int, size_hint: int = 0, backend: str = None):
+    backend = backend or os.getenv('ANN_BACKEND', 'auto')
+    if backend == 'faiss' or (backend == 'auto' and faiss is not None):
+        if faiss is None:
+            logging.warning("ANN_BACKEND=faiss but faiss is not installed, falling back to numpy")
+        else:
+            return FaissIndex(dim)
+    if backend == 'ivf' or (backend == 'auto' and size_hint >= _env_int('ANN_IVF_MIN_SIZE', 5000)):
+        return IVFFlatIndex(dim)
+    return FlatIndex(dim)
+
+
+def _replace_atomically(path: str, write):
+    """write(tmp_path) 写入同目录下的唯一临时文件后原子替换 path；多个进程同时保存互不覆盖临时文件。"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def save_index(index, path: str, meta: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    meta = dict(meta, backend=index.backend, dim=index.dim)
+    if index.backend == 'faiss':
+        _replace_atomically(f'{path}.faiss', lambda tmp: faiss.write_index(index.index, tmp))
+        arrays = {}
+    else:
+        arrays = index.state()
+
+    def write_npz(tmp):
+        with open(tmp, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+    _replace_atomically(path, write_npz)
+
+
+def load_index(path: str):
+    """读取索引文件，返回 (index, meta)；文件不存在或损坏时返回 (None, None)。"""
+    if not os.path.exists(path):
+        return None, None
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays['meta']))
+            dim = meta['dim']
+            if meta['backend'] == 'faiss':
+                if faiss is None:
+                    return None, None
+                index = FaissIndex(dim, faiss.read_index(f'{path}.faiss'))
+            elif meta['backend'] == 'ivf':
+                index = IVFFlatIndex.from_state(dim, arrays)
+            else:
+                index = FlatIndex.from_state(dim, arrays)
+        return index, meta
+    except Exception as e:
+        logging.warning(f"Failed to load ANN index {path}: {e}")
+        return None, None
+
+
+# --- 与数据库同步的索引管理 ---
+
+INDEX_TABLES = {
+    'job': ('job_embedding', 'job_id'),
+    'candidate': ('candidate_embedding', 'user_id'),
+}
+
+
+def _decode(rows):
+    """(id, vector 字节, updated_at, dim) 行 -> float32 矩阵；int8 存储的向量在此反量化。"""
+    from .embeddings import from_bytes
+    return np.vstack([from_bytes(r[1], r[3]) for r in rows])
+
+
+class VectorIndexManager:
+    """
+    某一类实体（job / candidate）的进程内 ANN 索引。
+
+    sync() 按 updated_at 增量拉取新增/修改的向量，并按 ID 集合移除已删除的实体；
+    有变化时写回索引文件。IVF 索引规模比训练时增长 4 倍以上时重新训练。
+    """
+
+    def __init__(self, kind: str, index_dir: str = None, sync_interval: float = None):
+        self.kind = kind
+        self.table, self.key = INDEX_TABLES[kind]
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.index_dir = index_dir or os.getenv('ANN_INDEX_DIR') or os.path.join(base_dir, 'instance', 'ann')
+        self.sync_interval = float(os.getenv('ANN_SYNC_INTERVAL', '30')) if sync_interval is None else sync_interval
+        self.index = None
+        self.model = None
+        self.synced_until = ''
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.RLock()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.index_dir, f'{self.kind}.npz')
+
+    def mark_stale(self):
+        self._stale = True
+
+    def _fetch(self, sql: str, params: dict):
+        from . import db
+        return db.session.execute(db.text(sql), params).fetchall()
+
+    def _rebuild(self, model: str):
+        rows = self._fetch(f'SELECT {self.key}, vector, updated_at, dim FROM {self.table} WHERE model = :model',
+                           {'model': model})
+        self.model = model
+        self.synced_until = max((str(r[2]) for r in rows), default='')
+        if not rows:
+            self.index = None
+            return
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        vectors = _decode(rows)
+        self.index = create_index(vectors.shape[1], size_hint=len(rows))
+        self.index.add(ids, vectors)
+
+    def sync(self, force: bool = False) -> bool:
+        """与数据库同步，返回索引是否有变化。"""
+        from .embeddings import model_name
+        now = time.monotonic()
+        if not force and not self._stale and now - self._checked_at < self.sync_interval:
+            return False
+        with self._lock:
+            model = model_name()
+            changed = False
+            if self.index is None and self.model is None:
+                self.index, meta = load_index(self.path)
+                if self.index is not None and meta.get('model') == model:
+                    self.model = model
+                    self.synced_until = meta.get('synced_until', '')
+                else:
+                    self.index = None
+            if self.model != model:
+                self._rebuild(model)
+                changed = True
+            else:
+                rows = self._fetch(
+                    f'SELECT {self.key}, vector, updated_at, dim FROM {self.table}'
+                    ' WHERE model = :model AND updated_at > :since',
+                    {'model': model, 'since': self.synced_until},
+                )
+                if rows:
+                    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+                    vectors = _decode(rows)
+                    if self.index is None:
+                        self.index = create_index(vectors.shape[1], size_hint=len(rows))
+                    self.index.add(ids, vectors)
+                    self.synced_until = max([self.synced_until] + [str(r[2]) for r in rows])
+                    changed = True
+                if self.index is not None:
+                    live = {r[0] for r in self._fetch(f'SELECT {self.key} FROM {self.table} WHERE model = :model',
+                                                      {'model': model})}
+                    if len(live) != len(self.index):
+                        gone = self._indexed_ids() - live
+                        if gone:
+                            self.index.remove(list(gone))
+                            changed = True
+                if isinstance(self.index, IVFFlatIndex) and len(self.index) > 4 * max(1, self.index.trained_size):
+                    self._rebuild(model)
+                    changed = True
+            if changed and self.index is not None:
+                try:
+                    save_index(self.index, self.path, {'model': model, 'synced_until': self.synced_until,
+                                                       'saved_at': datetime.utcnow().isoformat()})
+                except Exception as e:
+                    logging.warning(f"Failed to persist ANN index {self.kind}: {e}")
+            self._stale = False
+            self._checked_at = now
+            return changed
+
+    def _indexed_ids(self) -> set:
+        if isinstance(self.index, IVFFlatIndex):
+            return set(self.index._where)
+        if isinstance(self.index, FlatIndex):
+            return set(self.index.ids.tolist())
+        if isinstance(self.index, FaissIndex):
+            return set(faiss.vector_to_array(self.index.index.id_map).tolist())
+        return set()
+
+    def add(self, ids, vectors):
+        """本进程写入向量后立即更新索引（其他进程在下次 sync 时拉取）。"""
+        with self._lock:
+            if self.index is None:
+                self.mark_stale()
+                return
+            self.index.add(ids, vectors)
+
+    def remove(self, ids):
+        with self._lock:
+            if self.index is not None:
+                self.index.remove(ids)
+
+    def search(self, query, k: int):
+        """返回与 query 最相似的 k 个 (id, score)。"""
+        self.sync()
+        with self._lock:
+            if self.index is None:
+                return []
+            return self.index.search(query, k)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_index(kind: str) -> VectorIndexManager:
+    manager = _managers.get(kind)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(kind)
+            if manager is None:
+                manager = _managers[kind] = VectorIndexManager(kind)
+    return manager
+
+
+def reset_indexes():
+    with _managers_lock:
+        _managers.clear()
@@ -0,0 +1,312 @@
+"""
+本机向量编码服务：独立进程启动时加载并预热 SentenceTransformer，Web/任务 worker 通过本地 socket 调用。
+
+每个 Web worker 各自懒加载模型时，首个请求要卡住数秒，且每个进程都常驻一份模型内存；
+改为每台主机一个编码服务进程后，模型只加载一次。服务端把并发到达的 encode 请求合并为微批
+（达到 EMBEDDING_BATCH_SIZE 条文本或首条请求等待超过 EMBEDDING_BATCH_WAIT_MS 即执行一次编码）。
+
+协议：每条消息为 4 字节大端长度 + JSON 头，响应头之后紧跟 n * dim 个 float32（小端）。
+  请求：{"op": "encode", "model": 模型名, "texts": [...]} / {"op": "ping"}
+  响应：{"ok": true, "n": n, "dim": dim} + 向量字节；出错时 {"ok": false, "error": "..."}
+
+Env:
+  - EMBEDDING_SERVICE: 服务地址，unix:/path/to.sock 或 host:port；未设置时在当前进程内加载模型（原有行为）
+  - EMBEDDING_SERVICE_TIMEOUT: 客户端连接/读取超时（秒），默认 10
+  - EMBEDDING_SERVICE_FALLBACK: 服务不可用时是否回退到进程内模型，默认 0（返回 None，由调用方降级）
+  - EMBEDDING_BATCH_SIZE: 服务端单个微批的最大文本数，默认 32
+  - EMBEDDING_BATCH_WAIT_MS: 服务端凑批的最长等待（毫秒），默认 5
+"""
+import os
+import json
+import time
+import queue
+import socket
+import struct
+import logging
+import threading
+import socketserver
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None  # type: ignore
+
+_HEADER = struct.Struct('>I')
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+class EmbeddingServiceError(Exception):
+    """编码服务不可用或返回错误。"""
+
+
+def service_address() -> str:
+    return os.getenv('EMBEDDING_SERVICE', '').strip()
+
+
+def enabled() -> bool:
+    return bool(service_address())
+
+
+def parse_address(address: str):
+    """返回 (socket family, 地址)：unix:/path -> AF_UNIX，host:port -> AF_INET。"""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+# --- 消息收发 ---
+
+def _recv_exact(sock, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError('connection closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(sock, header: dict, payload: bytes = b''):
+    data = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(data)) + data + payload)
+
+
+def recv_header(sock) -> dict:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_MESSAGE_BYTES:
+        raise ConnectionError(f'message too large: {size}')
+    return json.loads(_recv_exact(sock, size).decode('utf-8'))
+
+
+# --- 服务端 ---
+
+class MicroBatcher:
+    """
+    把多个线程提交的 encode 请求合并成微批，在单个后台线程里调用模型。
+
+    submit() 阻塞直到本请求的向量就绪，返回 (n, dim) float32 矩阵。
+    """
+
+    def __init__(self, model, max_batch: int = 32, max_wait: float = 0.005):
+        self.model = model
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        item = {'texts': list(texts), 'done': threading.Event(), 'result': None, 'error': None}
+        self._queue.put(item)
+        item['done'].wait()
+        if item['error'] is not None:
+            raise item['error']
+        return item['result']
+
+    def close(self):
+        self._stop.set()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        size = len(first['texts'])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._stop.set()
+                break
+            batch.append(item)
+            size += len(item['texts'])
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            texts = [text for item in batch for text in item['texts']]
+            try:
+                vectors = np.asarray(self.model.encode(texts, batch_size=self.max_batch, convert_to_numpy=True,
+                                                       show_progress_bar=False), dtype=np.float32)
+                self.batches += 1
+                start = 0
+                for item in batch:
+                    end = start + len(item['texts'])
+                    item['result'] = vectors[start:end]
+                    start = end
+            except Exception as e:
+                for item in batch:
+                    item['error'] = e
+            for item in batch:
+                item['done'].set()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                request = recv_header(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                if request.get('op') == 'ping':
+                    send_message(self.request, {'ok': True, 'model': server.model_name, 'dim': server.dim})
+                    continue
+                if request.get('model') not in (None, server.model_name):
+                    raise EmbeddingServiceError(f"service model is {server.model_name}, got {request.get('model')}")
+                texts = request.get('texts') or []
+                vectors = server.batcher.submit(texts) if texts else np.zeros((0, server.dim), dtype=np.float32)
+                send_message(self.request, {'ok': True, 'n': int(vectors.shape[0]), 'dim': int(vectors.shape[1])},
+                             np.ascontiguousarray(vectors, dtype='<f4').tobytes())
+            except Exception as e:
+                logging.warning(f"Embedding request failed: {e}")
+                try:
+                    send_message(self.request, {'ok': False, 'error': str(e)})
+                except OSError:
+                    return
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # 默认 backlog 为 5，多个 worker 同时建连时 AF_UNIX 会直接返回 EAGAIN
+    request_queue_size = 128
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+def create_server(model, model_name: str, address: str = None, max_batch: int = None, max_wait_ms: float = None,
+                  warmup: bool = True):
+    """
+    创建（尚未开始监听循环的）编码服务；调用方执行 serve_forever()，结束时 close_server()。
+
+    warmup=True 时先编码一次预热文本，首个真实请求不再承担初始化开销。
+    """
+    address = address or service_address()
+    if not address:
+        raise EmbeddingServiceError('EMBEDDING_SERVICE is not set')
+    max_batch = int(os.getenv('EMBEDDING_BATCH_SIZE', '32')) if max_batch is None else max_batch
+    max_wait_ms = float(os.getenv('EMBEDDING_BATCH_WAIT_MS', '5')) if max_wait_ms is None else max_wait_ms
+
+    started = time.perf_counter()
+    probe = np.asarray(model.encode(['warm up'] if warmup else ['x'], convert_to_numpy=True,
+                                    show_progress_bar=False), dtype=np.float32)
+    logging.info(f"Embedding model {model_name} ready (dim={probe.shape[1]}) in {time.perf_counter() - started:.2f}s")
+
+    family, bind = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(bind):
+            os.unlink(bind)
+        os.makedirs(os.path.dirname(os.path.abspath(bind)), exist_ok=True)
+        server = _UnixServer(bind, _Handler)
+    else:
+        server = _TCPServer(bind, _Handler)
+    server.model_name = model_name
+    server.dim = int(probe.shape[1])
+    server.batcher = MicroBatcher(model, max_batch=max_batch, max_wait=max_wait_ms / 1000.0)
+    server.unix_path = bind if family == socket.AF_UNIX else None
+    return server
+
+
+def close_server(server):
+    server.shutdown()
+    server.server_close()
+    server.batcher.close()
+    if server.unix_path and os.path.exists(server.unix_path):
+        os.unlink(server.unix_path)
+
+
+# --- 客户端 ---
+
+class EmbeddingClient:
+    """编码服务客户端，每个线程复用一条连接；连接断开时重连重试一次。"""
+
+    def __init__(self, address: str, timeout: float = None):
+        self.address = address
+        self.timeout = float(os.getenv('EMBEDDING_SERVICE_TIMEOUT', '10')) if timeout is None else timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        family, target = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(target)
+        self._local.sock = sock
+        return sock
+
+    def close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            self._local.sock = None
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _call(self, header: dict):
+        for attempt in (1, 2):
+            sock = getattr(self._local, 'sock', None)
+            try:
+                if sock is None:
+                    sock = self._connect()
+                send_message(sock, header)
+                response = recv_header(sock)
+                payload = b''
+                if response.get('ok') and response.get('n') is not None:
+                    payload = _recv_exact(sock, response['n'] * response['dim'] * 4)
+                break
+            except (ConnectionError, OSError) as e:
+                self.close()
+                if attempt == 2:
+                    raise EmbeddingServiceError(f'embedding service {self.address} unavailable: {e}') from e
+        if not response.get('ok'):
+            raise EmbeddingServiceError(response.get('error') or 'embedding service error')
+        return response, payload
+
+    def ping(self) -> dict:
+        return self._call({'op': 'ping'})[0]
+
+    def encode(self, texts, model: str = None):
+        """返回 (n, dim) float32 矩阵（未归一化，与 SentenceTransformer.encode 一致）。"""
+        response, payload = self._call({'op': 'encode', 'model': model, 'texts': list(texts)})
+        return np.frombuffer(payload, dtype='<f4').reshape(response['n'], response['dim'])
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> EmbeddingClient:
+    global _client
+    address = service_address()
+    if _client is None or _client.address != address:
+        with _client_lock:
+            if _client is None or _client.address != address:
+                _client = EmbeddingClient(address)
+    return _client
+
+
+def reset_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
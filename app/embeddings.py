@@ -0,0 +1,486 @@
+"""
+职位/候选人语义向量存储与向量化打分。
+
+职位发布/编辑时（经后台任务队列）把职位文本编码为 float32 向量并存入 job_embedding 表；
+每个 worker 进程把所有向量加载为一个连续的 NumPy 矩阵（已 L2 归一化），
+一份简历向量与全部职位的余弦相似度只需一次矩阵-向量乘法。
+简历处理任务同时把简历文本编码存入 candidate_embedding 表，供 ann_index 做双向 top-k 检索。
+
+Env:
+  - EMBEDDING_MODEL: SentenceTransformer 模型名，默认 multi-qa-mpnet-base-dot-v1
+  - EMBEDDING_REFRESH_INTERVAL: 进程内矩阵检查数据库是否有更新的最短间隔（秒），默认 30
+  - EMBEDDING_QUERY_CACHE_SIZE: 进程内缓存的简历/查询向量条数，默认 256
+  - EMBEDDING_SERVICE: 设置后通过本机编码服务编码（见 embedding_service.py），不在本进程加载模型
+  - EMBEDDING_STORAGE: 向量存储格式 float32 / int8，默认 float32。int8 为每个向量一个 float32 缩放系数
+    + dim 个 int8（768 维约 0.77 KB，float32 为 3 KB），进程内矩阵同样以 int8 常驻并直接在量化值上打分；
+    读取时按字节长度自动识别两种格式，切换后无需重新编码，旧行在重新计算时转换
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None  # type: ignore
+
+from . import task_queue, embedding_service
+
+DEFAULT_MODEL = 'multi-qa-mpnet-base-dot-v1'
+EMBED_JOB_TASK = 'job_embedding'
+
+
+def model_name() -> str:
+    return os.getenv('EMBEDDING_MODEL', DEFAULT_MODEL)
+
+
+def available() -> bool:
+    """NumPy 与编码模型（或编码服务）都可用时才启用语义打分。"""
+    if np is None:
+        return False
+    if embedding_service.enabled():
+        try:
+            embedding_service.get_client().ping()
+            return True
+        except embedding_service.EmbeddingServiceError as e:
+            logging.warning(f"Embedding service unavailable: {e}")
+            if not _service_fallback():
+                return False
+    from .utils import get_sentence_transformer
+    return get_sentence_transformer() is not None
+
+
+def _service_fallback() -> bool:
+    return os.getenv('EMBEDDING_SERVICE_FALLBACK', '0') in ('1', 'true', 'True', 'yes')
+
+
+def job_text(job) -> str:
+    """参与编码的职位文本：标题、描述、任职要求与技能要求。"""
+    parts = [getattr(job, name, None) for name in ('title', 'description', 'requirements', 'skills_required')]
+    return '\n'.join(p.strip() for p in parts if p and p.strip())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def encode(texts):
+    """
+    把文本列表编码为 (n, dim) 的 float32 矩阵，每行已 L2 归一化；模型不可用时返回 None。
+    """
+    if np is None:
+        return None
+    texts = list(texts)
+    if embedding_service.enabled():
+        try:
+            return normalize(embedding_service.get_client().encode(texts, model=model_name()))
+        except embedding_service.EmbeddingServiceError as e:
+            logging.warning(f"Embedding service encode failed: {e}")
+            if not _service_fallback():
+                return None
+    from .utils import get_sentence_transformer
+    st_model = get_sentence_transformer()
+    if st_model is None:
+        return None
+    vectors = st_model.encode(texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False)
+    return normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def normalize(matrix):
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def storage_format() -> str:
+    return 'int8' if os.getenv('EMBEDDING_STORAGE', 'float32').lower() == 'int8' else 'float32'
+
+
+def quantize(matrix):
+    """
+    逐行对称 int8 量化：scale = max|x| / 127，codes = round(x / scale)。
+
+    Returns:
+        tuple: (codes (n, dim) int8, scales (n,) float32)
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize(codes, scales):
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def to_bytes(vector, fmt: str = None) -> bytes:
+    """序列化单个向量：float32 为 dim*4 字节；int8 为 4 字节缩放系数 + dim 字节。"""
+    if (fmt or storage_format()) == 'int8':
+        codes, scales = quantize(vector)
+        return scales.astype('<f4').tobytes() + codes.tobytes()
+    return np.asarray(vector, dtype='<f4').tobytes()
+
+
+def from_bytes(data: bytes, dim: int):
+    """反序列化为 float32 向量，按长度识别 float32 / int8 格式。"""
+    if len(data) == dim + 4:
+        scale = np.frombuffer(data, dtype='<f4', count=1)[0]
+        return np.frombuffer(data, dtype=np.int8, offset=4, count=dim).astype(np.float32) * scale
+    return np.frombuffer(data, dtype='<f4', count=dim)
+
+
+class QuantizedMatrix:
+    """
+    int8 量化的只读向量矩阵，支持 `matrix @ query` 与按行取（反量化后的）向量。
+
+    内积按块把 int8 转为 float32 计算后再乘以行缩放系数，临时内存只占一个块。
+    """
+    block_rows = 8192
+
+    def __init__(self, codes, scales):
+        self.codes = np.ascontiguousarray(codes, dtype=np.int8)
+        self.scales = np.ascontiguousarray(scales, dtype=np.float32)
+
+    @classmethod
+    def from_float(cls, matrix) -> 'QuantizedMatrix':
+        return cls(*quantize(matrix))
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.codes[index].astype(np.float32) * self.scales[index]
+        return dequantize(self.codes[index], self.scales[index])
+
+    def __matmul__(self, query):
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty(self.codes.shape[0], dtype=np.float32)
+        for start in range(0, self.codes.shape[0], self.block_rows):
+            block = self.codes[start:start + self.block_rows]
+            out[start:start + len(block)] = block.astype(np.float32) @ query
+        return out * self.scales
+
+
+_query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+
+def encode_query(text: str):
+    """编码单条简历/查询文本（归一化 float32 向量），按文本哈希做进程内 LRU 缓存。"""
+    key = (model_name(), text_hash(text))
+    with _query_cache_lock:
+        vector = _query_cache.get(key)
+        if vector is not None:
+            _query_cache.move_to_end(key)
+            return vector
+    encoded = encode([text])
+    if encoded is None:
+        return None
+    vector = encoded[0]
+    with _query_cache_lock:
+        _query_cache[key] = vector
+        limit = max(1, int(os.getenv('EMBEDDING_QUERY_CACHE_SIZE', '256')))
+        while len(_query_cache) > limit:
+            _query_cache.popitem(last=False)
+    return vector
+
+
+# --- 存储 ---
+
+def upsert_job_embeddings(jobs, force: bool = False) -> int:
+    """
+    为职位计算并保存向量；文本与模型未变化的职位跳过（force=True 时全部重算）。
+
+    Returns:
+        int: 实际（重新）编码的职位数；模型不可用时为 0。
+    """
+    from . import db
+    from .models import JobEmbedding
+    current_model = model_name()
+    pending = []
+    for job in jobs:
+        text = job_text(job)
+        digest = text_hash(text)
+        existing = JobEmbedding.query.get(job.id)
+        if not force and existing is not None and existing.text_hash == digest and existing.model == current_model:
+            continue
+        pending.append((job.id, text, digest, existing))
+    if not pending:
+        return 0
+    vectors = encode([text for _, text, _, _ in pending])
+    if vectors is None:
+        return 0
+    now = datetime.utcnow()
+    for (job_id, _, digest, existing), vector in zip(pending, vectors):
+        row = existing or JobEmbedding(job_id=job_id)
+        row.model = current_model
+        row.dim = int(vector.shape[0])
+        row.vector = to_bytes(vector)
+        row.text_hash = digest
+        row.updated_at = now
+        db.session.add(row)
+    db.session.commit()
+    get_matrix().mark_stale()
+    _index_add('job', [job_id for job_id, _, _, _ in pending], vectors)
+    return len(pending)
+
+
+def upsert_candidate_embedding(user_id: int, resume_text: str, force: bool = False) -> bool:
+    """
+    为候选人简历文本计算并保存向量；文本为空时删除已有向量。
+
+    Returns:
+        bool: 是否（重新）编码；文本与模型未变化或模型不可用时为 False。
+    """
+    from . import db
+    from .models import CandidateEmbedding
+    current_model = model_name()
+    existing = CandidateEmbedding.query.get(user_id)
+    if not (resume_text or '').strip():
+        if existing is not None:
+            db.session.delete(existing)
+            db.session.commit()
+            _index_remove('candidate', [user_id])
+        return False
+    digest = text_hash(resume_text)
+    if not force and existing is not None and existing.text_hash == digest and existing.model == current_model:
+        return False
+    vectors = encode([resume_text])
+    if vectors is None:
+        return False
+    row = existing or CandidateEmbedding(user_id=user_id)
+    row.model = current_model
+    row.dim = int(vectors.shape[1])
+    row.vector = to_bytes(vectors[0])
+    row.text_hash = digest
+    row.updated_at = datetime.utcnow()
+    db.session.add(row)
+    db.session.commit()
+    _index_add('candidate', [user_id], vectors)
+    return True
+
+
+def candidate_vector(user_id: int):
+    """读取候选人向量；未编码或模型不一致时返回 None。"""
+    if np is None:
+        return None
+    from .models import CandidateEmbedding
+    row = CandidateEmbedding.query.get(user_id)
+    if row is None or row.model != model_name():
+        return None
+    return from_bytes(row.vector, row.dim)
+
+
+def _index_add(kind: str, ids, vectors):
+    """本进程写入向量后同步更新 ANN 索引；索引异常不影响向量入库。"""
+    try:
+        from .ann_index import get_index
+        get_index(kind).add(ids, vectors)
+    except Exception as e:
+        logging.warning(f"Failed to update {kind} ANN index: {e}")
+
+
+def _index_remove(kind: str, ids):
+    try:
+        from .ann_index import get_index
+        get_index(kind).remove(ids)
+    except Exception as e:
+        logging.warning(f"Failed to update {kind} ANN index: {e}")
+
+
+def delete_job_embedding(job_id: int):
+    """删除职位向量（职位删除时调用；调用方负责提交事务）。表不存在等错误只记录日志。"""
+    from . import db
+    from .models import JobEmbedding
+    try:
+        with db.session.begin_nested():
+            JobEmbedding.query.filter_by(job_id=job_id).delete(synchronize_session=False)
+    except Exception as e:
+        logging.warning(f"Failed to delete embedding for job {job_id}: {e}")
+    get_matrix().mark_stale()
+    _index_remove('job', [job_id])
+
+
+def schedule_job_embedding(job_id: int):
+    """职位发布/编辑后排队计算向量，失败只记录日志，不影响发布流程。"""
+    try:
+        task_queue.enqueue(EMBED_JOB_TASK, {'job_id': job_id})
+    except Exception as e:
+        logging.warning(f"Failed to enqueue embedding for job {job_id}: {e}")
+
+
+@task_queue.register(EMBED_JOB_TASK)
+def _embed_job_task(payload: dict) -> dict:
+    from .models import Job
+    job = Job.query.get(payload['job_id'])
+    if job is None:
+        return {'skipped': True}
+    return {'encoded': upsert_job_embeddings([job])}
+
+
+# --- 进程内矩阵 ---
+
+class JobEmbeddingMatrix:
+    """
+    进程内的职位向量矩阵：ids 为 (n,) int64，matrix 为 (n, dim) 连续 float32（已归一化）；
+    EMBEDDING_STORAGE=int8 时 matrix 为 QuantizedMatrix，常驻内存约为 float32 的 1/4。
+
+    每隔 refresh_interval 秒检查一次数据库（行数 + 最近更新时间），变化时整体重新加载；
+    本进程内的写入通过 mark_stale() 立即触发重新加载。
+    """
+
+    def __init__(self, refresh_interval: float = 30):
+        self.refresh_interval = refresh_interval
+        # (ids, matrix) 作为一个整体替换，读取方不会看到新旧混合的状态
+        self._snapshot = (None, None)
+        self._signature = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    @property
+    def ids(self):
+        return self._snapshot[0]
+
+    @property
+    def matrix(self):
+        return self._snapshot[1]
+
+    def snapshot(self):
+        """检查更新后返回当前的 (ids, matrix)。"""
+        self.ensure_fresh()
+        return self._snapshot
+
+    def mark_stale(self):
+        self._stale = True
+
+    def _current_signature(self, model: str):
+        from . import db
+        row = db.session.execute(
+            db.text('SELECT COUNT(*), MAX(updated_at) FROM job_embedding WHERE model = :model'),
+            {'model': model},
+        ).fetchone()
+        return (model, row[0], str(row[1]))
+
+    def _load(self, model: str):
+        from . import db
+        rows = db.session.execute(
+            db.text('SELECT job_id, dim, vector FROM job_embedding WHERE model = :model ORDER BY job_id'),
+            {'model': model},
+        ).fetchall()
+        dims = {row[1] for row in rows}
+        if len(dims) > 1:
+            logging.warning(f"job_embedding has mixed dimensions {sorted(dims)} for {model}; keeping the most common")
+            dim = max(dims, key=lambda d: sum(1 for row in rows if row[1] == d))
+            rows = [row for row in rows if row[1] == dim]
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        if not rows:
+            return ids, np.zeros((0, 0), dtype=np.float32)
+        dim = rows[0][1]
+        if storage_format() == 'int8' and all(len(row[2]) == dim + 4 for row in rows):
+            # 直接使用存储中的量化值，不经过 float32 中间矩阵
+            packed = np.frombuffer(b''.join(row[2] for row in rows), dtype=np.uint8).reshape(len(rows), dim + 4)
+            scales = np.ascontiguousarray(packed[:, :4]).view('<f4').ravel()
+            return ids, QuantizedMatrix(packed[:, 4:].view(np.int8), scales)
+        matrix = normalize(np.vstack([from_bytes(row[2], dim) for row in rows]))
+        if storage_format() == 'int8':
+            return ids, QuantizedMatrix.from_float(matrix)
+        return ids, matrix
+
+    def ensure_fresh(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if not self._stale and now - self._checked_at < self.refresh_interval:
+                return
+            model = model_name()
+            signature = self._current_signature(model)
+            if self._stale or signature != self._signature:
+                self._stale = False
+                self._snapshot = self._load(model)
+                self._signature = signature
+                logging.info(f"Loaded {len(self._snapshot[0])} job embeddings into memory")
+            self._checked_at = now
+
+    def scores(self, query_vector):
+        """返回 (ids, scores)：query 与每个职位向量的余弦相似度。"""
+        ids, matrix = self.snapshot()
+        if ids is None or len(ids) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        query = normalize(query_vector)[0]
+        if query.shape[0] != matrix.shape[1]:
+            raise ValueError(f'query dim {query.shape[0]} != job embedding dim {matrix.shape[1]}')
+        return ids, matrix @ query
+
+    def top_k(self, query_vector, k: int):
+        """返回相似度最高的 k 个 (job_id, score)，按分数降序。"""
+        ids, scores = self.scores(query_vector)
+        if len(ids) == 0 or k <= 0:
+            return []
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_matrix() -> JobEmbeddingMatrix:
+    global _matrix
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                _matrix = JobEmbeddingMatrix(float(os.getenv('EMBEDDING_REFRESH_INTERVAL', '30')))
+    return _matrix
+
+
+def reset_matrix():
+    global _matrix
+    with _matrix_lock:
+        _matrix = None
+
+
+def score_jobs(cv_text: str) -> dict:
+    """
+    简历文本与所有已编码职位的余弦相似度。
+
+    Returns:
+        dict: {job_id: score}；模型或 NumPy 不可用时返回空字典。
+    """
+    if np is None:
+        return {}
+    vector = encode_query(cv_text)
+    if vector is None:
+        return {}
+    ids, scores = get_matrix().scores(vector)
+    return dict(zip(ids.tolist(), scores.tolist()))
+
+
+def job_vector(job_id: int):
+    """从进程内矩阵中取单个职位的向量；未编码时返回 None。"""
+    if np is None:
+        return None
+    ids, matrix = get_matrix().snapshot()
+    if ids is None or len(ids) == 0:
+        return None
+    pos = int(np.searchsorted(ids, job_id))
+    if pos < len(ids) and ids[pos] == job_id:
+        return matrix[pos]
+    return None
@@ -0,0 +1,251 @@
+"""
+简历/文件文本提取引擎（进程池）。
+
+pdfplumber、docx2txt、pytesseract 都是 CPU 密集且持有 GIL 的同步调用，放在 Web worker 里执行时，
+一个几百页的 PDF 或超大扫描图就能占满一个 CPU 并拖住整个请求。这里把提取放到独立的进程池中：
+
+  - 每个文档有时间预算：PDF 逐页检查，超时后返回已提取的部分文本（软超时）；
+    子进程卡死超过 预算 + 宽限 时换用新的进程池（硬超时）；旧池中其它在途文档继续完成，
+    之后再终止旧池的子进程（包括卡死的那个）
+  - PDF 最多提取 EXTRACT_MAX_PAGES 页
+  - OCR 前把图片等比缩小到最长边不超过 EXTRACT_OCR_MAX_SIDE 像素
+
+Env:
+  - EXTRACT_POOL: 设为 0 时在当前进程内执行（仍有页数/缩放限制，仅 PDF 软超时生效），默认 1
+  - EXTRACT_WORKERS: 进程池大小，默认 min(4, CPU 数)
+  - EXTRACT_TIMEOUT: 单个文档的时间预算（秒），默认 20
+  - EXTRACT_HARD_TIMEOUT_GRACE: 软超时之后再等待多少秒才强制终止，默认 5
+  - EXTRACT_MAX_PAGES: PDF 最大提取页数，默认 30
+  - EXTRACT_OCR_MAX_SIDE: OCR 前图片最长边像素上限，默认 2000
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+
+PDF_EXTS = {'pdf'}
+DOCX_EXTS = {'docx'}
+IMAGE_EXTS = {'png', 'jpg', 'jpeg'}
+
+_pool = None
+_pool_lock = threading.Lock()
+# 在途任务：future -> (所属进程池, 硬超时截止时间 monotonic)
+_inflight = {}
+
+
+class ExtractionTimeout(Exception):
+    """文档超过时间预算；partial_text 为超时前已提取的文本（可能为空）。"""
+
+    def __init__(self, message: str, partial_text: str = '', page_count: int = 0):
+        super().__init__(message)
+        self.partial_text = partial_text
+        self.page_count = page_count
+
+
+class UnsupportedFileType(Exception):
+    """不支持的文件类型。"""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def pool_enabled() -> bool:
+    return os.getenv('EXTRACT_POOL', '1') not in ('0', 'false', 'False', 'no')
+
+
+def file_ext(filename: str) -> str:
+    return filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else ''
+
+
+# --- 子进程中执行的提取函数（模块级，便于 pickle） ---
+
+def _extract_pdf(source, max_pages: int, deadline: float) -> dict:
+    import pdfplumber  # type: ignore
+    from io import BytesIO
+    pages = []
+    truncated = None
+    with pdfplumber.open(BytesIO(source) if isinstance(source, bytes) else source) as pdf:
+        page_count = len(pdf.pages)
+        for index, page in enumerate(pdf.pages):
+            if index >= max_pages:
+                truncated = 'page_limit'
+                break
+            if time.monotonic() > deadline:
+                truncated = 'timeout'
+                break
+            pages.append(page.extract_text() or '')
+            # 释放已解析页面的对象缓存，长文档内存保持平稳
+            page.close()
+    return {'pages': pages, 'page_count': page_count, 'truncated': truncated}
+
+
+def _extract_docx(source) -> dict:
+    import docx2txt  # type: ignore
+    if isinstance(source, bytes):
+        from tempfile import NamedTemporaryFile
+        with NamedTemporaryFile(suffix='.docx', delete=True) as tmp:
+            tmp.write(source)
+            tmp.flush()
+            text = docx2txt.process(tmp.name) or ''
+    else:
+        text = docx2txt.process(source) or ''
+    return {'pages': [text], 'page_count': 1, 'truncated': None}
+
+
+def _extract_image(source, max_side: int, deadline: float) -> dict:
+    from io import BytesIO
+    from PIL import Image  # type: ignore
+    import pytesseract  # type: ignore
+    image = Image.open(BytesIO(source) if isinstance(source, bytes) else source)
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side))
+    remaining = max(1, int(deadline - time.monotonic()))
+    try:
+        text = pytesseract.image_to_string(image, timeout=remaining)
+    except RuntimeError as e:
+        # pytesseract 超时抛出 RuntimeError('Tesseract process timeout')
+        if 'timeout' not in str(e).lower():
+            raise
+        return {'pages': [], 'page_count': 1, 'truncated': 'timeout'}
+    return {'pages': [text or ''], 'page_count': 1, 'truncated': None}
+
+
+def _extract_worker(source, ext: str, budget: float, max_pages: int, max_side: int) -> dict:
+    deadline = time.monotonic() + budget
+    if ext in PDF_EXTS:
+        return _extract_pdf(source, max_pages, deadline)
+    if ext in DOCX_EXTS:
+        return _extract_docx(source)
+    if ext in IMAGE_EXTS:
+        return _extract_image(source, max_side, deadline)
+    raise UnsupportedFileType(f'Unsupported file type: .{ext}')
+
+
+# --- 进程池管理 ---
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = max(1, _env_int('EXTRACT_WORKERS', min(4, os.cpu_count() or 1)))
+                # spawn：Web 进程是多线程的，fork 可能继承持有中的锁
+                _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def _terminate(pool, kill: bool):
+    if kill:
+        # ProcessPoolExecutor 没有公开的终止接口，只能直接终止其子进程
+        for process in list((getattr(pool, '_processes', None) or {}).values()):
+            try:
+                process.terminate()
+            except Exception as e:
+                logging.debug(f"Terminating extraction worker failed: {e}")
+    pool.shutdown(wait=not kill, cancel_futures=True)
+
+
+def shutdown_pool(kill: bool = False):
+    """关闭进程池；kill=True 时先终止所有子进程。"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is None:
+        return
+    _terminate(pool, kill)
+
+
+def _forget(future):
+    with _pool_lock:
+        _inflight.pop(future, None)
+
+
+def _submit(fn, args, hard_timeout: float):
+    """向当前进程池提交任务并登记硬超时截止时间，返回 (进程池, future)。"""
+    pool = get_pool()
+    future = pool.submit(fn, *args)
+    with _pool_lock:
+        _inflight[future] = (pool, time.monotonic() + hard_timeout)
+    future.add_done_callback(_forget)
+    return pool, future
+
+
+def _retire_pool(pool, stuck=None):
+    """
+    换下进程池 pool：新提交的任务立即进入新池，旧池中其它在途任务在各自的硬超时内
+    继续执行，全部结束（或到期）后由后台线程终止旧池的子进程，回收卡死的那个。
+    stuck 为已超时的任务，不再等待它。
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        others = {f: deadline for f, (p, deadline) in _inflight.items() if p is pool and f is not stuck}
+
+    def reap():
+        if others:
+            wait(list(others), timeout=max(0.0, max(others.values()) - time.monotonic()))
+        _terminate(pool, kill=True)
+
+    threading.Thread(target=reap, name='extraction-pool-reaper', daemon=True).start()
+
+
+def extract(source, filename: str, timeout: float = None, max_pages: int = None) -> dict:
+    """
+    提取文档文本。
+
+    Args:
+        source (bytes | str): 文件内容或文件路径。
+        filename (str): 用于判断文件类型的文件名。
+        timeout (float): 时间预算（秒），默认 EXTRACT_TIMEOUT。
+        max_pages (int): PDF 最大页数，默认 EXTRACT_MAX_PAGES。
+
+    Returns:
+        dict: {pages: [每页文本], page_count: 文档总页数, truncated: None | 'page_limit'}
+
+    Raises:
+        ExtractionTimeout: 超过时间预算，partial_text 中为已提取的部分。
+        UnsupportedFileType: 不支持的文件类型。
+    """
+    ext = file_ext(filename)
+    budget = _env_float('EXTRACT_TIMEOUT', 20) if timeout is None else timeout
+    max_pages = _env_int('EXTRACT_MAX_PAGES', 30) if max_pages is None else max_pages
+    args = (source, ext, budget, max_pages, _env_int('EXTRACT_OCR_MAX_SIDE', 2000))
+
+    if not pool_enabled():
+        result = _extract_worker(*args)
+    else:
+        hard_timeout = budget + _env_float('EXTRACT_HARD_TIMEOUT_GRACE', 5)
+        pool, future = _submit(_extract_worker, args, hard_timeout)
+        try:
+            result = future.result(timeout=hard_timeout)
+        except FutureTimeoutError:
+            logging.warning(f"Extraction of {filename} exceeded {budget}s, replacing extraction pool")
+            _retire_pool(pool, future)
+            raise ExtractionTimeout(f'{filename}: extraction timed out after {budget}s')
+        except BrokenProcessPool:
+            # 子进程崩溃（如解析库段错误），旧池已不可用，换新池后再向上抛出
+            _retire_pool(pool, future)
+            raise
+
+    if result['truncated'] == 'timeout':
+        raise ExtractionTimeout(f'{filename}: extraction timed out after {budget}s',
+                                partial_text='\n'.join(p for p in result['pages'] if p),
+                                page_count=result['page_count'])
+    if result['truncated'] == 'page_limit':
+        logging.info(f"{filename}: extracted first {max_pages} of {result['page_count']} pages")
+    return result
@@ -0,0 +1,368 @@
+"""
+职位搜索的分面计数（地点、职位类型、经验要求、薪资区间）。
+
+计数不再由前端对全部结果逐条统计，两种实现结果一致：
+  - FacetIndex（需要 numpy）：进程内的职位分面快照——每个分面一列取值编码，每个薪资区间一个位图
+    （与搜索接口的区间交集筛选一致，一个职位可计入多个区间）。有关键词时只从数据库取匹配集合的职位 ID，
+    筛选与计数都是数组运算；没有关键词时不访问数据库。
+  - facet_counts：数据库中对匹配集合做 GROUP BY，薪资区间为 SUM(CASE ...)；numpy 不可用时使用。
+
+每个分面的计数不应用该分面自身的筛选条件（选中「北京」后仍能看到其它城市的数量）。
+
+结果按查询条件缓存（进程内 LRU + TTL）。职位发布/编辑/删除时由 recommendation_engine.mark_jobs_changed
+清空缓存并标记快照过期；其它进程中的变化在 TTL / 快照检查间隔内可见。
+
+Env:
+  - JOB_FACET_CACHE_SIZE: 缓存的查询条件数，默认 512
+  - JOB_FACET_CACHE_TTL: 缓存有效期（秒），默认 60，设为 0 关闭缓存
+  - JOB_FACET_REFRESH_INTERVAL: 检查职位表变化（行数、最大 ID、最近发布/修改时间）的间隔（秒），默认 30
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None  # type: ignore
+
+FACETS = ('location', 'job_type', 'experience_level', 'salary')
+VALUE_FACETS = FACETS[:3]
+# 地点等取值较多的分面只返回计数最多的前 N 个
+MAX_FACET_VALUES = 20
+# 月薪区间（元）：(下限, 上限, 显示名)，None 表示不限；点击后作为 salary_min / salary_max 筛选
+SALARY_BANDS = (
+    (None, 5000, '5k以下'),
+    (5000, 10000, '5-10k'),
+    (10000, 20000, '10-20k'),
+    (20000, 30000, '20-30k'),
+    (30000, 50000, '30-50k'),
+    (50000, None, '50k以上'),
+)
+
+
+def job_filters(location='', job_type='', experience_level='', salary_min=None, salary_max=None) -> dict:
+    """搜索接口的筛选条件，按所属分面分组：{分面名: [条件, ...]}。"""
+    from .models import Job
+    filters = {}
+    if location:
+        filters['location'] = [Job.location.contains(location)]
+    if job_type:
+        filters['job_type'] = [Job.job_type == job_type]
+    if experience_level:
+        filters['experience_level'] = [Job.experience_level == experience_level]
+    # 薪资区间与职位区间有交集即可（月薪，元）；未解析出薪资（面议）的职位不参与薪资筛选
+    salary = []
+    if salary_min is not None:
+        salary.append(Job.salary_max >= salary_min)
+    if salary_max is not None:
+        salary.append(Job.salary_min <= salary_max)
+    if salary:
+        filters['salary'] = salary
+    return filters
+
+
+def apply_filters(jobs_query, filters: dict, exclude: str = None):
+    for name, criteria in filters.items():
+        if name != exclude:
+            jobs_query = jobs_query.filter(*criteria)
+    return jobs_query
+
+
+def _sorted_counts(bucket: dict) -> list:
+    return [{'value': value, 'count': count} for value, count in
+            sorted(bucket.items(), key=lambda item: (-item[1], item[0]))[:MAX_FACET_VALUES]]
+
+
+def _salary_counts(counts) -> list:
+    return [{'value': label, 'salary_min': low, 'salary_max': high, 'count': int(count)}
+            for (low, high, label), count in zip(SALARY_BANDS, counts) if count]
+
+
+def _band_sums():
+    from . import db
+    from .models import Job
+    sums = []
+    for low, high, _ in SALARY_BANDS:
+        conditions = [Job.salary_min.isnot(None)]
+        if low is not None:
+            conditions.append(Job.salary_max >= low)
+        if high is not None:
+            conditions.append(Job.salary_min <= high)
+        sums.append(db.func.sum(db.case((db.and_(*conditions), 1), else_=0)))
+    return sums
+
+
+def _count_facets(jobs_query, names) -> dict:
+    """一次查询统计 names 中的分面：按各分面列联合分组，在 Python 中再按单列汇总。"""
+    from . import db
+    from .models import Job
+    columns = [getattr(Job, name) for name in names if name != 'salary']
+    aggregates = [db.func.count()] + (_band_sums() if 'salary' in names else [])
+    query = jobs_query.order_by(None).with_entities(*columns, *aggregates)
+    if columns:
+        query = query.group_by(*columns)
+    counts = {name: {} for name in names if name != 'salary'}
+    bands = [0] * len(SALARY_BANDS)
+    for row in query:
+        values, count, sums = row[:len(columns)], row[len(columns)], row[len(columns) + 1:]
+        for column, value in zip(columns, values):
+            if value and count:
+                bucket = counts[column.key]
+                bucket[value] = bucket.get(value, 0) + count
+        for i, value in enumerate(sums):
+            bands[i] += value or 0
+    result = {name: _sorted_counts(bucket) for name, bucket in counts.items()}
+    if 'salary' in names:
+        result['salary'] = _salary_counts(bands)
+    return result
+
+
+def facet_counts(jobs_query, filters: dict) -> dict:
+    """
+    返回 {分面名: [{'value': 取值, 'count': 数量}, ...]}（按数量倒序；薪资区间按区间顺序并带上下限）。
+
+    Args:
+        jobs_query: 只带关键词条件的 Job 查询（search_jobs 的结果）。
+        filters (dict): job_filters 的返回值。
+    """
+    groups = {}
+    for name in FACETS:
+        # 分面自身没有筛选时，条件集合即全部筛选；否则去掉自身
+        key = name if name in filters else None
+        groups.setdefault(key, []).append(name)
+    result = {}
+    for exclude, names in groups.items():
+        result.update(_count_facets(apply_filters(jobs_query, filters, exclude=exclude), names))
+    return {name: result[name] for name in FACETS}
+
+
+class FacetIndex:
+    """
+    职位分面快照：ids 升序；codes[分面] 为每个职位取值在 values[分面] 中的下标（-1 表示为空）；
+    bands 为每个薪资区间的位图；salary_min / salary_max 用于薪资筛选（-1 表示面议）。
+    """
+
+    def __init__(self, ids, codes, values, salary_min, salary_max):
+        self.ids = ids
+        self.codes = codes
+        self.values = values
+        self.salary_min = salary_min
+        self.salary_max = salary_max
+        self.bands = []
+        for low, high, _ in SALARY_BANDS:
+            band = salary_min >= 0
+            if low is not None:
+                band &= salary_max >= low
+            if high is not None:
+                band &= salary_min <= high
+            self.bands.append(band)
+
+    @classmethod
+    def build(cls, rows):
+        """rows: [(id, location, job_type, experience_level, salary_min, salary_max), ...]"""
+        rows = sorted(rows, key=lambda row: row[0])
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        codes, values = {}, {}
+        for column, name in enumerate(VALUE_FACETS, 1):
+            index = {}
+            codes[name] = np.fromiter((index.setdefault(row[column], len(index)) if row[column] else -1 for row in rows),
+                                      dtype=np.int32, count=len(rows))
+            values[name] = list(index)
+        salary = [np.fromiter((-1 if row[column] is None else row[column] for row in rows), dtype=np.int64, count=len(rows))
+                  for column in (4, 5)]
+        return cls(ids, codes, values, *salary)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _value_mask(self, name, predicate):
+        matched = [code for code, value in enumerate(self.values[name]) if predicate(value)]
+        return np.isin(self.codes[name], np.asarray(matched, dtype=np.int32))
+
+    def filter_masks(self, location='', job_type='', experience_level='', salary_min=None, salary_max=None) -> dict:
+        """与 job_filters 相同的条件，按分面返回位图（地点为不区分大小写的子串匹配，同 SQL LIKE）。"""
+        masks = {}
+        if location:
+            needle = location.lower()
+            masks['location'] = self._value_mask('location', lambda value: needle in value.lower())
+        if job_type:
+            masks['job_type'] = self._value_mask('job_type', lambda value: value == job_type)
+        if experience_level:
+            masks['experience_level'] = self._value_mask('experience_level', lambda value: value == experience_level)
+        if salary_min is not None or salary_max is not None:
+            mask = self.salary_min >= 0
+            if salary_min is not None:
+                mask &= self.salary_max >= salary_min
+            if salary_max is not None:
+                mask &= self.salary_min <= salary_max
+            masks['salary'] = mask
+        return masks
+
+    def counts(self, matched_ids=None, **params) -> dict:
+        """matched_ids 为关键词匹配集合的职位 ID（None 表示全部职位），params 为 job_filters 的参数。"""
+        if matched_ids is None:
+            base = np.ones(len(self.ids), dtype=bool)
+        else:
+            # 快照之后新增的职位不在 ids 中，不计入
+            base = np.isin(self.ids, np.asarray(matched_ids, dtype=np.int64))
+        masks = self.filter_masks(**params)
+        result = {}
+        for name in FACETS:
+            mask = base.copy()
+            for other, other_mask in masks.items():
+                if other != name:
+                    mask &= other_mask
+            if name == 'salary':
+                result[name] = _salary_counts([np.count_nonzero(band & mask) for band in self.bands])
+            else:
+                codes = self.codes[name][mask]
+                counts = np.bincount(codes[codes >= 0], minlength=len(self.values[name]))
+                result[name] = _sorted_counts({self.values[name][code]: int(count)
+                                               for code, count in enumerate(counts) if count})
+        return result
+
+
+class FacetIndexHolder:
+    """进程内的 FacetIndex，每隔 refresh_interval 秒检查一次职位表（Job.change_signature），变化时重新构建；mark_stale() 立即生效。"""
+
+    def __init__(self, refresh_interval: float = 30):
+        self.refresh_interval = refresh_interval
+        self._index = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        self._stale = True
+
+    def index(self) -> FacetIndex:
+        from . import db
+        from .models import Job
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.refresh_interval:
+            return self._index
+        with self._lock:
+            if self._stale or now - self._checked_at >= self.refresh_interval:
+                signature = Job.change_signature()
+                if self._stale or signature != self._signature:
+                    self._stale = False
+                    started = time.perf_counter()
+                    self._index = FacetIndex.build(db.session.query(
+                        Job.id, Job.location, Job.job_type, Job.experience_level, Job.salary_min, Job.salary_max).all())
+                    self._signature = signature
+                    logging.info(f"Built job facet index for {len(self._index)} jobs "
+                                 f"in {time.perf_counter() - started:.2f}s")
+                self._checked_at = time.monotonic()
+        return self._index
+
+
+class FacetCache:
+    """进程内 LRU，键为规范化后的查询条件，线程安全。"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 60):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = None
+_holder = None
+_cache_lock = threading.Lock()
+
+
+def available() -> bool:
+    return np is not None
+
+
+def get_index_holder() -> FacetIndexHolder:
+    global _holder
+    if _holder is None:
+        with _cache_lock:
+            if _holder is None:
+                _holder = FacetIndexHolder(float(os.getenv('JOB_FACET_REFRESH_INTERVAL', '30')))
+    return _holder
+
+
+def get_cache() -> FacetCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    max_entries = int(os.getenv('JOB_FACET_CACHE_SIZE', '512'))
+                    ttl = float(os.getenv('JOB_FACET_CACHE_TTL', '60'))
+                except ValueError:
+                    max_entries, ttl = 512, 60
+                _cache = FacetCache(max_entries=max_entries, ttl=ttl)
+    return _cache
+
+
+def reset_cache():
+    global _cache, _holder
+    with _cache_lock:
+        _cache = None
+        _holder = None
+
+
+def invalidate_all():
+    """职位变化后调用。"""
+    if _cache is not None:
+        _cache.clear()
+    if _holder is not None:
+        _holder.mark_stale()
+
+
+def search_facets(jobs_query, text: str = '', **params) -> dict:
+    """
+    带缓存的分面计数；jobs_query 为已加关键词条件的查询（没有关键词时为 Job.query），params 为 job_filters 的参数。
+
+    缓存键为关键词（首尾空白、连续空白规范化）与各筛选参数。
+    """
+    from . import db
+    from .job_search import match_job_ids
+    from .models import Job
+    text = ' '.join((text or '').split())
+    key = (text, tuple(sorted(params.items())), str(db.engine.url))
+    cache = get_cache()
+    facets = cache.get(key)
+    if facets is None:
+        if available():
+            index = get_index_holder().index()
+            matched_ids = None
+            if text:
+                matched_ids = match_job_ids(text)
+                if matched_ids is None:
+                    matched_ids = [job_id for (job_id,) in jobs_query.order_by(None).with_entities(Job.id)]
+            facets = index.counts(matched_ids, **params)
+        else:
+            facets = facet_counts(jobs_query, job_filters(**params))
+        cache.set(key, facets)
+    return facets
@@ -0,0 +1,138 @@
+"""
+职位列表的游标（keyset）分页。
+
+按 (date_posted, id) 倒序分页；全文检索结果先按 BM25 相关度（job_search.search_jobs 返回的 rank 列）
+再按 (date_posted, id) 排序。游标是上一页最后一条的排序键（URL 安全的 base64 JSON），
+下一页用 WHERE (排序键) < 游标 继续读取，不使用 OFFSET，也不再一次性加载全部职位。
+
+每页最多 MAX_PAGE_SIZE 条；多读 1 条判断是否还有下一页。
+
+按匹配度排序的搜索结果用 paginate_scored：按上述顺序每次读取 SCORE_WINDOW_PAGES 页作为一个窗口，
+窗口内全部打分后按分数分页，游标记录窗口起点与窗口内偏移。
+"""
+import json
+import base64
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# 按匹配度排序时一个打分窗口包含的页数
+SCORE_WINDOW_PAGES = 5
+
+
+class InvalidCursor(ValueError):
+    """游标无法解析，或与当前排序方式（是否按相关度）不一致。"""
+
+
+def page_size(value=None) -> int:
+    """请求中的每页条数，限制在 1..MAX_PAGE_SIZE，缺省为 DEFAULT_PAGE_SIZE。"""
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(value), MAX_PAGE_SIZE))
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, ranked: bool = False) -> list:
+    """返回 [rank,] date_posted, id；格式错误时抛出 InvalidCursor。"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw.decode('utf-8'))
+        if not isinstance(values, list) or len(values) != (3 if ranked else 2):
+            raise ValueError('cursor length')
+        if ranked:
+            values[0] = float(values[0])
+        values[-2] = datetime.fromisoformat(values[-2])
+        values[-1] = int(values[-1])
+        return values
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f'invalid cursor: {cursor!r}') from e
+
+
+def _after(keys, values):
+    """keyset 条件：排序键严格位于游标之后（(k1, k2, ...) 的字典序展开，支持不同排序方向）。"""
+    from . import db
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(db.and_(*[keys[j][0] == values[j] for j in range(i)], beyond))
+    return db.or_(*clauses)
+
+
+def paginate_jobs(jobs_query, cursor: str = None, limit: int = None, rank=None, max_limit: int = MAX_PAGE_SIZE):
+    """
+    读取一页职位，返回 (jobs, next_cursor)；没有下一页时 next_cursor 为 None。
+
+    Args:
+        jobs_query: 已加好筛选条件的 Job 查询（原有排序会被替换）。
+        cursor (str): 上一页返回的 next_cursor，None 表示第一页。
+        limit (int): 每页条数，超过 MAX_PAGE_SIZE 时截断。
+        rank: search_jobs 返回的 BM25 列；给出时先按相关度排序。
+        max_limit (int): 每页条数上限，默认 MAX_PAGE_SIZE。
+    """
+    from .models import Job
+    limit = max(1, min(int(limit), max_limit)) if limit is not None else page_size()
+    keys = [(Job.date_posted, True), (Job.id, True)]
+    query = jobs_query.order_by(None)
+    if rank is not None:
+        keys.insert(0, (rank, False))
+        query = query.add_columns(rank)
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, ranked=rank is not None)))
+    rows = query.order_by(*[column.desc() if descending else column for column, descending in keys]).limit(limit + 1).all()
+    jobs = [row[0] for row in rows] if rank is not None else rows
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        job = jobs[limit - 1]
+        next_cursor = encode_cursor(([last[1]] if rank is not None else []) + [job.date_posted, job.id])
+    return jobs[:limit], next_cursor
+
+
+def _decode_scored_cursor(cursor: str):
+    """返回 (窗口起点游标或 None, 窗口内偏移, 窗口大小)；格式错误时抛出 InvalidCursor。"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        window_cursor, offset, window = json.loads(raw.decode('utf-8'))
+        if not (window_cursor is None or isinstance(window_cursor, str)):
+            raise ValueError('window cursor')
+        offset, window = int(offset), int(window)
+        if offset < 0 or window < 1:
+            raise ValueError('offset')
+        return window_cursor, offset, window
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f'invalid cursor: {cursor!r}') from e
+
+
+def paginate_scored(jobs_query, score, cursor: str = None, limit: int = None, rank=None):
+    """
+    按匹配度分页，返回 ([(job, 分数)], next_cursor)。
+
+    每个窗口为 paginate_jobs 顺序下的连续 limit * SCORE_WINDOW_PAGES 个职位，窗口内按分数降序
+    （同分保持原顺序），窗口之间仍按发布时间/相关度。翻页时重新读取并打分当前窗口，只返回其中一页，
+    每次请求的打分量有上限；窗口大小记录在游标中，翻页途中改变 limit 不会跳过或重复职位。
+
+    Args:
+        score (callable): score(jobs) 返回与 jobs 一一对应的分数列表。
+        其余参数同 paginate_jobs。
+    """
+    limit = page_size(limit)
+    if cursor:
+        window_cursor, offset, window = _decode_scored_cursor(cursor)
+    else:
+        window_cursor, offset, window = None, 0, limit * SCORE_WINDOW_PAGES
+    jobs, next_window = paginate_jobs(jobs_query, cursor=window_cursor, limit=window, rank=rank, max_limit=window)
+    # sorted 是稳定排序：同分职位保持发布时间/相关度顺序
+    ranked = sorted(zip(jobs, score(jobs)), key=lambda item: item[1], reverse=True)
+    page = ranked[offset:offset + limit]
+    if offset + limit < len(ranked):
+        state = [window_cursor, offset + limit, window]
+    elif next_window:
+        state = [next_window, 0, limit * SCORE_WINDOW_PAGES]
+    else:
+        return page, None
+    raw = json.dumps(state, separators=(',', ':'))
+    return page, base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
@@ -0,0 +1,214 @@
+"""
+职位全文检索（SQLite FTS5）。
+
+job_fts 为无内容（content=''）的 FTS5 表，索引 job 表的 title / description / requirements / skills_required，
+由 job 表上的触发器同步。unicode61 分词器会把连续的中文当成一个词，因此写入前先做 CJK 二元切分：
+连续的中日韩字符展开为相邻两字的重叠词（「软件开发」-> 「软件 件开 开发」），孤立的单字保留为一个词，
+其余字符原样交给 unicode61（英文按单词切分、不区分大小写）。切分在触发器内用递归 CTE 完成，
+不依赖连接上注册的自定义函数，任何客户端写入 job 表都能保持索引同步。
+
+查询时按同样规则切分，每个查询词作为一个短语（相邻的二元词），多个词之间为 AND，结果按 BM25 排序。
+unicode61 会丢掉 + 和 #（「C++」「C#」在索引中都只是 c），含这两个字符的查询词在全文匹配之外
+再要求某个索引列包含原词（不区分大小写），保持与原 LIKE 匹配相同的区分能力。
+非 SQLite 数据库、索引未建立或查询无法用二元词表达（如单个汉字）时，回退为原来的 LIKE 子串匹配。
+
+索引由 add_job_fts_table.py 创建并回填。
+"""
+import re
+import logging
+
+# 参与二元切分的字符范围：CJK 统一汉字（含扩展 A、兼容汉字）、日文假名、韩文音节
+_CJK_RANGES = ((0x3040, 0x30FF), (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xAC00, 0xD7AF), (0xF900, 0xFAFF))
+_CJK_RUN = re.compile('[' + ''.join(f'{chr(low)}-{chr(high)}' for low, high in _CJK_RANGES) + ']+')
+
+# 分词器会丢弃、但对查询词有区分意义的字符（C++ / C# / F#）
+_SIGNIFICANT_SYMBOLS = re.compile(r'[+#]')
+
+FTS_TABLE = 'job_fts'
+FTS_COLUMNS = ('title', 'description', 'requirements', 'skills_required')
+# bm25 列权重（与 FTS_COLUMNS 对应）：标题、技能要求命中比正文更相关
+BM25_WEIGHTS = (5.0, 1.0, 1.0, 2.0)
+
+
+def _is_cjk(ch: str) -> bool:
+    code = ord(ch)
+    return any(low <= code <= high for low, high in _CJK_RANGES)
+
+
+def cjk_bigrams(text: str) -> str:
+    """CJK 二元切分，与触发器中的 SQL 实现逐字符一致。"""
+    def expand(match):
+        run = match.group()
+        if len(run) == 1:
+            return f' {run} '
+        return ''.join(f' {run[i:i + 2]} ' for i in range(len(run) - 1))
+    return _CJK_RUN.sub(expand, text or '')
+
+
+def _cjk_sql(char_expr: str) -> str:
+    return '(' + ' OR '.join(f'unicode({char_expr}) BETWEEN {low} AND {high}' for low, high in _CJK_RANGES) + ')'
+
+
+def _bigram_sql(expr: str) -> str:
+    """生成对 expr 做 cjk_bigrams 切分的 SQL 标量子查询。"""
+    t = f'coalesce({expr}, \'\')'
+    ch, nxt, prev = f'substr({t}, i, 1)', f'substr({t}, i + 1, 1)', f'substr({t}, i - 1, 1)'
+    return (
+        f"(WITH RECURSIVE pos(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM pos WHERE i < length({t})) "
+        f"SELECT coalesce(group_concat(CASE "
+        f"WHEN i > length({t}) THEN '' "
+        f"WHEN NOT {_cjk_sql(ch)} THEN {ch} "
+        f"WHEN {_cjk_sql(nxt)} THEN ' ' || substr({t}, i, 2) || ' ' "
+        f"WHEN i = 1 OR NOT {_cjk_sql(prev)} THEN ' ' || {ch} || ' ' "
+        f"ELSE '' END, ''), '') FROM pos)"
+    )
+
+
+def _row_values_sql(alias: str) -> str:
+    return ', '.join(_bigram_sql(f'{alias}.{column}') for column in FTS_COLUMNS)
+
+
+def schema_statements() -> list:
+    """创建 FTS 表与同步触发器的 SQL（均可重复执行）。"""
+    columns = ', '.join(FTS_COLUMNS)
+    insert_new = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {_row_values_sql('new')});"
+    # 无内容表删除时需提供写入时的原值，按旧值重新切分即可得到
+    delete_old = (f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+                  f"VALUES ('delete', old.id, {_row_values_sql('old')});")
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({columns}, content='', tokenize='unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF {columns} ON job BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def rebuild_index(conn, batch_size: int = 2000) -> int:
+    """
+    清空并按 job 表重建索引，返回索引的职位数；conn 为 DB-API 连接或 SQLAlchemy Connection。
+
+    回填在 Python 中切分（逐字符的 SQL 切分对大批量数据太慢），结果与触发器一致。
+    """
+    # SQLAlchemy Connection 用 exec_driver_sql 执行原生 SQL，sqlite3 连接的 execute 同时接受单行与多行参数
+    execute = getattr(conn, 'exec_driver_sql', None) or conn.execute
+    execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+    rows = execute(f"SELECT id, {', '.join(FTS_COLUMNS)} FROM job").fetchall()
+    insert = f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)}) VALUES (?{', ?' * len(FTS_COLUMNS)})"
+    execute_many = getattr(conn, 'exec_driver_sql', None) or conn.executemany
+    for start in range(0, len(rows), batch_size):
+        execute_many(insert, [(row[0],) + tuple(cjk_bigrams(value) for value in row[1:])
+                              for row in rows[start:start + batch_size]])
+    return len(rows)
+
+
+def is_sqlite() -> bool:
+    from . import db
+    return db.engine.dialect.name == 'sqlite'
+
+
+_available = {}
+
+
+def fts_available() -> bool:
+    """当前数据库是否为 SQLite 且已建立 job_fts（按数据库 URL 缓存检查结果）。"""
+    from . import db
+    if not is_sqlite():
+        return False
+    url = str(db.engine.url)
+    if url not in _available:
+        try:
+            with db.engine.connect() as conn:
+                _available[url] = conn.execute(
+                    db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {'name': FTS_TABLE},
+                ).first() is not None
+        except Exception as e:
+            logging.warning(f"Failed to check job full-text index: {e}")
+            return False
+    return _available[url]
+
+
+def ensure_job_fts(rebuild: bool = False) -> bool:
+    """创建 FTS 表与触发器；新建或 rebuild=True 时按 job 表回填。非 SQLite 数据库返回 False。"""
+    from . import db
+    if not is_sqlite():
+        return False
+    with db.engine.begin() as conn:
+        existed = conn.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE},
+        ).first() is not None
+        for statement in schema_statements():
+            conn.exec_driver_sql(statement)
+        if rebuild or not existed:
+            rebuild_index(conn)
+    _available.pop(str(db.engine.url), None)
+    return True
+
+
+def build_match_query(text: str):
+    """
+    把用户输入转换为 FTS5 MATCH 表达式：每个空白分隔的词切分后作为一个短语，短语之间为 AND。
+
+    无法用索引表达时返回 None（查询为空，或包含单个汉字——索引中汉字只以二元词出现）。
+    """
+    phrases = []
+    for term in (text or '').split():
+        expanded = cjk_bigrams(term)
+        tokens = expanded.split()
+        if not tokens or any(len(token) == 1 and _is_cjk(token) for token in tokens):
+            return None
+        phrases.append('"' + expanded.replace('"', '""').strip() + '"')
+    return ' AND '.join(phrases) or None
+
+
+def symbol_terms(text: str) -> list:
+    """查询中含 + / # 的词（小写），需在全文匹配后按原词再筛一次。"""
+    return [term.lower() for term in (text or '').split() if _SIGNIFICANT_SYMBOLS.search(term)]
+
+
+def _contains_sql(param: str) -> str:
+    return '(' + ' OR '.join(f"instr(lower(coalesce({column}, '')), :{param}) > 0" for column in FTS_COLUMNS) + ')'
+
+
+def search_jobs(jobs_query, text: str):
+    """
+    在 jobs_query 上加入关键词条件，返回 (query, rank)。
+
+    使用了全文索引时 rank 为 BM25 列（越小越相关），query 已按相关度排序（同分按发布时间倒序），
+    分页时交给 job_pagination.paginate_jobs；否则 rank 为 None，为 LIKE 子串匹配（title/description），
+    由调用方决定排序。
+    """
+    from . import db
+    from .models import Job
+    match = build_match_query(text) if fts_available() else None
+    if match is None:
+        return jobs_query.filter(Job.title.contains(text) | Job.description.contains(text)), None
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    hits = db.text(
+        f"SELECT rowid AS job_id, bm25({FTS_TABLE}, {weights}) AS rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+    ).bindparams(match=match).columns(job_id=db.Integer, rank=db.Float).subquery('job_fts_hits')
+    jobs_query = jobs_query.join(hits, hits.c.job_id == Job.id)
+    for i, term in enumerate(symbol_terms(text)):
+        jobs_query = jobs_query.filter(db.text(_contains_sql(f'symbol_{i}')).bindparams(**{f'symbol_{i}': term}))
+    return jobs_query.order_by(hits.c.rank, Job.date_posted.desc()), hits.c.rank
+
+
+def match_job_ids(text: str):
+    """
+    关键词匹配的全部职位 ID（不计算 BM25，供分面计数等只需要匹配集合的场景）。
+
+    与 search_jobs 的匹配条件相同；无法使用全文索引时返回 None，由调用方按 LIKE 查询。
+    """
+    from . import db
+    match = build_match_query(text) if fts_available() else None
+    if match is None:
+        return None
+    sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+    params = {'match': match}
+    terms = symbol_terms(text)
+    if terms:
+        sql += ' AND rowid IN (SELECT id FROM job WHERE ' + \
+            ' AND '.join(_contains_sql(f'symbol_{i}') for i in range(len(terms))) + ')'
+        params.update({f'symbol_{i}': term for i, term in enumerate(terms)})
+    rows = db.session.execute(db.text(sql), params)
+    return [job_id for (job_id,) in rows]
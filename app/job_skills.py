@@ -0,0 +1,74 @@
+"""
+职位技能关键词的持久化。
+
+职位发布/编辑时用共享技能自动机（skill_matcher）解析一次职位描述，结果写入 job_skill 表
+（每个技能一行，skill 列有索引）；推荐与搜索时按职位 ID 批量读取技能集合，不再对每个职位、
+每次请求重新解析描述。已有职位由 add_job_skill_table.py 回填。
+"""
+import logging
+
+from .skill_matcher import get_matcher, RECRUIT
+
+
+def extract_job_skills(job) -> dict:
+    """解析职位描述，返回 {技能 ID: 分类}。"""
+    categorized = get_matcher().categorize(job.description or '', sources={RECRUIT})
+    return {skill: sorted(category for _, category in pairs)[0] for skill, pairs in categorized.items()}
+
+
+def save_job_skills(job) -> bool:
+    """
+    重新提取并替换职位的技能行（调用方负责提交事务）。
+
+    在 SAVEPOINT 中执行：job_skill 表尚未创建等错误只记录日志，不影响职位本身的保存。
+    """
+    from . import db
+    from .models import JobSkill
+    try:
+        with db.session.begin_nested():
+            JobSkill.query.filter_by(job_id=job.id).delete(synchronize_session=False)
+            db.session.add_all(JobSkill(job_id=job.id, skill=skill, category=category)
+                               for skill, category in extract_job_skills(job).items())
+        return True
+    except Exception as e:
+        logging.warning(f"Failed to save skills for job {job.id}: {e}")
+        return False
+
+
+def delete_job_skills(job_id: int):
+    """删除职位的技能行（职位删除时调用；调用方负责提交事务）。"""
+    from . import db
+    from .models import JobSkill
+    try:
+        with db.session.begin_nested():
+            JobSkill.query.filter_by(job_id=job_id).delete(synchronize_session=False)
+    except Exception as e:
+        logging.warning(f"Failed to delete skills for job {job_id}: {e}")
+
+
+def load_job_skills(job_ids=None) -> dict:
+    """
+    批量读取职位技能集合，返回 {job_id: set(技能 ID)}；没有技能的职位不在结果中。
+    job_ids 为 None 时读取全部职位。读取失败（如表尚未创建）时返回 None，调用方可回退为解析职位描述。
+    """
+    from .models import JobSkill
+    if job_ids is not None:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+    result = {}
+    try:
+        query = JobSkill.query.with_entities(JobSkill.job_id, JobSkill.skill)
+        if job_ids is None:
+            batches = [query]
+        else:
+            # SQLite 单条语句的参数个数有限，分批查询
+            batches = (query.filter(JobSkill.job_id.in_(job_ids[start:start + 500]))
+                       for start in range(0, len(job_ids), 500))
+        for batch in batches:
+            for job_id, skill in batch:
+                result.setdefault(job_id, set()).add(skill)
+    except Exception as e:
+        logging.warning(f"Failed to load job skills: {e}")
+        return None
+    return result
@@ -0,0 +1,281 @@
+"""
+LLM 响应缓存（内容寻址）。
+
+缓存键为 (provider, model, 归一化后的 prompt 哈希, max_tokens) 的 SHA-256。
+两级存储：
+  - 进程内 LRU（带 TTL）
+  - 可选的 SQLite 磁盘层，同一主机上的所有 worker 共享
+
+Env:
+  - LLM_CACHE_ENABLED: 设为 0 关闭缓存，默认 1
+  - LLM_CACHE_SIZE: 进程内 LRU 最大条目数，默认 512
+  - LLM_CACHE_DB: SQLite 缓存文件路径，未设置时仅使用进程内缓存
+  - LLM_CACHE_TTL: 调用方未指定 TTL 时的默认有效期（秒），默认 86400
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+DEFAULT_TTL = 86400
+
+
+def normalize_prompt(prompt: str) -> str:
+    """折叠空白并去除首尾空白，使仅有排版差异的 prompt 命中同一条缓存。"""
+    return re.sub(r'\s+', ' ', prompt or '').strip()
+
+
+def make_key(provider: str, model: str, prompt: str, max_tokens) -> str:
+    prompt_hash = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+    raw = f'{provider}\x1f{model}\x1f{prompt_hash}\x1f{max_tokens}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """进程内 LRU + 可选 SQLite 两级缓存，线程安全。"""
+
+    def __init__(self, max_entries: int = 512, db_path: str = None):
+        self.max_entries = max(1, max_entries)
+        self.db_path = db_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+        if db_path:
+            directory = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(directory, exist_ok=True)
+
+    # --- SQLite 层 ---
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL, created_at REAL NOT NULL)'
+            )
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str, now: float):
+        try:
+            row = self._conn().execute(
+                'SELECT value, expires_at FROM llm_cache WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        if row[1] <= now:
+            try:
+                conn = self._conn()
+                conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                conn.commit()
+            except sqlite3.Error:
+                pass
+            return None
+        return row
+
+    def _disk_set(self, key: str, value: str, expires_at: float, now: float):
+        try:
+            conn = self._conn()
+            conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)',
+                (key, value, expires_at, now),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache write failed: {e}")
+
+    # --- 公共接口 ---
+    def lookup(self, key: str):
+        """查询但不计数，返回 (value, 命中的计数项)；计数项为 memory_hits / disk_hits / misses。"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1], 'memory_hits'
+                del self._memory[key]
+        if self.db_path:
+            row = self._disk_get(key, now)
+            if row is not None:
+                with self._lock:
+                    self._remember(key, row[0], row[1])
+                return row[0], 'disk_hits'
+        return None, 'misses'
+
+    def record(self, outcome: str):
+        """计入一次逻辑查询的结果（lookup 返回的计数项）。"""
+        with self._lock:
+            self._counters[outcome] += 1
+
+    def get(self, key: str):
+        value, outcome = self.lookup(key)
+        self.record(outcome)
+        return value
+
+    def set(self, key: str, value: str, ttl: int):
+        if value is None or ttl is None or ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._counters['stores'] += 1
+        if self.db_path:
+            self._disk_set(key, value, expires_at, now)
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """清理已过期条目，返回删除的磁盘行数。"""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (exp, _) in self._memory.items() if exp <= now]:
+                del self._memory[key]
+        if not self.db_path:
+            return 0
+        try:
+            conn = self._conn()
+            cur = conn.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (now,))
+            conn.commit()
+            return cur.rowcount
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache purge failed: {e}")
+            return 0
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        if self.db_path:
+            try:
+                conn = self._conn()
+                conn.execute('DELETE FROM llm_cache')
+                conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"LLM cache clear failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv('LLM_CACHE_ENABLED', '1') not in ('0', 'false', 'False', 'no')
+
+
+def get_cache() -> LLMResponseCache:
+    """按环境变量惰性创建进程级缓存实例。"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    max_entries = int(os.getenv('LLM_CACHE_SIZE', '512'))
+                except ValueError:
+                    max_entries = 512
+                _cache = LLMResponseCache(max_entries=max_entries, db_path=os.getenv('LLM_CACHE_DB') or None)
+    return _cache
+
+
+def reset_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def stats() -> dict:
+    return get_cache().stats()
+
+
+def _default_ttl() -> int:
+    try:
+        return int(os.getenv('LLM_CACHE_TTL', DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+def peek(provider: str, model: str, prompt: str, max_tokens):
+    """
+    只查询缓存，不触发网络请求，也不计入命中率；返回 (value, 计数项)，未命中时 value 为 None。
+
+    调用方依次查看多个提供方时，整次查询结束后用 record_lookup 计一次，
+    随后的实际调用传 cache_checked=True，避免同一次未命中被重复计数。
+    """
+    if not enabled():
+        return None, None
+    return get_cache().lookup(make_key(provider, model, prompt, max_tokens))
+
+
+def record_lookup(outcome):
+    """计入一次逻辑查询（peek 返回的计数项，或 'misses'）。"""
+    if enabled() and outcome:
+        get_cache().record(outcome)
+
+
+def store(provider: str, model: str, prompt: str, max_tokens, value: str, ttl=None):
+    """写入一条缓存（如流式调用结束后保存完整文本）；ttl 为 None 时使用 LLM_CACHE_TTL。"""
+    ttl = _default_ttl() if ttl is None else ttl
+    if enabled() and value and ttl > 0:
+        get_cache().set(make_key(provider, model, prompt, max_tokens), value, ttl)
+
+
+def cached(provider: str, model, tokens_arg: str = 'max_tokens', default_tokens: int = 800):
+    """
+    为 `_*_generate(prompt, <tokens_arg>=...)` 加上缓存的装饰器。
+
+    被装饰函数额外接受 cache_ttl 关键字参数：None 使用 LLM_CACHE_TTL，0 表示绕过缓存；
+    以及 cache_checked：调用方已通过 peek 查询并计数时为 True，此时不再查询，只写入结果。
+    只缓存非空结果，失败（None）不会被缓存。
+
+    Args:
+        provider (str): 提供方名称，参与缓存键。
+        model (callable): 返回当前模型标识的函数，参与缓存键。
+        tokens_arg (str): 被装饰函数中表示最大 token 数的参数名。
+        default_tokens (int): 调用方未传 tokens_arg 时使用的默认值。
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(prompt, *args, cache_ttl=None, cache_checked=False, **kwargs):
+            ttl = _default_ttl() if cache_ttl is None else cache_ttl
+            if not enabled() or ttl <= 0:
+                return fn(prompt, *args, **kwargs)
+            max_tokens = args[0] if args else kwargs.get(tokens_arg, default_tokens)
+            key = make_key(provider, model(), prompt, max_tokens)
+            cache = get_cache()
+            if not cache_checked:
+                hit = cache.get(key)
+                if hit is not None:
+                    return hit
+            result = fn(prompt, *args, **kwargs)
+            if result:
+                cache.set(key, result, ttl)
+            return result
+        wrapper.cache_model = model
+        return wrapper
+    return decorator
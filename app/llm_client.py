@@ -0,0 +1,243 @@
+"""
+LLM 提供方共享 HTTP 客户端。
+
+每个提供方（gemini / deepseek / hf）持有一个带连接池的 requests.Session，
+复用 keep-alive 连接，避免每次调用都重新进行 TCP+TLS 握手；
+同时用信号量限制单个 worker 进程内同时在途的 LLM 请求数量。
+
+Env:
+  - LLM_HTTP_POOLING: 设为 0 时退回每次调用 requests.post（用于对比/排障），默认 1
+  - LLM_POOL_CONNECTIONS: 每个 Session 缓存的主机连接池数量，默认 4
+  - LLM_POOL_MAXSIZE: 每个主机连接池的最大连接数，默认 10
+  - LLM_POOL_MAXSIZE_<PROVIDER>: 针对单个提供方覆盖 LLM_POOL_MAXSIZE，如 LLM_POOL_MAXSIZE_GEMINI
+  - LLM_MAX_INFLIGHT: 单进程同时在途的 LLM 请求上限，默认 16
+  - LLM_INFLIGHT_WAIT: 等待在途名额的最长秒数，超时视为调用失败，默认 30
+  - LLM_LATENCY_WINDOW: 每个提供方保留的最近延迟样本数，默认 200
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import deque
+from . import llm_health
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:
+    requests = None  # type: ignore
+    HTTPAdapter = None  # type: ignore
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_inflight = None
+_inflight_lock = threading.Lock()
+_latencies = {}
+_latencies_lock = threading.Lock()
+
+
+# URL 查询串（Gemini 的 API key 以 ?key= 出现在请求 URL 中，requests 的异常信息会带上完整 URL）
+_QUERY_STRING = re.compile(r'\?[^\s\'"<>)]*')
+
+
+class LLMBusyError(Exception):
+    """在途 LLM 请求已达上限且等待超时。"""
+
+
+def redact(text: str) -> str:
+    """去掉文本中 URL 的查询串。"""
+    return _QUERY_STRING.sub('?<redacted>', text or '')
+
+
+def describe_error(e: Exception) -> str:
+    """用于熔断状态与日志的异常摘要：类型 + 信息（已去掉 URL 查询串）。"""
+    return f'{type(e).__name__}: {redact(str(e))}'
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def pooling_enabled() -> bool:
+    return os.getenv('LLM_HTTP_POOLING', '1') not in ('0', 'false', 'False', 'no')
+
+
+def get_session(provider: str):
+    """返回指定提供方的池化 Session（惰性创建，线程安全）。"""
+    if requests is None:
+        return None
+    session = _sessions.get(provider)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(provider)
+        if session is None:
+            pool_maxsize = _env_int(f'LLM_POOL_MAXSIZE_{provider.upper()}', _env_int('LLM_POOL_MAXSIZE', 10))
+            adapter = HTTPAdapter(
+                pool_connections=_env_int('LLM_POOL_CONNECTIONS', 4),
+                pool_maxsize=pool_maxsize,
+                pool_block=False,
+            )
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[provider] = session
+    return session
+
+
+def _inflight_semaphore():
+    global _inflight
+    if _inflight is None:
+        with _inflight_lock:
+            if _inflight is None:
+                _inflight = threading.BoundedSemaphore(max(1, _env_int('LLM_MAX_INFLIGHT', 16)))
+    return _inflight
+
+
+def post(provider: str, url: str, **kwargs):
+    """
+    以提供方的池化 Session 发送 POST 请求，参数与 requests.post 相同。
+
+    网络异常、超时、5xx 与 429 响应计入该提供方的熔断器；熔断打开时直接抛出，不发请求。
+
+    Raises:
+        ProviderUnavailableError: 提供方熔断器处于打开状态。
+        LLMBusyError: 等待在途名额超时。
+        requests.RequestException: 底层请求失败。
+    """
+    if requests is None:
+        raise RuntimeError('requests library not available')
+    if not llm_health.allow_request(provider):
+        raise llm_health.ProviderUnavailableError(f'{provider}: circuit open, skipping')
+    semaphore = _inflight_semaphore()
+    if not semaphore.acquire(timeout=_env_float('LLM_INFLIGHT_WAIT', 30)):
+        # 没有发出请求：若本次占用了半开探测，交还给下一个请求
+        llm_health.release_probe(provider)
+        raise LLMBusyError(f'{provider}: too many in-flight LLM requests')
+    started = time.perf_counter()
+    try:
+        if not pooling_enabled():
+            resp = requests.post(url, **kwargs)
+        else:
+            resp = get_session(provider).post(url, **kwargs)
+    except Exception as e:
+        llm_health.record_failure(provider, describe_error(e))
+        raise
+    finally:
+        semaphore.release()
+        record_latency(provider, time.perf_counter() - started)
+    if resp.status_code >= 500 or resp.status_code == 429:
+        llm_health.record_failure(provider, f'HTTP {resp.status_code}')
+    else:
+        llm_health.record_success(provider)
+    return resp
+
+
+def iter_sse(provider: str, url: str, **kwargs):
+    """
+    以流式 POST 请求提供方的 SSE 接口，逐个产出 `data:` 行的内容（字符串）。
+
+    整个流读取期间占用一个在途名额；连接失败、5xx/429 或读取中断计入熔断器。
+    响应为 2xx 时即计为成功（在产出首行之前），调用方读到 `[DONE]` 提前退出
+    也不影响半开探测的关闭。流式调用不计入延迟样本（耗时取决于输出长度）。
+
+    Raises:
+        ProviderUnavailableError: 提供方熔断器处于打开状态。
+        LLMBusyError: 等待在途名额超时。
+        requests.RequestException: 底层请求失败。
+    """
+    if requests is None:
+        raise RuntimeError('requests library not available')
+    if not llm_health.allow_request(provider):
+        raise llm_health.ProviderUnavailableError(f'{provider}: circuit open, skipping')
+    semaphore = _inflight_semaphore()
+    if not semaphore.acquire(timeout=_env_float('LLM_INFLIGHT_WAIT', 30)):
+        # 没有发出请求：若本次占用了半开探测，交还给下一个请求
+        llm_health.release_probe(provider)
+        raise LLMBusyError(f'{provider}: too many in-flight LLM requests')
+    try:
+        try:
+            sender = get_session(provider).post if pooling_enabled() else requests.post
+            resp = sender(url, stream=True, **kwargs)
+        except Exception as e:
+            llm_health.record_failure(provider, describe_error(e))
+            raise
+        with resp:
+            if resp.status_code >= 500 or resp.status_code == 429:
+                llm_health.record_failure(provider, f'HTTP {resp.status_code}')
+            resp.raise_for_status()
+            llm_health.record_success(provider)
+            resp.encoding = resp.encoding or 'utf-8'
+            try:
+                for line in resp.iter_lines(decode_unicode=True):
+                    if line and line.startswith('data:'):
+                        yield line[5:].strip()
+            except GeneratorExit:
+                raise
+            except Exception as e:
+                llm_health.record_failure(provider, describe_error(e))
+                raise
+    finally:
+        semaphore.release()
+
+
+def record_latency(provider: str, seconds: float):
+    """记录一次调用耗时（秒），保留最近 LLM_LATENCY_WINDOW 个样本。"""
+    with _latencies_lock:
+        samples = _latencies.get(provider)
+        if samples is None:
+            samples = _latencies[provider] = deque(maxlen=max(1, _env_int('LLM_LATENCY_WINDOW', 200)))
+        samples.append(seconds)
+
+
+def latency_sample_count(provider: str) -> int:
+    with _latencies_lock:
+        return len(_latencies.get(provider) or ())
+
+
+def latency_percentile(provider: str, pct: float, min_samples: int = 20):
+    """返回提供方最近调用耗时的百分位（秒）；样本不足时返回 None。"""
+    with _latencies_lock:
+        samples = sorted(_latencies.get(provider) or ())
+    if len(samples) < min_samples:
+        return None
+    index = min(len(samples) - 1, max(0, int(round(pct / 100.0 * len(samples))) - 1))
+    return samples[index]
+
+
+def reset_sessions():
+    """关闭并丢弃所有池化 Session，并按当前环境变量重建在途上限。"""
+    global _inflight
+    with _sessions_lock:
+        for session in _sessions.values():
+            try:
+                session.close()
+            except Exception as e:
+                logging.debug(f"Closing LLM session failed: {e}")
+        _sessions.clear()
+    with _inflight_lock:
+        _inflight = None
+
+
+def _reset_after_fork():
+    global _sessions_lock, _inflight_lock, _latencies_lock, _inflight
+    _sessions_lock = threading.Lock()
+    _inflight_lock = threading.Lock()
+    _latencies_lock = threading.Lock()
+    _sessions.clear()
+    _inflight = None
+
+
+# 子进程（如 gunicorn fork 出的 worker）不能复用父进程的套接字
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
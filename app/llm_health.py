@@ -0,0 +1,255 @@
+"""
+LLM 提供方熔断器与健康状态。
+
+每个提供方一个熔断器：连续失败/超时达到阈值后打开（open），冷却期内直接跳过该提供方；
+冷却结束后进入半开（half_open），只放行一个探测请求，成功则关闭（closed），失败则重新打开。
+
+状态默认保存在进程内；设置 LLM_HEALTH_DB 后保存在 SQLite 中，同一主机的所有 worker 共享。
+
+Env:
+  - LLM_BREAKER_ENABLED: 设为 0 关闭熔断，默认 1
+  - LLM_BREAKER_THRESHOLD: 连续失败多少次后打开，默认 3
+  - LLM_BREAKER_COOLDOWN: 打开后多少秒进入半开探测，默认 30
+  - LLM_BREAKER_PROBE_TIMEOUT: 半开探测多少秒未结束视为丢失，允许新的探测，默认 60
+  - LLM_HEALTH_DB: 共享状态的 SQLite 文件路径，可选
+"""
+import os
+import time
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_FIELDS = ('state', 'failures', 'opened_at', 'probe_started_at', 'last_error', 'updated_at')
+
+
+class ProviderUnavailableError(Exception):
+    """提供方熔断器处于打开状态，请求被直接跳过。"""
+
+
+def _new_state() -> dict:
+    return {'state': CLOSED, 'failures': 0, 'opened_at': 0.0, 'probe_started_at': 0.0,
+            'last_error': '', 'updated_at': 0.0}
+
+
+class _MemoryStore:
+    """进程内状态存储（线程间共享）。"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self, provider: str):
+        with self._lock:
+            yield self._states.setdefault(provider, _new_state())
+
+    def all(self) -> dict:
+        with self._lock:
+            return {name: dict(state) for name, state in self._states.items()}
+
+
+class _SQLiteStore:
+    """SQLite 状态存储（进程间共享），每次状态转换在 BEGIN IMMEDIATE 事务内完成。"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_provider_state ('
+                ' provider TEXT PRIMARY KEY, state TEXT NOT NULL, failures INTEGER NOT NULL,'
+                ' opened_at REAL NOT NULL, probe_started_at REAL NOT NULL,'
+                ' last_error TEXT NOT NULL, updated_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, provider: str):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                f'SELECT {", ".join(_FIELDS)} FROM llm_provider_state WHERE provider = ?', (provider,)
+            ).fetchone()
+            state = dict(zip(_FIELDS, row)) if row else _new_state()
+            yield state
+            conn.execute(
+                f'INSERT OR REPLACE INTO llm_provider_state (provider, {", ".join(_FIELDS)}) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (provider,) + tuple(state[f] for f in _FIELDS),
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def all(self) -> dict:
+        rows = self._conn().execute(
+            f'SELECT provider, {", ".join(_FIELDS)} FROM llm_provider_state'
+        ).fetchall()
+        return {row[0]: dict(zip(_FIELDS, row[1:])) for row in rows}
+
+
+class CircuitBreaker:
+    """按提供方名称管理熔断状态。存储层出错时放行请求（fail-open），避免熔断器自身成为故障点。"""
+
+    def __init__(self, store=None, threshold: int = 3, cooldown: float = 30, probe_timeout: float = 60):
+        self.store = store or _MemoryStore()
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+
+    def allow_request(self, provider: str) -> bool:
+        now = time.time()
+        try:
+            with self.store.transaction(provider) as st:
+                if st['state'] == CLOSED:
+                    return True
+                if st['state'] == OPEN:
+                    if now - st['opened_at'] < self.cooldown:
+                        return False
+                    st['state'] = HALF_OPEN
+                    st['probe_started_at'] = now
+                    st['updated_at'] = now
+                    logging.info(f"LLM breaker {provider}: half-open, sending probe")
+                    return True
+                # 半开：同一时间只允许一个探测请求
+                if now - st['probe_started_at'] >= self.probe_timeout:
+                    st['probe_started_at'] = now
+                    st['updated_at'] = now
+                    return True
+                return False
+        except sqlite3.Error as e:
+            logging.warning(f"LLM breaker state unavailable, allowing {provider}: {e}")
+            return True
+
+    def release_probe(self, provider: str):
+        """半开探测未能发出（如等待在途名额超时）时调用，允许下一个请求立即探测。"""
+        try:
+            with self.store.transaction(provider) as st:
+                if st['state'] == HALF_OPEN:
+                    st['probe_started_at'] = 0.0
+                    st['updated_at'] = time.time()
+        except sqlite3.Error as e:
+            logging.warning(f"LLM breaker update failed for {provider}: {e}")
+
+    def record_success(self, provider: str):
+        try:
+            with self.store.transaction(provider) as st:
+                if st['state'] != CLOSED:
+                    logging.info(f"LLM breaker {provider}: closed")
+                st['state'] = CLOSED
+                st['failures'] = 0
+                st['updated_at'] = time.time()
+        except sqlite3.Error as e:
+            logging.warning(f"LLM breaker update failed for {provider}: {e}")
+
+    def record_failure(self, provider: str, error: str = ''):
+        now = time.time()
+        try:
+            with self.store.transaction(provider) as st:
+                st['failures'] += 1
+                st['last_error'] = (error or '')[:500]
+                st['updated_at'] = now
+                if st['state'] == HALF_OPEN or st['failures'] >= self.threshold:
+                    if st['state'] != OPEN:
+                        logging.warning(f"LLM breaker {provider}: open after {st['failures']} failures ({error})")
+                    st['state'] = OPEN
+                    st['opened_at'] = now
+        except sqlite3.Error as e:
+            logging.warning(f"LLM breaker update failed for {provider}: {e}")
+
+    def states(self) -> dict:
+        try:
+            return self.store.all()
+        except sqlite3.Error as e:
+            logging.warning(f"LLM breaker state unavailable: {e}")
+            return {}
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv('LLM_BREAKER_ENABLED', '1') not in ('0', 'false', 'False', 'no')
+
+
+def get_breaker() -> CircuitBreaker:
+    """按环境变量惰性创建进程级熔断器。"""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                db_path = os.getenv('LLM_HEALTH_DB')
+                _breaker = CircuitBreaker(
+                    store=_SQLiteStore(db_path) if db_path else _MemoryStore(),
+                    threshold=int(os.getenv('LLM_BREAKER_THRESHOLD', '3')),
+                    cooldown=float(os.getenv('LLM_BREAKER_COOLDOWN', '30')),
+                    probe_timeout=float(os.getenv('LLM_BREAKER_PROBE_TIMEOUT', '60')),
+                )
+    return _breaker
+
+
+def reset_breaker():
+    global _breaker
+    with _breaker_lock:
+        _breaker = None
+
+
+def allow_request(provider: str) -> bool:
+    return not enabled() or get_breaker().allow_request(provider)
+
+
+def release_probe(provider: str):
+    if enabled():
+        get_breaker().release_probe(provider)
+
+
+def record_success(provider: str):
+    if enabled():
+        get_breaker().record_success(provider)
+
+
+def record_failure(provider: str, error: str = ''):
+    if enabled():
+        get_breaker().record_failure(provider, error)
+
+
+def snapshot(providers=('gemini', 'deepseek', 'hf')) -> dict:
+    """
+    返回各提供方的熔断状态与本进程内的滚动延迟，供运维查看。
+
+    Returns:
+        dict: {provider: {state, failures, last_error, opened_at, latency_p50_ms, latency_p95_ms, samples}}
+    """
+    from . import llm_client
+    states = get_breaker().states() if enabled() else {}
+    result = {}
+    for name in sorted(set(providers) | set(states)):
+        st = states.get(name) or _new_state()
+        p50 = llm_client.latency_percentile(name, 50, min_samples=1)
+        p95 = llm_client.latency_percentile(name, 95, min_samples=1)
+        result[name] = {
+            'state': st['state'],
+            'failures': st['failures'],
+            # 旧版本写入的记录可能含有 URL 查询串，读取时同样脱敏
+            'last_error': llm_client.redact(st['last_error']),
+            'opened_at': st['opened_at'] or None,
+            'latency_p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'latency_p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'samples': llm_client.latency_sample_count(name),
+        }
+    return result
@@ -1,5 +1,7 @@
 from . import db
 from datetime import datetime
+from sqlalchemy.orm import validates
+from .salary import parse_salary
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -13,7 +15,11 @@ class User(db.Model):
     password = db.Column(db.String(60), nullable=False)
     cv_file = db.Column(db.String(120))
     profile_photo = db.Column(db.String(120))
-    cv_data = db.Column(db.LargeBinary)  # 可选的简历二进制
+    # 简历二进制存放在 resume_blob 表（按内容寻址），User 行只保存哈希；
+    # 旧库中的 cv_data 列保留为延迟加载，由 migrate_cv_blobs.py 迁移后清空
+    legacy_cv_data = db.deferred(db.Column('cv_data', db.LargeBinary))
+    cv_sha256 = db.Column(db.String(64), db.ForeignKey('resume_blob.sha256'))
+    cv_blob = db.relationship('ResumeBlob', lazy='select')
     is_hr = db.Column(db.Boolean, default=False)  # HR标识
     user_type = db.Column(db.String(20), default='candidate')  # candidate, employee, supervisor, executive
     # 员工和高管相关字段
@@ -27,6 +33,31 @@ class User(db.Model):
     education = db.Column(db.Text)  # 教育经历
     experience = db.Column(db.Text)  # 工作经历
 
+    # 按角色筛选用户、主管查看下属
+    __table_args__ = (
+        db.Index('ix_user_user_type', 'user_type'),
+        db.Index('ix_user_supervisor_type', 'supervisor_id', 'user_type'),
+    )
+
+    @property
+    def cv_data(self):
+        """简历二进制（访问时才从 resume_blob 加载）"""
+        # 刚赋值、尚未 flush 时 cv_sha256 仍为空，直接看关系属性
+        blob = self.cv_blob
+        if blob is not None:
+            return blob.data
+        return self.legacy_cv_data
+
+    @property
+    def has_cv(self):
+        """是否有简历：已迁移的用户只看 cv_sha256，不加载简历二进制；未迁移的回退到旧列"""
+        return bool(self.cv_sha256) or self.cv_blob is not None or self.legacy_cv_data is not None
+
+    @cv_data.setter
+    def cv_data(self, value):
+        self.legacy_cv_data = None
+        self.cv_blob = ResumeBlob.get_or_create(value) if value else None
+
 class Job(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -35,10 +66,16 @@ class Job(db.Model):
     description = db.Column(db.Text, nullable=False)
     requirements = db.Column(db.Text, nullable=True)
     salary = db.Column(db.String(50), nullable=False)
+    # 由 salary 文本解析（app/salary.py）：折算为月薪的整数区间（元）与原文计薪周期，供薪资筛选
+    salary_min = db.Column(db.Integer)
+    salary_max = db.Column(db.Integer)
+    salary_period = db.Column(db.String(10))  # month、year、day、hour
     job_type = db.Column(db.String(20), nullable=True, default='全职')  # 全职、兼职、实习、远程
     experience_level = db.Column(db.String(20), nullable=True, default='不限')  # 初级、中级、高级、专家
     date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # 每次通过 ORM 修改时更新，供其它进程发现职位编辑（见 change_signature）
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     # HR 扩展字段
     positions_needed = db.Column(db.Integer, nullable=False, default=1)
@@ -53,6 +90,26 @@ class Job(db.Model):
     application_deadline = db.Column(db.DateTime)
     department = db.Column(db.String(100))
 
+    # 薪资区间筛选：salary_min 参数对应 salary_max >= ?，salary_max 参数对应 salary_min <= ?
+    __table_args__ = (
+        db.Index('ix_job_salary_max_min', 'salary_max', 'salary_min'),
+        db.Index('ix_job_salary_min_max', 'salary_min', 'salary_max'),
+        db.Index('ix_job_user_date_posted', 'user_id', 'date_posted'),
+        db.Index('ix_job_updated_at', 'updated_at'),
+    )
+
+    @validates('salary')
+    def _parse_salary(self, key, value):
+        self.salary_min, self.salary_max, self.salary_period = parse_salary(value)
+        return value
+
+    @staticmethod
+    def change_signature():
+        """职位表状态摘要（行数、最大 ID、最近发布时间、最近修改时间），进程内快照据此发现其它进程的发布/编辑/删除。"""
+        row = db.session.execute(db.text(
+            'SELECT COUNT(*), MAX(id), MAX(date_posted), MAX(updated_at) FROM job')).fetchone()
+        return (row[0], row[1], str(row[2]), str(row[3]))
+
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -64,7 +121,11 @@ class Application(db.Model):
 
     user = db.relationship('User', backref=db.backref('applications', lazy=True))
     job = db.relationship('Job', backref=db.backref('applications', lazy=True))
-    __table_args__ = (db.UniqueConstraint('user_id', 'job_id', name='unique_user_job_application'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'job_id', name='unique_user_job_application'),
+        db.Index('ix_application_user_active_time', 'user_id', 'is_active', 'timestamp'),
+        db.Index('ix_application_job_status', 'job_id', 'status'),
+    )
 
 class Feedback(db.Model):
     """反馈系统数据模型"""
@@ -83,6 +144,10 @@ class Feedback(db.Model):
     # 关系
     sender = db.relationship('User', foreign_keys=[sender_id], backref=db.backref('sent_feedback', lazy=True))
     recipient = db.relationship('User', foreign_keys=[recipient_id], backref=db.backref('received_feedback', lazy=True))
+    __table_args__ = (
+        db.Index('ix_feedback_sender_created', 'sender_id', 'created_at'),
+        db.Index('ix_feedback_recipient_status', 'recipient_id', 'status'),
+    )
 
 class FeedbackNotification(db.Model):
     """反馈通知数据模型"""
@@ -98,6 +163,7 @@ class FeedbackNotification(db.Model):
     # 关系
     user = db.relationship('User', backref=db.backref('feedback_notifications', lazy=True))
     feedback = db.relationship('Feedback', backref=db.backref('notifications', lazy=True))
+    __table_args__ = (db.Index('ix_feedback_notification_user_read_created', 'user_id', 'is_read', 'created_at'),)
 
 class TaskEvaluation(db.Model):
     """任务绩效评价数据模型"""
@@ -116,4 +182,89 @@ class TaskEvaluation(db.Model):
 
     evaluator = db.relationship('User', foreign_keys=[evaluator_id], backref=db.backref('given_evaluations', lazy=True))
     employee = db.relationship('User', foreign_keys=[employee_id], backref=db.backref('task_evaluations', lazy=True))
+    __table_args__ = (
+        db.Index('ix_task_evaluation_evaluator_created', 'evaluator_id', 'created_at'),
+        db.Index('ix_task_evaluation_employee_created', 'employee_id', 'created_at'),
+    )
+
+
+class ResumeText(db.Model):
+    """简历文本缓存：按文件内容 SHA-256 保存提取结果，文件或提取器版本变化时才重新提取"""
+    __tablename__ = 'resume_text'
+    sha256 = db.Column(db.String(64), primary_key=True)  # 文件字节的 SHA-256
+    text = db.Column(db.Text, nullable=False, default='')  # 提取出的文本
+    page_count = db.Column(db.Integer, nullable=False, default=0)  # 页数（DOCX 等按 1 计）
+    extractor_version = db.Column(db.String(64), nullable=False)  # 提取器版本，变化后缓存失效
+    extracted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class ResumeBlob(db.Model):
+    """简历文件二进制，按内容 SHA-256 去重存储，仅在访问 User.cv_data 时加载"""
+    __tablename__ = 'resume_blob'
+    sha256 = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @classmethod
+    def get_or_create(cls, data: bytes):
+        import hashlib
+        digest = hashlib.sha256(data).hexdigest()
+        blob = cls.query.get(digest)
+        if blob is None:
+            blob = cls(sha256=digest, data=data, size=len(data))
+            db.session.add(blob)
+        return blob
+
+    @classmethod
+    def purge_orphans(cls) -> int:
+        """删除没有用户引用的简历二进制，返回删除条数"""
+        referenced = db.session.query(User.cv_sha256).filter(User.cv_sha256.isnot(None))
+        deleted = cls.query.filter(~cls.sha256.in_(referenced)).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+class JobEmbedding(db.Model):
+    """职位描述的语义向量（float32），发布/编辑职位时计算一次"""
+    __tablename__ = 'job_embedding'
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True)
+    model = db.Column(db.String(100), nullable=False)  # 生成向量的模型名，换模型后需重新计算
+    dim = db.Column(db.Integer, nullable=False)
+    vector = db.Column(db.LargeBinary, nullable=False)  # float32 小端字节
+    text_hash = db.Column(db.String(64), nullable=False)  # 参与编码文本的 SHA-256，内容未变时跳过重算
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class CandidateEmbedding(db.Model):
+    """候选人简历文本的语义向量（float32），简历处理任务中计算，用于 HR 端按职位检索候选人"""
+    __tablename__ = 'candidate_embedding'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    model = db.Column(db.String(100), nullable=False)
+    dim = db.Column(db.Integer, nullable=False)
+    vector = db.Column(db.LargeBinary, nullable=False)  # float32 小端字节
+    text_hash = db.Column(db.String(64), nullable=False)  # 简历文本的 SHA-256
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class JobSkill(db.Model):
+    """职位描述中提取的技能关键词（发布/编辑职位时写入），推荐时直接读取，不再逐次解析描述"""
+    __tablename__ = 'job_skill'
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True)
+    skill = db.Column(db.String(100), primary_key=True)  # 技能 ID（小写，见 app/skill_matcher.py）
+    category = db.Column(db.String(50))
+    __table_args__ = (db.Index('ix_job_skill_skill', 'skill'),)
+
 
+class JobRecommendation(db.Model):
+    """
+    离线批量计算的职位推荐（scripts/precompute_recommendations.py），每个候选人保存前 N 个职位；
+    在线推荐在用户资料未变化时直接读取。没有达标职位的用户保存一行 rank=0、job_id 为空的记录。
+    """
+    __tablename__ = 'job_recommendation'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)  # 从 1 开始的名次
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'))
+    score = db.Column(db.Float)
+    profile_hash = db.Column(db.String(40), nullable=False)  # 计算时的用户指纹，资料变化后失效
+    jobs_signature = db.Column(db.String(40), nullable=False)  # 计算时职位表的摘要，职位变化后需重算
+    expires_at = db.Column(db.DateTime)  # 新职位提升窗口变化的时刻（UTC），之后需重算
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,60 @@
+"""
+职位薪资文本解析。
+
+Job.salary 是 HR 填写的自由文本（「15k-25k」「1.5万/月」「200元/天」「30-50万/年」「面议」），
+发布/编辑时（Job 模型的 salary 校验钩子）解析为结构化字段：
+
+  - salary_min / salary_max: 折算为月薪的整数（元），用于区间筛选（有索引）
+  - salary_period: 原文的计薪周期 month / year / day / hour
+
+规则：
+  - k/K/千 乘 1000，w/W/万 乘 10000；区间只在后一个数带单位时（「15-25k」）两端共用该单位
+  - 计薪周期取紧跟在薪资数字后的「/年」「元/天」「每月」等，否则取最早出现的「年薪」「月薪」「日薪」「时薪」；
+    「年终奖」「2-3年经验」等其它位置的「年」不算
+  - 年薪除以 12，日薪乘 21.75，时薪乘 8 × 21.75
+  - 没有单位也没有周期、且小于 1000 的数视为千元（招聘中「15-25」即 15k-25k）
+  - 「15k以上」「5k以下」等单边范围上下限取同一个值；「·14薪」等后缀、工作年限要求忽略
+  - 「面议」、空文本或没有数字时三个字段均为 None
+"""
+import re
+
+_UNITS = {'k': 1000, 'K': 1000, '千': 1000, 'w': 10000, 'W': 10000, '万': 10000}
+_NUMBER = re.compile(r'(\d+(?:\.\d+)?)\s*([kK千wW万])?')
+_PERIOD_WORDS = (
+    ('year', r'年|y(?:ea)?r'),
+    ('day', r'天|日|day'),
+    ('hour', r'小时|时|h(?:ou)?r'),
+    ('month', r'月|mo(?:nth)?'),
+)
+# 紧跟在最后一个薪资数字（含单位）之后的周期：「/月」「元/天」「万/年」「每月」「per month」
+_PERIOD_AFTER = re.compile(r'\s*(?:元|块|rmb)?\s*(?:/|每|per\s+)\s*(?:'
+                           + '|'.join(f'(?P<{name}>{words})' for name, words in _PERIOD_WORDS) + ')', re.I)
+# 不紧跟数字时，只认明确修饰薪资的写法，取最早出现的一个
+_PERIOD_QUALIFIER = re.compile(r'(?P<year>年薪|年收入|annual|yearly)|(?P<day>日薪|daily)|(?P<hour>时薪|hourly)'
+                               r'|(?P<month>月薪|monthly)', re.I)
+# 「2-3年经验」「经验 5 年以上」中的数字不是薪资
+_EXPERIENCE = re.compile(r'\d+(?:\s*[-~～至到]\s*\d+)?\s*年\s*(?:以上|以下)?\s*(?:工作|相关)?\s*经验'
+                         r'|经验\s*\d+(?:\s*[-~～至到]\s*\d+)?\s*年(?:以上|以下)?')
+_BONUS_MONTHS = re.compile(r'[·xX×*]?\s*\d+\s*薪')
+_MONTHLY_FACTOR = {'month': 1, 'year': 1 / 12, 'day': 21.75, 'hour': 8 * 21.75}
+
+
+def parse_salary(text):
+    """解析薪资文本，返回 (salary_min, salary_max, salary_period)；无法解析时为 (None, None, None)。"""
+    text = str(text or '').replace(',', '').replace('，', ' ')
+    text = _EXPERIENCE.sub(' ', _BONUS_MONTHS.sub('', text))
+    matches = list(_NUMBER.finditer(text))[:2]
+    if not matches:
+        return None, None, None
+    numbers = [(float(match.group(1)), _UNITS.get(match.group(2))) for match in matches]
+    period = _PERIOD_AFTER.match(text, matches[-1].end()) or _PERIOD_QUALIFIER.search(text)
+    period = period.lastgroup if period else None
+    has_unit = any(unit for _, unit in numbers)
+    if len(numbers) == 2 and numbers[0][1] is None:
+        numbers[0] = (numbers[0][0], numbers[1][1])
+    values = [value * (unit or 1) for value, unit in numbers]
+    if not has_unit and period is None and max(values) < 1000:
+        values = [value * 1000 for value in values]
+    factor = _MONTHLY_FACTOR[period or 'month']
+    low, high = sorted(int(round(value * factor)) for value in (values if len(values) == 2 else values * 2))
+    return low, high, period or 'month'
@@ -0,0 +1,207 @@
+"""
+技能关键词匹配（Aho–Corasick 多模式自动机）。
+
+各模块的技能词典（招聘推荐 SKILL_CATEGORIES / CHINESE_SKILLS、学习推荐的分级技能表、
+员工资料的技能关键词）合并编译为一个自动机，进程内只构建一次；对一段文本单次扫描即可得到
+全部命中的技能，复杂度 O(文本长度 + 命中数)，不再随词典大小线性增长。
+
+匹配规则：
+  - 不区分大小写，技能 ID 为小写、空白折叠后的技能名（如 'sql server'）
+  - 以英文字母/数字开头（结尾）的技能，要求前（后）一个字符不是英文字母/数字，
+    避免 'r'、'go'、'java' 命中 'docker'、'google'、'javascript'；中文技能按子串匹配
+  - 同一技能可能出现在多个词典中，每条命中带有 (source, category) 以便调用方按词典过滤
+
+安装 pyahocorasick 时由其 C 实现完成扫描；纯 Python 自动机在 CPython 下逐字符循环，
+对当前规模（数百个技能）的词典并不比逐词 `in` 快，只在词典增长后才有优势。
+"""
+import re
+import threading
+from collections import deque, namedtuple
+try:
+    import ahocorasick  # type: ignore
+except Exception:
+    ahocorasick = None  # type: ignore
+
+SkillEntry = namedtuple('SkillEntry', 'skill_id label source category')
+
+# 英文字母/数字连续段；在每段两侧插入边界标记后，以字母/数字开头（结尾）的模式
+# 自然只能在词边界处命中，扫描时无需逐条命中再检查前后字符
+_WORD_RUN = re.compile(r'([a-z0-9]+)')
+_BOUNDARY = '\x00'
+
+# 员工资料/智能目标模块共用的技能关键词（保留原有大小写作为展示名）
+PROFILE_SKILL_KEYWORDS = [
+    'Python', 'Java', 'JavaScript', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust', 'Swift',
+    'HTML', 'CSS', 'React', 'Vue', 'Angular', 'Node.js', 'Django', 'Flask', 'Spring',
+    'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Oracle', 'SQL Server',
+    'Docker', 'Kubernetes', 'AWS', 'Azure', 'Google Cloud', 'Linux', 'Windows',
+    'Git', 'SVN', 'Jenkins', 'CI/CD', 'Agile', 'Scrum', 'DevOps',
+    'Machine Learning', 'AI', 'Data Science', 'Big Data', 'Hadoop', 'Spark',
+    'Excel', 'PowerBI', 'Tableau', 'Photoshop', 'Illustrator', 'Figma',
+    '项目管理', '团队协作', '沟通能力', '领导力', '创新思维', '问题解决'
+]
+
+
+def skill_id(label: str) -> str:
+    return ' '.join(str(label).lower().split())
+
+
+def _mark_boundaries(text: str) -> str:
+    """'Go/C++' -> '\\0go\\0/\\0c\\0++'：在每个英文字母/数字段两侧插入边界标记。"""
+    return _BOUNDARY.join(_WORD_RUN.split(text.lower()))
+
+
+class SkillMatcher:
+    """
+    由 (技能名, source, category) 编译的 Aho–Corasick 自动机，构建后只读，可多线程共享。
+
+    安装了 pyahocorasick 时使用其 C 实现扫描；否则使用纯 Python 的 goto/fail 自动机（结果相同）。
+    """
+
+    def __init__(self, entries, backend: str = None):
+        by_pattern = {}
+        seen = set()
+        for label, source, category in entries:
+            sid = skill_id(label)
+            key = (sid, source, category)
+            if not sid or key in seen:
+                continue
+            seen.add(key)
+            by_pattern.setdefault(_mark_boundaries(sid), []).append(SkillEntry(sid, label, source, category))
+        self.size = len(seen)
+        use_c = ahocorasick is not None and backend != 'python'
+        self.backend = 'pyahocorasick' if use_c else 'python'
+        self._automaton = None
+        if use_c:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, items in by_pattern.items():
+                self._automaton.add_word(pattern, tuple(items))
+            self._automaton.make_automaton()
+        else:
+            self._goto = [{}]
+            self._fail = [0]
+            self._out = [[]]  # 每个状态上结束的模式输出 (SkillEntry, ...)
+            for pattern, items in by_pattern.items():
+                self._insert(pattern, tuple(items))
+            self._build_failure_links()
+
+    def _insert(self, pattern: str, items: tuple):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(items)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # 合并后缀状态的输出，扫描时无需再沿失败链收集
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text: str):
+        """产出文本中每次命中的 (SkillEntry, ...)（可能重叠、重复）。"""
+        marked = _mark_boundaries(text)
+        if self._automaton is not None:
+            for _, items in self._automaton.iter(marked):
+                yield items
+            return
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in marked:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            yield from out[state]
+
+    def find_all(self, text: str, sources=None) -> list:
+        """返回每次命中的 SkillEntry（按出现顺序，含重复）。"""
+        if not text:
+            return []
+        return [entry for items in self._scan(text) for entry in items
+                if sources is None or entry.source in sources]
+
+    def extract(self, text: str, sources=None, labels: bool = False) -> list:
+        """
+        返回文本中出现的技能（去重，按首次出现顺序）。
+
+        Args:
+            sources (set): 只统计这些词典中的技能，None 表示全部。
+            labels (bool): True 返回词典中的原始写法，False 返回小写技能 ID。
+        """
+        if not text:
+            return []
+        found = {}
+        for items in self._scan(text):
+            sid = items[0].skill_id
+            if sid in found:
+                continue
+            for entry in items:
+                if sources is None or entry.source in sources:
+                    found[sid] = entry.label if labels else sid
+                    break
+        return list(found.values())
+
+    def categorize(self, text: str, sources=None) -> dict:
+        """返回 {技能 ID: {(source, category), ...}}。"""
+        result = {}
+        for entry in self.find_all(text, sources):
+            result.setdefault(entry.skill_id, set()).add((entry.source, entry.category))
+        return result
+
+
+# --- 共享实例 ---
+
+RECRUIT = 'recruit'      # 招聘推荐：SKILL_CATEGORIES + CHINESE_SKILLS
+LEARNING = 'learning'    # 员工学习推荐：分级技能表
+PROFILE = 'profile'      # 员工资料/智能目标：PROFILE_SKILL_KEYWORDS
+
+
+def default_entries():
+    """汇总各模块技能词典；在首次匹配时导入，避免 app 与蓝图包之间的循环导入。"""
+    from smartrecruit_system.candidate_module.recommendation_config import SKILL_CATEGORIES, CHINESE_SKILLS
+    from talent_management_system.employee_manager_module.learning_recommendation import (
+        SKILL_CATEGORIES as LEARNING_SKILL_CATEGORIES,
+    )
+    for category, skills in SKILL_CATEGORIES.items():
+        for skill in skills:
+            yield skill, RECRUIT, category
+    for category, skills in CHINESE_SKILLS.items():
+        for skill in skills:
+            yield skill, RECRUIT, category
+    for category, subcategories in LEARNING_SKILL_CATEGORIES.items():
+        for subcategory, skills in subcategories.items():
+            for skill in skills:
+                yield skill, LEARNING, f'{category}.{subcategory}'
+    for skill in PROFILE_SKILL_KEYWORDS:
+        yield skill, PROFILE, None
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher() -> SkillMatcher:
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(default_entries())
+    return _matcher
+
+
+def extract_skills(text: str, source: str = None, labels: bool = False) -> list:
+    """在共享自动机上提取技能；source 为 RECRUIT / LEARNING / PROFILE 之一或 None（全部）。"""
+    return get_matcher().extract(text, sources={source} if source else None, labels=labels)
@@ -0,0 +1,344 @@
+"""
+持久化的本地后台任务队列（SQLite）。
+
+Web 请求只负责 enqueue 写入一行任务并立即返回；worker 轮询领取任务并执行已注册的处理函数。
+run.py 默认在 Web 进程内启动一个后台 worker 线程（start_embedded_worker），也可以关闭它，
+改为单独运行 scripts/task_worker.py（可多实例）。失败的任务按指数退避重试，超过最大次数后标记为 failed。
+领取后长时间未完成的任务（worker 崩溃）会在可见性超时后被重新领取。
+
+任务状态：queued -> running -> succeeded / failed（重试期间回到 queued）。
+
+Env:
+  - TASK_QUEUE_DB: 队列 SQLite 文件路径，默认 <项目根目录>/instance/task_queue.db
+  - TASK_QUEUE_EAGER: 设为 1 时 enqueue 直接在当前进程同步执行（开发/测试用），默认 0
+  - TASK_MAX_ATTEMPTS: 默认最大尝试次数，默认 3
+  - TASK_RETRY_BACKOFF: 首次重试等待秒数，之后每次翻倍，默认 10
+  - TASK_RETRY_BACKOFF_MAX: 单次重试等待上限（秒），默认 600
+  - TASK_VISIBILITY_TIMEOUT: running 超过多少秒视为 worker 丢失，可被重新领取，默认 900
+  - TASK_POLL_INTERVAL: worker 空闲时的轮询间隔（秒），默认 1
+  - TASK_WORKER_EMBEDDED: 设为 0 时 run.py 不在 Web 进程内启动 worker 线程（改用独立 worker），默认 1
+"""
+import os
+import json
+import time
+import socket
+import logging
+import sqlite3
+import threading
+import traceback
+from contextlib import contextmanager
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+_FIELDS = ('id', 'kind', 'payload', 'user_id', 'status', 'attempts', 'max_attempts', 'run_after',
+           'locked_by', 'locked_at', 'result', 'last_error', 'created_at', 'updated_at')
+
+_handlers = {}
+
+
+class UnknownTaskError(Exception):
+    """任务类型没有注册处理函数。"""
+
+
+def register(kind: str):
+    """注册任务处理函数的装饰器，处理函数签名为 fn(payload: dict) -> 可 JSON 序列化的结果。"""
+    def decorator(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _default_db_path() -> str:
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.getenv('TASK_QUEUE_DB') or os.path.join(base_dir, 'instance', 'task_queue.db')
+
+
+def retry_delay(attempts: int) -> float:
+    """第 attempts 次失败后的重试等待秒数（指数退避，带上限）。"""
+    base = _env_float('TASK_RETRY_BACKOFF', 10)
+    return min(base * (2 ** max(0, attempts - 1)), _env_float('TASK_RETRY_BACKOFF_MAX', 600))
+
+
+class TaskQueue:
+    """SQLite 任务表的读写封装，线程安全（每线程一个连接），可被多个进程同时使用。"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS background_job ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL,'
+                ' user_id INTEGER, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,'
+                ' max_attempts INTEGER NOT NULL, run_after REAL NOT NULL,'
+                ' locked_by TEXT, locked_at REAL, result TEXT, last_error TEXT,'
+                ' created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_background_job_ready ON background_job (status, run_after)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_background_job_user ON background_job (user_id, kind, id)')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _row_to_job(row) -> dict:
+        job = dict(zip(_FIELDS, row))
+        job['payload'] = json.loads(job['payload'] or '{}')
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def enqueue(self, kind: str, payload: dict, user_id: int = None, max_attempts: int = None) -> int:
+        now = time.time()
+        if max_attempts is None:
+            max_attempts = int(_env_float('TASK_MAX_ATTEMPTS', 3))
+        with self._transaction() as conn:
+            cur = conn.execute(
+                'INSERT INTO background_job (kind, payload, user_id, status, attempts, max_attempts,'
+                ' run_after, created_at, updated_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)',
+                (kind, json.dumps(payload, ensure_ascii=False), user_id, QUEUED, max(1, max_attempts), now, now, now),
+            )
+            return cur.lastrowid
+
+    def claim(self, worker_id: str, job_id: int = None):
+        """领取一个到期的任务（或指定 job_id）并标记为 running；没有可执行任务时返回 None。"""
+        now = time.time()
+        stale_before = now - _env_float('TASK_VISIBILITY_TIMEOUT', 900)
+        where = '((status = ? AND run_after <= ?) OR (status = ? AND locked_at < ?))'
+        params = (QUEUED, now, RUNNING, stale_before)
+        if job_id is not None:
+            where += ' AND id = ?'
+            params += (job_id,)
+        with self._transaction() as conn:
+            row = conn.execute(
+                f'SELECT {", ".join(_FIELDS)} FROM background_job WHERE {where} ORDER BY run_after, id LIMIT 1',
+                params,
+            ).fetchone()
+            if row is None:
+                return None
+            job = self._row_to_job(row)
+            conn.execute(
+                'UPDATE background_job SET status = ?, attempts = attempts + 1, locked_by = ?, locked_at = ?,'
+                ' updated_at = ? WHERE id = ?',
+                (RUNNING, worker_id, now, now, job['id']),
+            )
+        job.update(status=RUNNING, attempts=job['attempts'] + 1, locked_by=worker_id, locked_at=now)
+        return job
+
+    def complete(self, job_id: int, result=None):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                'UPDATE background_job SET status = ?, result = ?, last_error = NULL, locked_by = NULL,'
+                ' locked_at = NULL, updated_at = ? WHERE id = ?',
+                (SUCCEEDED, json.dumps(result, ensure_ascii=False), now, job_id),
+            )
+
+    def fail(self, job_id: int, error: str):
+        """记录一次失败：未达最大次数则按退避时间重新排队，否则标记为 failed。"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute('SELECT attempts, max_attempts FROM background_job WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return
+            attempts, max_attempts = row
+            if attempts < max_attempts:
+                status, run_after = QUEUED, now + retry_delay(attempts)
+            else:
+                status, run_after = FAILED, now
+            conn.execute(
+                'UPDATE background_job SET status = ?, run_after = ?, last_error = ?, locked_by = NULL,'
+                ' locked_at = NULL, updated_at = ? WHERE id = ?',
+                (status, run_after, (error or '')[:2000], now, job_id),
+            )
+
+    def get(self, job_id: int):
+        row = self._conn().execute(
+            f'SELECT {", ".join(_FIELDS)} FROM background_job WHERE id = ?', (job_id,)
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def latest(self, kind: str, user_id: int):
+        row = self._conn().execute(
+            f'SELECT {", ".join(_FIELDS)} FROM background_job WHERE kind = ? AND user_id = ?'
+            ' ORDER BY id DESC LIMIT 1',
+            (kind, user_id),
+        ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def counts(self) -> dict:
+        rows = self._conn().execute('SELECT status, COUNT(*) FROM background_job GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def purge_finished(self, older_than: float) -> int:
+        """删除早于 older_than 秒前结束的 succeeded/failed 任务，返回删除行数。"""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                'DELETE FROM background_job WHERE status IN (?, ?) AND updated_at < ?',
+                (SUCCEEDED, FAILED, time.time() - older_than),
+            )
+            return cur.rowcount
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> TaskQueue:
+    """按环境变量惰性创建进程级队列实例。"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = TaskQueue(_default_db_path())
+    return _queue
+
+
+def reset_queue():
+    global _queue
+    with _queue_lock:
+        _queue = None
+
+
+def eager() -> bool:
+    return os.getenv('TASK_QUEUE_EAGER', '0') in ('1', 'true', 'True', 'yes')
+
+
+def enqueue(kind: str, payload: dict, user_id: int = None, max_attempts: int = None) -> int:
+    """
+    写入一个任务并返回任务 ID。TASK_QUEUE_EAGER=1 时在当前进程内立即执行（含重试）。
+
+    Raises:
+        UnknownTaskError: 任务类型没有注册处理函数。
+    """
+    if kind not in _handlers:
+        raise UnknownTaskError(kind)
+    queue = get_queue()
+    job_id = queue.enqueue(kind, payload, user_id=user_id, max_attempts=max_attempts)
+    if eager():
+        # 同步执行时忽略退避等待，直接用完重试次数
+        while True:
+            with queue._transaction() as conn:
+                conn.execute('UPDATE background_job SET run_after = 0 WHERE id = ?', (job_id,))
+            job = queue.claim('eager', job_id=job_id)
+            if job is None or run_job(queue, job) != QUEUED:
+                break
+    return job_id
+
+
+def get_job(job_id: int):
+    return get_queue().get(job_id)
+
+
+def latest_job(kind: str, user_id: int):
+    return get_queue().latest(kind, user_id)
+
+
+def job_status(job) -> dict:
+    """供状态接口返回的任务视图（不包含 payload 与内部锁字段）。"""
+    if job is None:
+        return None
+    return {
+        'id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'attempts': job['attempts'],
+        'max_attempts': job['max_attempts'],
+        'result': job['result'],
+        'error': job['last_error'] if job['status'] == FAILED else None,
+        'retry_at': job['run_after'] if job['status'] == QUEUED and job['attempts'] else None,
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+    }
+
+
+def run_job(queue: TaskQueue, job: dict) -> str:
+    """执行一个已领取的任务并记录结果，返回任务的新状态。"""
+    handler = _handlers.get(job['kind'])
+    try:
+        if handler is None:
+            raise UnknownTaskError(job['kind'])
+        result = handler(job['payload'])
+    except Exception as e:
+        logging.warning(f"Task {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {e}")
+        queue.fail(job['id'], f'{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}')
+        refreshed = queue.get(job['id'])
+        return refreshed['status'] if refreshed else FAILED
+    queue.complete(job['id'], result)
+    return SUCCEEDED
+
+
+def run_worker(app=None, once: bool = False, stop_event: threading.Event = None, worker_id: str = None):
+    """
+    worker 主循环：领取任务并在 app 上下文中执行。
+
+    Args:
+        app (Flask): 处理函数需要访问数据库时传入应用实例。
+        once (bool): 处理完当前所有到期任务后返回（用于 cron/测试）。
+        stop_event (threading.Event): 设置后在当前任务完成时退出。
+        worker_id (str): 写入 locked_by 的标识，默认 主机名:进程号。
+    """
+    queue = get_queue()
+    worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+    poll_interval = _env_float('TASK_POLL_INTERVAL', 1)
+    processed = 0
+    while not (stop_event and stop_event.is_set()):
+        job = queue.claim(worker_id)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        if app is not None:
+            with app.app_context():
+                status = run_job(queue, job)
+        else:
+            status = run_job(queue, job)
+        processed += 1
+        logging.info(f"Task {job['id']} ({job['kind']}) -> {status}")
+    return processed
+
+
+def embedded_worker_enabled() -> bool:
+    return os.getenv('TASK_WORKER_EMBEDDED', '1') not in ('0', 'false', 'False', 'no')
+
+
+def start_embedded_worker(app, stop_event: threading.Event = None):
+    """
+    在当前进程内启动一个守护线程运行 worker 主循环，保证没有独立 worker 时任务也会被执行。
+
+    TASK_WORKER_EMBEDDED=0 时不启动并返回 None；与独立 worker 同时运行也安全（领取是原子的）。
+    """
+    if not embedded_worker_enabled():
+        return None
+    worker_id = f'{socket.gethostname()}:{os.getpid()}:embedded'
+    thread = threading.Thread(target=run_worker, name='task-worker', daemon=True,
+                              kwargs={'app': app, 'stop_event': stop_event, 'worker_id': worker_id})
+    thread.start()
+    logging.info(f"Embedded task worker started ({worker_id})")
+    return thread
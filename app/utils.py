@@ -9,15 +9,20 @@ except Exception:
 import json
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from . import llm_client
+from . import llm_cache
+from . import extraction
+from . import embeddings
 try:
     import pdfplumber  # type: ignore
 except Exception:
     pdfplumber = None  # type: ignore
 try:
-    from sentence_transformers import SentenceTransformer, util  # type: ignore
+    from sentence_transformers import SentenceTransformer  # type: ignore
 except Exception:
     SentenceTransformer = None  # type: ignore
-    util = None  # type: ignore
 
 # Lazily initialize the sentence transformer model to avoid network/download at import time
 model = None
@@ -29,7 +34,7 @@ def get_sentence_transformer():
     if SentenceTransformer is None:
         return None
     try:
-        model = SentenceTransformer('multi-qa-mpnet-base-dot-v1')
+        model = SentenceTransformer(embeddings.model_name())
         return model
     except Exception as e:
         logging.warning(f"SentenceTransformer load failed: {e}")
@@ -37,7 +42,36 @@ def get_sentence_transformer():
         return None
 logging.basicConfig(level=logging.DEBUG)
 
+def _deepseek_model():
+    return os.getenv('DEEPSEEK_MODEL', 'deepseek-chat')
+
+def _gemini_model():
+    return os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
+
+def _hf_model():
+    try:
+        return current_app.config.get('API_URL') or ''
+    except RuntimeError:
+        return os.getenv('API_URL', '')
+
+# 各调用点的 LLM 响应缓存有效期（秒），可用 LLM_CACHE_TTL_<SITE> 覆盖
+LLM_CACHE_TTLS = {
+    'interview_questions': 7 * 86400,
+    'feedback': 86400,
+    'skills': 30 * 86400,
+    'resume_analysis': 30 * 86400,
+    'vi_questions': 86400,
+    'vi_score': 86400,
+}
+
+def llm_cache_ttl(site: str) -> int:
+    try:
+        return int(os.getenv(f'LLM_CACHE_TTL_{site.upper()}', LLM_CACHE_TTLS.get(site, llm_cache.DEFAULT_TTL)))
+    except ValueError:
+        return LLM_CACHE_TTLS.get(site, llm_cache.DEFAULT_TTL)
+
 # --- Minimal DeepSeek text generation integration (env-based, optional) ---
+@llm_cache.cached('deepseek', _deepseek_model)
 def _deepseek_generate(prompt: str, max_tokens: int = 800):
     """
     Generate text via DeepSeek chat API if DEEPSEEK_API_KEY is set.
@@ -53,7 +87,7 @@ def _deepseek_generate(prompt: str, max_tokens: int = 800):
     if not api_key:
         return None
     api_url = os.getenv('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1/chat/completions')
-    model = os.getenv('DEEPSEEK_MODEL', 'deepseek-chat')
+    model = _deepseek_model()
     try:
         headers = {
             'Authorization': f'Bearer {api_key}',
@@ -65,7 +99,7 @@ def _deepseek_generate(prompt: str, max_tokens: int = 800):
             'stream': False,
             'max_tokens': max_tokens
         }
-        resp = requests.post(api_url, headers=headers, json=payload, timeout=30)
+        resp = llm_client.post('deepseek', api_url, headers=headers, json=payload, timeout=30)
         resp.raise_for_status()
         data = resp.json()
         choices = data.get('choices') or []
@@ -75,10 +109,11 @@ def _deepseek_generate(prompt: str, max_tokens: int = 800):
         content = message.get('content')
         return content.strip() if isinstance(content, str) else None
     except Exception as e:
-        logging.warning(f"DeepSeek generation failed: {e}")
+        logging.warning(f"DeepSeek generation failed: {llm_client.describe_error(e)}")
         return None
 
 # --- Minimal Google Gemini text generation integration (env-based, optional) ---
+@llm_cache.cached('gemini', _gemini_model)
 def _gemini_generate(prompt: str, max_tokens: int = 800):
     """
     Generate text via Google Gemini if GOOGLE_API_KEY is set.
@@ -92,7 +127,7 @@ def _gemini_generate(prompt: str, max_tokens: int = 800):
     api_key = os.getenv('GOOGLE_API_KEY')
     if not api_key:
         return None
-    model_name = os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
+    model_name = _gemini_model()
     url = f'https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent'
     try:
         headers = {'Content-Type': 'application/json'}
@@ -100,7 +135,7 @@ def _gemini_generate(prompt: str, max_tokens: int = 800):
             'contents': [{'parts': [{'text': prompt}]}],
             'generationConfig': {'maxOutputTokens': max_tokens}
         }
-        resp = requests.post(url, headers=headers, params={'key': api_key}, json=payload, timeout=30)
+        resp = llm_client.post('gemini', url, headers=headers, params={'key': api_key}, json=payload, timeout=30)
         resp.raise_for_status()
         data = resp.json()
         candidates = data.get('candidates') or []
@@ -111,9 +146,111 @@ def _gemini_generate(prompt: str, max_tokens: int = 800):
         text = ''.join(p.get('text', '') for p in parts if isinstance(p, dict))
         return text.strip() if text else None
     except Exception as e:
-        logging.warning(f"Gemini generation failed: {e}")
+        logging.warning(f"Gemini generation failed: {llm_client.describe_error(e)}")
         return None
 
+# --- Streaming (SSE) variants; providers without a streaming API use the buffered path ---
+def _gemini_stream(prompt: str, max_tokens: int = 800):
+    """Yields text chunks from Gemini's streamGenerateContent endpoint (alt=sse)."""
+    if requests is None:
+        return
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        return
+    url = f'https://generativelanguage.googleapis.com/v1beta/models/{_gemini_model()}:streamGenerateContent'
+    payload = {
+        'contents': [{'parts': [{'text': prompt}]}],
+        'generationConfig': {'maxOutputTokens': max_tokens}
+    }
+    for data in llm_client.iter_sse('gemini', url, headers={'Content-Type': 'application/json'},
+                                    params={'key': api_key, 'alt': 'sse'}, json=payload, timeout=30):
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        for candidate in chunk.get('candidates') or []:
+            parts = (candidate.get('content') or {}).get('parts') or []
+            text = ''.join(p.get('text', '') for p in parts if isinstance(p, dict))
+            if text:
+                yield text
+
+def _deepseek_stream(prompt: str, max_tokens: int = 800):
+    """Yields text chunks from DeepSeek's chat completions endpoint with stream=True."""
+    if requests is None:
+        return
+    api_key = os.getenv('DEEPSEEK_API_KEY')
+    if not api_key:
+        return
+    api_url = os.getenv('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1/chat/completions')
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json'
+    }
+    payload = {
+        'model': _deepseek_model(),
+        'messages': [{'role': 'user', 'content': prompt}],
+        'stream': True,
+        'max_tokens': max_tokens
+    }
+    for data in llm_client.iter_sse('deepseek', api_url, headers=headers, json=payload, timeout=30):
+        if data == '[DONE]':
+            break
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        choices = chunk.get('choices') or []
+        content = (choices[0].get('delta') or {}).get('content') if choices else None
+        if isinstance(content, str) and content:
+            yield content
+
+_PROVIDER_STREAMS = {'gemini': _gemini_stream, 'deepseek': _deepseek_stream}
+
+def stream_generate(prompt: str, max_tokens: int, providers=('gemini', 'deepseek'), cache_ttl=None):
+    """
+    Yields text chunks for `prompt` as soon as a provider produces them.
+
+    A cached full response is yielded in one piece. Otherwise streaming providers
+    are tried in order; one that fails before producing output is skipped, while a
+    failure mid-stream ends the generator with the partial text already sent.
+    Providers without a streaming API (e.g. HF) are called through the buffered
+    path and their whole completion is yielded as a single chunk.
+
+    Args:
+        prompt (str): The prompt to send.
+        max_tokens (int): Completion budget.
+        providers (tuple): Provider names in priority order.
+        cache_ttl (int): Response cache TTL in seconds; 0 bypasses the cache.
+    """
+    if cache_ttl != 0:
+        cached = _cached_first_valid(prompt, max_tokens, lambda text: text.strip() or None, providers)
+        if cached:
+            yield cached
+            return
+    for name in providers:
+        stream = _PROVIDER_STREAMS.get(name)
+        if stream is None:
+            continue
+        pieces = []
+        try:
+            for piece in stream(prompt, max_tokens):
+                pieces.append(piece)
+                yield piece
+        except Exception as e:
+            logging.warning(f"{name} streaming failed: {llm_client.describe_error(e)}")
+            if pieces:
+                return
+            continue
+        if pieces:
+            llm_cache.store(name, _PROVIDER_MODELS[name](), prompt, max_tokens, ''.join(pieces).strip(), cache_ttl)
+            return
+    buffered = tuple(name for name in providers if name not in _PROVIDER_STREAMS)
+    if buffered:
+        text = _generate_first_valid(prompt, max_tokens, lambda text: text.strip() or None, providers=buffered,
+                                     cache_ttl=cache_ttl, check_cache=False)
+        if text:
+            yield text
+
 def create_upload_folders(app):
     """
     Creates the necessary upload folders for CVs and profile photos.
@@ -152,13 +289,17 @@ def preprocess_text(text):
     text = re.sub(r'[^\w\s]', '', text)  
     return text
 
-def compute_similarity(cv_text, job_description):
+def compute_similarity(cv_text, job_description, job_id=None):
     """
     Computes the cosine similarity between the CV text and job description.
 
+    When `job_id` has a precomputed embedding (see app/embeddings.py) only the CV
+    is encoded; the job side is read from the in-process embedding matrix.
+
     Args:
         cv_text (str): The text from the candidate's CV.
         job_description (str): The text from the job description.
+        job_id (int): Optional id of the job the description belongs to.
 
     Returns:
         float: The cosine similarity score between the CV and job description.
@@ -166,12 +307,19 @@ def compute_similarity(cv_text, job_description):
     cv_text = preprocess_text(cv_text)
     job_description = preprocess_text(job_description)
 
-    st_model = get_sentence_transformer()
-    if st_model and util:
-        embeddings_cv = st_model.encode(cv_text, convert_to_tensor=True)
-        embeddings_job_desc = st_model.encode(job_description, convert_to_tensor=True)
-        similarity_score = util.cos_sim(embeddings_cv, embeddings_job_desc)
-        return similarity_score.item()
+    if job_id is not None:
+        try:
+            job_vector = embeddings.job_vector(job_id)
+            cv_vector = embeddings.encode_query(cv_text) if job_vector is not None else None
+            if cv_vector is not None:
+                return float(job_vector @ cv_vector)
+        except Exception as e:
+            logging.warning(f"Precomputed job embedding unavailable for job {job_id}: {e}")
+
+    # 经 embeddings.encode 编码（进程内模型或本机编码服务），向量已归一化，内积即余弦相似度
+    vectors = embeddings.encode([cv_text, job_description])
+    if vectors is not None:
+        return float(vectors[0] @ vectors[1])
     # Fallback: naive token overlap ratio when transformer model not available
     set_cv = set(cv_text.lower().split())
     set_job = set(job_description.lower().split())
@@ -181,7 +329,7 @@ def compute_similarity(cv_text, job_description):
     union = len(set_cv | set_job)
     return overlap / union
 
-def evaluate_cv(cv_text, job_description, threshold = 0.5):
+def evaluate_cv(cv_text, job_description, threshold = 0.5, job_id=None):
     """
     Evaluates the CV against the job description using the similarity score.
 
@@ -189,15 +337,17 @@ def evaluate_cv(cv_text, job_description, threshold = 0.5):
         cv_text (str): The text from the candidate's CV.
         job_description (str): The text from the job description.
         threshold (float): The similarity threshold to determine a match.
+        job_id (int): Optional job id, enables the precomputed job embedding.
 
     Returns:
         bool: True if the similarity score is above the threshold, False otherwise.
     """
-    similarity = compute_similarity(cv_text, job_description)
+    similarity = compute_similarity(cv_text, job_description, job_id=job_id)
     logging.info(f"Similarity score: {similarity:.2f}")
 
     return similarity > threshold, similarity
 
+@llm_cache.cached('hf', _hf_model, tokens_arg='max_new_tokens', default_tokens=600)
 def _hf_generate(prompt: str, max_new_tokens: int = 600):
     if requests is None:
         return None
@@ -215,7 +365,7 @@ def _hf_generate(prompt: str, max_new_tokens: int = 600):
                 'do_sample': True
             }
         }
-        resp = requests.post(current_app.config.get('API_URL'), headers=headers, data=json.dumps(data), timeout=30)
+        resp = llm_client.post('hf', current_app.config.get('API_URL'), headers=headers, data=json.dumps(data), timeout=30)
         resp.raise_for_status()
         js = resp.json()
         return js[0].get('generated_text') if isinstance(js, list) and js else None
@@ -223,6 +373,154 @@ def _hf_generate(prompt: str, max_new_tokens: int = 600):
         logging.warning(f"HF generation failed: {e}")
         return None
 
+# --- Provider dispatch: sequential fallback chain or hedged race ---
+_PROVIDER_CALLS = {
+    # The dispatcher has already peeked the cache for every provider (and counted the lookup)
+    'gemini': lambda prompt, max_tokens, cache_ttl=None: _gemini_generate(prompt, max_tokens=max_tokens, cache_ttl=cache_ttl, cache_checked=True),
+    'deepseek': lambda prompt, max_tokens, cache_ttl=None: _deepseek_generate(prompt, max_tokens=max_tokens, cache_ttl=cache_ttl, cache_checked=True),
+    'hf': lambda prompt, max_tokens, cache_ttl=None: _hf_generate(prompt, max_new_tokens=max_tokens, cache_ttl=cache_ttl, cache_checked=True),
+}
+_PROVIDER_MODELS = {'gemini': _gemini_model, 'deepseek': _deepseek_model, 'hf': _hf_model}
+DEFAULT_PROVIDER_CHAIN = ('gemini', 'deepseek', 'hf')
+
+_race_executor = None
+_race_executor_lock = threading.Lock()
+
+def _get_race_executor():
+    global _race_executor
+    if _race_executor is None:
+        with _race_executor_lock:
+            if _race_executor is None:
+                _race_executor = ThreadPoolExecutor(
+                    max_workers=max(2, int(os.getenv('LLM_RACE_WORKERS', '16'))),
+                    thread_name_prefix='llm-race',
+                )
+    return _race_executor
+
+def _hedge_delay(provider: str) -> float:
+    """
+    Seconds to wait for `provider` before hedging to the next one.
+
+    LLM_HEDGE_DELAY may be a number of seconds or "p95" (default), which uses the
+    provider's observed p95 latency and falls back to LLM_HEDGE_DEFAULT_DELAY
+    (default 3s) until enough samples exist.
+    """
+    configured = os.getenv('LLM_HEDGE_DELAY', 'p95').strip().lower()
+    default_delay = float(os.getenv('LLM_HEDGE_DEFAULT_DELAY', '3'))
+    if configured.startswith('p'):
+        try:
+            observed = llm_client.latency_percentile(provider, float(configured[1:]))
+        except ValueError:
+            observed = None
+        return observed if observed is not None else default_delay
+    try:
+        return float(configured)
+    except ValueError:
+        return default_delay
+
+def _bind_app_context(fn):
+    """Run `fn` inside the current Flask app context when called from a worker thread."""
+    try:
+        app = current_app._get_current_object()
+    except RuntimeError:
+        return fn
+    def wrapper(*args, **kwargs):
+        with app.app_context():
+            return fn(*args, **kwargs)
+    return wrapper
+
+def _parse_or_none(parse, generated):
+    if not generated:
+        return None
+    try:
+        return parse(generated)
+    except Exception as e:
+        logging.debug(f"Discarding unparsable LLM output: {e}")
+        return None
+
+def _cached_first_valid(prompt: str, max_tokens: int, parse, providers):
+    """
+    Returns the first parseable cached response among `providers`, without any network call.
+
+    The whole scan counts as one cache lookup (a hit, or a single miss) in llm_cache.stats().
+    """
+    for name in providers:
+        text, outcome = llm_cache.peek(name, _PROVIDER_MODELS[name](), prompt, max_tokens)
+        result = _parse_or_none(parse, text)
+        if result is not None:
+            llm_cache.record_lookup(outcome)
+            return result
+    llm_cache.record_lookup('misses')
+    return None
+
+def _generate_first_valid(prompt: str, max_tokens: int, parse, providers=DEFAULT_PROVIDER_CHAIN, cache_ttl=None,
+                          check_cache=True):
+    """
+    Returns parse(text) for the first provider whose output parses to a non-None value.
+
+    LLM_DISPATCH_MODE=sequential tries providers strictly in order. The default
+    "race" mode starts the primary provider, launches the next one once the
+    hedge delay passes (or as soon as the running one fails), and returns the
+    first valid result; pending losers are cancelled and in-flight ones discarded.
+
+    Args:
+        prompt (str): The prompt sent to every provider.
+        max_tokens (int): Completion budget passed to each provider.
+        parse (callable): Maps raw text to a result, or None if the text is unusable.
+        providers (tuple): Provider names from _PROVIDER_CALLS, in priority order.
+        cache_ttl (int): Response cache TTL in seconds for this call site; 0 bypasses the cache.
+        check_cache (bool): False when the caller has already peeked the cache for these providers.
+
+    Returns:
+        The parsed result, or None if every provider failed.
+    """
+    if cache_ttl != 0 and check_cache:
+        cached = _cached_first_valid(prompt, max_tokens, parse, providers)
+        if cached is not None:
+            return cached
+
+    if os.getenv('LLM_DISPATCH_MODE', 'race').strip().lower() == 'sequential' or len(providers) < 2:
+        for name in providers:
+            result = _parse_or_none(parse, _PROVIDER_CALLS[name](prompt, max_tokens, cache_ttl))
+            if result is not None:
+                return result
+        return None
+
+    executor = _get_race_executor()
+    pending = {}
+    queue = list(providers)
+
+    def launch_next():
+        name = queue.pop(0)
+        call = _bind_app_context(_PROVIDER_CALLS[name])
+        pending[executor.submit(call, prompt, max_tokens, cache_ttl)] = name
+        return name
+
+    running = launch_next()
+    while pending:
+        timeout = _hedge_delay(running) if queue else None
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            hedged_from = running
+            running = launch_next()
+            logging.info(f"LLM hedge: {hedged_from} slower than {timeout:.2f}s, racing {running}")
+            continue
+        for future in done:
+            name = pending.pop(future)
+            try:
+                generated = future.result()
+            except Exception as e:
+                logging.warning(f"{name} generation raised: {llm_client.describe_error(e)}")
+                generated = None
+            result = _parse_or_none(parse, generated)
+            if result is not None:
+                for loser in pending:
+                    loser.cancel()
+                return result
+        if queue:
+            running = launch_next()
+    return None
+
 def generate_interview_questions(cv_text, job_description, max_retries=3):
     """
     Generates personalized interview questions based on the candidate's CV and the job description.
@@ -235,31 +533,18 @@ def generate_interview_questions(cv_text, job_description, max_retries=3):
     Returns:
         list: A list of generated interview questions or an error message.
     """
-    # 先尝试通过 Gemini 生成
     prompt = (
         "Generate 10 concise, non-repetitive interview questions in Chinese based on the candidate resume and the job description.\n"
         "Resume:\n" + cv_text + "\nJob Description:\n" + job_description + "\nQuestions:" 
     )
-    generated = _gemini_generate(prompt, max_tokens=800)
-    if generated:
+    def _parse_questions(generated):
         lines = [ln.strip() for ln in generated.splitlines() if ln.strip()]
         questions = [ln for ln in lines if ln.endswith('？') or ln.endswith('?')]
-        if len(questions) >= 5:
-            return questions[:10]
-    # 再尝试通过 DeepSeek 生成
-    generated = _deepseek_generate(prompt, max_tokens=800)
-    if generated:
-        lines = [ln.strip() for ln in generated.splitlines() if ln.strip()]
-        questions = [ln for ln in lines if ln.endswith('？') or ln.endswith('?')]
-        if len(questions) >= 5:
-            return questions[:10]
-    # 再尝试通过 HF API 生成（后备）
-    generated = _hf_generate(prompt, max_new_tokens=800)
-    if generated:
-        lines = [ln.strip() for ln in generated.splitlines() if ln.strip()]
-        questions = [ln for ln in lines if ln.endswith('？') or ln.endswith('?')]
-        if len(questions) >= 5:
-            return questions[:10]
+        return questions[:10] if len(questions) >= 5 else None
+    # Gemini → DeepSeek → HF API（后备），按 LLM_DISPATCH_MODE 顺序或对冲竞速
+    questions = _generate_first_valid(prompt, 800, _parse_questions, cache_ttl=llm_cache_ttl('interview_questions'))
+    if questions:
+        return questions
     # 返回通用问题作为降级
     return [
         "请介绍一下你的技术背景和主要技能栈？",
@@ -287,29 +572,104 @@ def generate_feedback(question_text, response_text, job_description, max_retries
     Returns:
         str: The generated feedback or an error message.
     """
-    # 先尝试通过 Gemini 生成
     prompt = (
         "使用中文，对候选人答复给出简短建设性的反馈，并在结尾给出形如‘评分：X/10’的分数。\n"
         f"问题：{question_text}\n回答：{response_text}\n职位描述：{job_description}\n反馈："
     )
-    generated = _gemini_generate(prompt, max_tokens=400)
-    if generated:
-        return generated.strip()
-    # 再尝试通过 DeepSeek 生成
-    generated = _deepseek_generate(prompt, max_tokens=400)
-    if generated:
-        return generated.strip()
-    # 再尝试通过 HF API 生成（后备）
-    generated = _hf_generate(prompt, max_new_tokens=400)
+    # Gemini → DeepSeek → HF API（后备）
+    generated = _generate_first_valid(prompt, 400, lambda text: text.strip() or None, cache_ttl=llm_cache_ttl('feedback'))
     if generated:
-        return generated.strip()
+        return generated
     # 简单的评分算法作为降级
+    return _fallback_feedback(response_text, job_description)
+
+def _fallback_feedback(response_text, job_description):
     score_base = 5
     overlap = len(set(response_text.lower().split()) & set(job_description.lower().split()))
     length_bonus = min(len(response_text) // 120, 3)
     score = max(3, min(9, score_base + (1 if overlap > 10 else 0) + length_bonus))
     return f"感谢您的回答。建议可以增加更多具体的例子和量化成果。评分：{score}/10"
 
+def _parse_batched_feedbacks(generated, count):
+    """Parses a JSON array of {"index", "feedback"} objects into a list of `count` feedbacks (None for gaps)."""
+    cleaned = generated.replace('```json', '').replace('```', '').strip()
+    m = re.search(r"\[[\s\S]*\]", cleaned)
+    parsed = json.loads(m.group(0) if m else cleaned)
+    if not isinstance(parsed, list):
+        return None
+    feedbacks = [None] * count
+    for position, item in enumerate(parsed):
+        if isinstance(item, dict):
+            index = item.get('index', position + 1)
+            text = item.get('feedback')
+        else:
+            index, text = position + 1, item
+        try:
+            index = int(index) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count and isinstance(text, str) and text.strip():
+            feedbacks[index] = text.strip()
+    return feedbacks if any(feedbacks) else None
+
+def _generate_feedbacks_parallel(pairs, job_description, indexes):
+    results = {}
+    workers = max(1, min(len(indexes), int(os.getenv('LLM_FEEDBACK_WORKERS', '5'))))
+    call = _bind_app_context(generate_feedback)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='llm-feedback') as pool:
+        futures = {pool.submit(call, pairs[i][0], pairs[i][1], job_description): i for i in indexes}
+        for future, i in futures.items():
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                logging.warning(f"Feedback for question {i + 1} failed: {e}")
+                results[i] = _fallback_feedback(pairs[i][1], job_description)
+    return results
+
+def generate_feedback_batch(pairs, job_description, mode=None):
+    """
+    Generates feedback for several (question, response) pairs, preserving their order.
+
+    Modes (argument or LLM_FEEDBACK_MODE env var):
+      - "parallel" (default): scores every answer concurrently on a bounded
+        thread pool (LLM_FEEDBACK_WORKERS, default 5).
+      - "batched": scores all pairs with a single prompt that returns a JSON array;
+        items missing from the reply are scored individually in parallel.
+      - "sequential": one generate_feedback call after another.
+
+    Args:
+        pairs (list): (question_text, response_text) tuples.
+        job_description (str): The text from the job description.
+        mode (str): Optional mode override.
+
+    Returns:
+        list: One feedback string per pair, each ending with a score out of 10.
+    """
+    pairs = [(q or '', r or '') for q, r in pairs]
+    if not pairs:
+        return []
+    mode = (mode or os.getenv('LLM_FEEDBACK_MODE', 'parallel')).strip().lower()
+    if mode == 'sequential' or len(pairs) == 1:
+        return [generate_feedback(q, r, job_description) for q, r in pairs]
+
+    feedbacks = [None] * len(pairs)
+    if mode == 'batched':
+        numbered = '\n'.join(f"{i}. 问题：{q}\n   回答：{r}" for i, (q, r) in enumerate(pairs, start=1))
+        prompt = (
+            "使用中文，逐条对候选人的面试回答给出简短建设性的反馈，每条反馈结尾给出形如‘评分：X/10’的分数。\n"
+            "只输出JSON数组，元素形如 {\"index\": 序号, \"feedback\": \"反馈内容\"}，不要任何额外文字。\n"
+            f"职位描述：{job_description}\n问答：\n{numbered}\n输出："
+        )
+        batched = _generate_first_valid(prompt, 300 * len(pairs), lambda text: _parse_batched_feedbacks(text, len(pairs)),
+                                        cache_ttl=llm_cache_ttl('feedback'))
+        if batched:
+            feedbacks = batched
+    missing = [i for i, fb in enumerate(feedbacks) if not fb]
+    if missing:
+        for i, fb in _generate_feedbacks_parallel(pairs, job_description, missing).items():
+            feedbacks[i] = fb
+    return feedbacks
+
 def ai_extract_skills_from_text(resume_text: str) -> list:
     """从简历文本中提取技能列表。优先调用 Gemini，再调用 DeepSeek，最后本地关键词提取降级。
 
@@ -319,44 +679,27 @@ def ai_extract_skills_from_text(resume_text: str) -> list:
         "请从以下中文简历文本中提取候选人的关键技能，输出JSON数组，数组内仅包含技能字符串，不要多余说明。\n"
         f"简历：\n{resume_text}\n输出："
     )
-    # Gemini
-    generated = _gemini_generate(prompt, max_tokens=300)
-    if generated:
-        try:
-            parsed = json.loads(generated)
-            if isinstance(parsed, list):
-                return [str(x).strip() for x in parsed if str(x).strip()]
-        except Exception:
-            pass
-    # DeepSeek
-    generated = _deepseek_generate(prompt, max_tokens=300)
-    if generated:
-        try:
-            parsed = json.loads(generated)
-            if isinstance(parsed, list):
-                return [str(x).strip() for x in parsed if str(x).strip()]
-        except Exception:
-            pass
+    def _parse_skills(generated):
+        parsed = json.loads(generated)
+        if isinstance(parsed, list):
+            return [str(x).strip() for x in parsed if str(x).strip()]
+        return None
+    # Gemini → DeepSeek
+    skills = _generate_first_valid(prompt, 300, _parse_skills, providers=('gemini', 'deepseek'),
+                                   cache_ttl=llm_cache_ttl('skills'))
+    if skills is not None:
+        return skills
     # Fallback: 关键词匹配
     try:
-        from .smartrecruit_system.candidate_module.recommendation_config import SKILL_CATEGORIES, CHINESE_SKILLS
-    except Exception:
-        SKILL_CATEGORIES, CHINESE_SKILLS = {}, {}
-    text_lower = resume_text.lower()
-    skills = set()
-    for _, arr in SKILL_CATEGORIES.items():
-        for s in arr:
-            if s in text_lower:
-                skills.add(s)
-    zh_lower = resume_text
-    for _, arr in CHINESE_SKILLS.items():
-        for s in arr:
-            if s in zh_lower:
-                skills.add(s)
+        from .skill_matcher import extract_skills, RECRUIT
+        skills = extract_skills(resume_text, RECRUIT)
+    except Exception as e:
+        logging.warning(f"Skill keyword fallback failed: {e}")
+        skills = []
     if not skills:
         # 基础兜底
         return ["编程", "软件开发", "团队协作"]
-    return list(skills)
+    return skills
 
 def ai_analyze_resume_text(resume_text: str) -> dict:
     """对简历文本做详尽分析，返回结构化结果。
@@ -375,7 +718,8 @@ def ai_analyze_resume_text(resume_text: str) -> dict:
     )
     import json, re
     # Gemini 优先
-    text = _gemini_generate(prompt, max_tokens=900) or _deepseek_generate(prompt, max_tokens=900)
+    ttl = llm_cache_ttl('resume_analysis')
+    text = _gemini_generate(prompt, max_tokens=900, cache_ttl=ttl) or _deepseek_generate(prompt, max_tokens=900, cache_ttl=ttl)
     result: dict = {}
     if text:
         cleaned = text.replace('```json', '').replace('```', '').strip()
@@ -427,27 +771,100 @@ def ai_analyze_resume_text(resume_text: str) -> dict:
     }
     return result
 
+# 提取逻辑变化时递增，使 resume_text 表中的旧结果失效
+RESUME_EXTRACTOR_VERSION = '2'
+
+def resume_extractor_version() -> str:
+    """当前提取器版本：逻辑版本 + 依赖库版本（升级 pdfplumber 也会触发重新提取）"""
+    pdf_version = getattr(pdfplumber, '__version__', 'none') if pdfplumber is not None else 'none'
+    max_pages = os.getenv('EXTRACT_MAX_PAGES', '30')
+    return f'{RESUME_EXTRACTOR_VERSION}/pdfplumber-{pdf_version}/p{max_pages}'
+
+def _resume_extractable(filename: str) -> bool:
+    """是否为能提取文本的简历格式（PDF 需要 pdfplumber）。"""
+    ext = extraction.file_ext(filename)
+    return ext == 'docx' or (ext == 'pdf' and pdfplumber is not None)
+
+def _extract_resume_uncached(file_bytes: bytes, filename: str):
+    """在提取进程池中执行提取，返回 (text, page_count)；解析异常/超时向上抛出，由调用方决定是否缓存。"""
+    ext = extraction.file_ext(filename)
+    if ext == 'pdf' and pdfplumber is not None:
+        result = extraction.extract(file_bytes, filename)
+        return ''.join(result['pages']), result['page_count']
+    if ext == 'docx':
+        result = extraction.extract(file_bytes, filename)
+        return result['pages'][0].strip(), 1
+    return '', 0
+
+def _resume_text_lookup(digest: str, version: str):
+    """读取 resume_text 缓存；表不存在或不在应用上下文中时返回 None。"""
+    try:
+        from . import db
+        from .models import ResumeText
+        table = ResumeText.__table__
+        # 使用独立连接，避免影响调用方 db.session 中未提交的修改
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                table.select().where(table.c.sha256 == digest, table.c.extractor_version == version)
+            ).fetchone()
+        return row.text if row is not None else None
+    except Exception as e:
+        logging.debug(f'resume_text lookup skipped: {e}')
+        return None
+
+def _resume_text_store(digest: str, version: str, text: str, page_count: int):
+    try:
+        from datetime import datetime
+        from . import db
+        from .models import ResumeText
+        table = ResumeText.__table__
+        values = {'text': text, 'page_count': page_count, 'extractor_version': version,
+                  'extracted_at': datetime.utcnow()}
+        with db.engine.begin() as conn:
+            updated = conn.execute(table.update().where(table.c.sha256 == digest).values(**values)).rowcount
+            if not updated:
+                conn.execute(table.insert().values(sha256=digest, **values))
+    except Exception as e:
+        logging.debug(f'resume_text store skipped: {e}')
+
 def extract_text_from_resume(file_bytes: bytes, filename: str) -> str:
-    """从简历二进制中提取文本，支持 PDF/DOCX，图片不提取。"""
+    """从简历二进制中提取文本，支持 PDF/DOCX，图片不提取。
+
+    结果按文件内容 SHA-256 缓存在 resume_text 表中，同一文件只在首次（或提取器版本变化后）解析一次。
+    不支持的格式直接返回空文本且不写入缓存，否则同一内容之后以 PDF/DOCX 上传时会命中空结果。
+    """
+    if not file_bytes or not _resume_extractable(filename):
+        return ''
+    import hashlib
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    version = resume_extractor_version()
+    cached = _resume_text_lookup(digest, version)
+    if cached is not None:
+        return cached
     try:
-        ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-        if ext == 'pdf' and pdfplumber is not None:
-            from io import BytesIO
-            with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-                return ''.join(page.extract_text() or '' for page in pdf.pages)
-        if ext == 'docx':
-            try:
-                import docx2txt
-                from tempfile import NamedTemporaryFile
-                with NamedTemporaryFile(suffix='.docx', delete=True) as tmp:
-                    tmp.write(file_bytes)
-                    tmp.flush()
-                    return (docx2txt.process(tmp.name) or '').strip()
-            except Exception:
-                return ''
+        text, page_count = _extract_resume_uncached(file_bytes, filename)
+    except extraction.ExtractionTimeout as e:
+        # 超时的部分结果不写入缓存，下次仍会尝试完整提取
+        logging.warning(f'extract_text_from_resume timed out: {e}')
+        return e.partial_text
     except Exception as e:
         logging.warning(f'extract_text_from_resume failed: {e}')
-    return ''
+        return ''
+    _resume_text_store(digest, version, text, page_count)
+    return text
+
+def get_user_resume_text(user, default_filename: str = '') -> str:
+    """取用户当前简历的文本：先按 cv_sha256 查 resume_text 缓存（无需加载简历二进制），未命中再提取。"""
+    filename = getattr(user, 'cv_file', None) or default_filename
+    if not filename:
+        return ''
+    digest = getattr(user, 'cv_sha256', None)
+    if digest:
+        cached = _resume_text_lookup(digest, resume_extractor_version())
+        if cached is not None:
+            return cached
+    cv_data = getattr(user, 'cv_data', None)
+    return extract_text_from_resume(cv_data, filename) if cv_data else ''
 
 def convert_keys_to_strings(data):
     """
@@ -517,46 +934,27 @@ def extract_text_from_file(file_path):
     Raises:
         Exception: If text extraction fails or file type is not supported.
     """
-    import os
-    from PIL import Image
-    import pytesseract
-    
     file_ext = os.path.splitext(file_path)[1].lower()
     
     try:
-        if file_ext == '.pdf':
-            if pdfplumber is None:
-                raise Exception("PDF processing library (pdfplumber) not available")
-            
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                return text.strip()
-                
-        elif file_ext == '.docx':
-            try:
-                import docx2txt
-                text = docx2txt.process(file_path)
-                return text.strip()
-            except ImportError:
-                raise Exception("DOCX processing library (docx2txt) not available")
-                
-        elif file_ext in {'.png', '.jpg', '.jpeg'}:
-            try:
-                # Try to use pytesseract for OCR
-                image = Image.open(file_path)
-                text = pytesseract.image_to_string(image)
-                return text.strip()
-            except ImportError:
-                raise Exception("Image processing libraries (PIL, pytesseract) not available")
-            except Exception as e:
-                raise Exception(f"Failed to extract text from image: {e}")
-                
-        else:
+        if file_ext == '.pdf' and pdfplumber is None:
+            raise Exception("PDF processing library (pdfplumber) not available")
+        try:
+            # 在提取进程池中执行，受时间预算、页数上限与图片缩放限制
+            result = extraction.extract(file_path, file_path)
+        except extraction.ExtractionTimeout as e:
+            logging.warning(f"Text extraction timed out, returning partial text: {e}")
+            return e.partial_text.strip()
+        except extraction.UnsupportedFileType:
             raise Exception(f"Unsupported file type: {file_ext}")
+        except ImportError:
+            if file_ext == '.docx':
+                raise Exception("DOCX processing library (docx2txt) not available")
+            raise Exception("Image processing libraries (PIL, pytesseract) not available")
+        
+        if file_ext == '.pdf':
+            return "\n".join(page for page in result['pages'] if page).strip()
+        return result['pages'][0].strip()
             
     except Exception as e:
         logging.error(f"Failed to extract text from {file_path}: {e}")
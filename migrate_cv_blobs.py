@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：把 User.cv_data 简历二进制迁移到按内容寻址的 resume_blob 表
+
+User 行只保留 cv_sha256，页面请求加载用户时不再读取简历二进制。
+可重复执行：已迁移的用户会被跳过。
+"""
+
+import os
+import sys
+import hashlib
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BATCH_SIZE = 50
+
+def migrate_cv_blobs(vacuum=True):
+    """创建 resume_blob 表、添加 user.cv_sha256 字段并回填"""
+    print("=== 数据库迁移：简历二进制迁移到 resume_blob ===\n")
+
+    try:
+        from app import create_app, db
+        from app.models import ResumeBlob
+
+        app = create_app()
+        with app.app_context():
+            print("✅ 应用创建成功")
+
+            ResumeBlob.__table__.create(db.engine, checkfirst=True)
+            print("✅ resume_blob 表已就绪")
+
+            columns = [row[1] for row in db.session.execute(db.text("PRAGMA table_info(user)")).fetchall()]
+            if 'cv_sha256' in columns:
+                print("✅ cv_sha256字段已存在")
+            else:
+                db.session.execute(db.text("ALTER TABLE user ADD COLUMN cv_sha256 VARCHAR(64) REFERENCES resume_blob (sha256)"))
+                db.session.commit()
+                print("✅ 成功添加cv_sha256字段")
+
+            migrated = 0
+            total_bytes = 0
+            while True:
+                rows = db.session.execute(db.text(
+                    "SELECT id, cv_data FROM user WHERE cv_data IS NOT NULL AND cv_sha256 IS NULL LIMIT :limit"
+                ), {'limit': BATCH_SIZE}).fetchall()
+                if not rows:
+                    break
+                for user_id, data in rows:
+                    data = bytes(data)
+                    digest = hashlib.sha256(data).hexdigest()
+                    db.session.execute(db.text(
+                        "INSERT OR IGNORE INTO resume_blob (sha256, data, size, created_at) "
+                        "VALUES (:sha256, :data, :size, :created_at)"
+                    ), {'sha256': digest, 'data': data, 'size': len(data), 'created_at': datetime.utcnow()})
+                    db.session.execute(db.text(
+                        "UPDATE user SET cv_sha256 = :sha256, cv_data = NULL WHERE id = :id"
+                    ), {'sha256': digest, 'id': user_id})
+                    migrated += 1
+                    total_bytes += len(data)
+                db.session.commit()
+                print(f"   已迁移 {migrated} 份简历...")
+
+            # 已迁移但旧列仍有残留（如迁移中断后被重新上传）的行，清空旧列
+            db.session.execute(db.text("UPDATE user SET cv_data = NULL WHERE cv_sha256 IS NOT NULL AND cv_data IS NOT NULL"))
+            db.session.commit()
+
+            blobs = db.session.execute(db.text("SELECT COUNT(*) FROM resume_blob")).scalar()
+            print(f"📊 迁移结果:")
+            print(f"   迁移简历数: {migrated}")
+            print(f"   迁移数据量: {total_bytes / 1024 / 1024:.2f} MB")
+            print(f"   resume_blob 条数（去重后）: {blobs}")
+
+            if vacuum:
+                # 释放 user 表中原简历数据占用的页
+                db.session.commit()
+                with db.engine.connect() as conn:
+                    conn.execution_options(isolation_level='AUTOCOMMIT').execute(db.text("VACUUM"))
+                print("✅ VACUUM 完成")
+
+            print("✅ 数据库迁移完成")
+
+    except Exception as e:
+        print(f"❌ 迁移脚本执行失败: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    migrate_cv_blobs(vacuum='--no-vacuum' not in sys.argv)
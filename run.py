@@ -1,6 +1,8 @@
-from app import create_app
+from app import create_app, task_queue
 
 app = create_app()
+# 进程内 worker 线程执行简历解析等后台任务；使用独立 worker 时设置 TASK_WORKER_EMBEDDED=0
+task_queue.start_embedded_worker(app)
 
 if __name__ == '__main__':
     app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
@@ -51,6 +51,10 @@ def main():
                 logger.error(f"数据库连接失败: {e}")
                 logger.error(traceback.format_exc())
         
+        # 进程内 worker 线程执行简历解析等后台任务（TASK_WORKER_EMBEDDED=0 时跳过）
+        from app import task_queue
+        task_queue.start_embedded_worker(app)
+        
         # 启动应用
         logger.info("正在启动Flask应用...")
         logger.info("应用将在 http://localhost:5000 上运行")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准：职位搜索输入联想——数据库 LIKE 前缀查询 vs candidate_module/autocomplete 的进程内有序数组索引。
+
+在临时 SQLite 数据库中生成随机职位（标题/公司/地点），统计构建耗时、单次联想耗时（含 1~2 个字母的大区间前缀）
+以及增量更新耗时。
+
+用法：
+    python scripts/bench_autocomplete.py --jobs 100000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Ensure project root is on sys.path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+CITIES = ['北京', '上海', '深圳', '杭州', '广州', '成都', '南京', '武汉', '西安', '苏州', '远程']
+ROLES = ['开发工程师', '后端开发', '前端工程师', '数据分析师', '产品经理', '算法工程师', '测试工程师', '运维工程师']
+STACKS = ['Python', 'Java', 'Go', 'C++', 'React', 'Vue', '大数据', '机器学习', '']
+LEVELS = ['', '高级', '资深', '初级']
+PREFIXES = ['p', 'py', 'python', '数据', 'shuju', 'sjfx', '北', 'java 后', 'k', '资深r']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='职位搜索输入联想基准')
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--companies', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_autocomplete.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app, db
+    from app.models import User, Job
+    from smartrecruit_system.candidate_module.autocomplete import get_autocomplete
+
+    logging.disable(logging.WARNING)
+    app = create_app()
+    rng = random.Random(0)
+    companies = [f"{rng.choice(['星辰', '云帆', '蓝海', '启明', '北斗'])}{i}{rng.choice(['科技', '网络', '数据'])}"
+                 for i in range(args.companies)]
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+                            phone_number='0', birthday='2000-01-01', password='x', is_hr=True))
+        db.session.commit()
+        now = datetime.utcnow()
+        rows = [{'title': ' '.join(filter(None, [rng.choice(LEVELS) + rng.choice(STACKS), rng.choice(ROLES)])),
+                 'company_name': rng.choice(companies), 'location': rng.choice(CITIES), 'description': 'x',
+                 'salary': '面议', 'date_posted': now - timedelta(minutes=i), 'created_at': now,
+                 'user_id': 1, 'positions_needed': 1}
+                for i in range(args.jobs)]
+        db.session.execute(Job.__table__.insert(), rows)
+        db.session.commit()
+
+        holder = get_autocomplete()
+        started = time.perf_counter()
+        index = holder.index()
+        build_s = time.perf_counter() - started
+        print(f"=== 输入联想基准（{args.jobs} 个职位，{len(index)} 个词条）===")
+        print(f"  索引构建: {build_s:.2f}s")
+        print(f"  {'前缀':<12}{'LIKE ms':>10}{'索引 ms':>10}{'首条结果':>16}")
+        for prefix in PREFIXES:
+            started = time.perf_counter()
+            for column in (Job.title, Job.company_name, Job.location):
+                db.session.query(column, db.func.count()).filter(column.ilike(f'{prefix}%')) \
+                    .group_by(column).order_by(db.func.count().desc()).limit(8).all()
+            like_ms = (time.perf_counter() - started) * 1000
+
+            index.suggest(prefix)  # 大区间前缀首次查询时填充缓存
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                suggestions = index.suggest(prefix)
+            index_ms = (time.perf_counter() - started) / args.repeat * 1000
+            first = suggestions[0]['text'] if suggestions else '-'
+            print(f"  {prefix:<12}{like_ms:>10.2f}{index_ms:>10.3f}  {first}")
+
+        started = time.perf_counter()
+        for i in range(args.repeat):
+            index.add('title', f'Rust 开发工程师 {i}')
+            index.add('company', companies[0])
+        add_ms = (time.perf_counter() - started) / args.repeat * 1000
+        started = time.perf_counter()
+        holder.update([], [('title', 'Rust 开发工程师'), ('company', companies[0])])
+        update_ms = (time.perf_counter() - started) * 1000
+        print(f"  增量更新: 索引 {add_ms:.3f} ms/职位，update_job_terms（含职位表状态查询）{update_ms:.1f} ms")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准：职位搜索分面计数——取回全部匹配职位后在 Python 中逐条统计 vs app/job_facets 的分组 SQL 与分面快照（FacetIndex）。
+
+在临时 SQLite 数据库中生成随机职位（含 FTS 索引），对若干查询条件分别计时（均不使用结果缓存），并核对各方式结果一致。
+
+用法：
+    python scripts/bench_job_facets.py --jobs 100000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Ensure project root is on sys.path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+CITIES = ['北京', '上海', '深圳', '杭州', '广州', '成都', '南京', '武汉', '西安', '苏州', '远程']
+JOB_TYPES = ['全职', '兼职', '实习', '远程']
+LEVELS = ['初级', '中级', '高级', '专家', '不限']
+SALARIES = ['8k-12k', '15k-25k', '1.5万/月', '30-50万/年', '面议', '200元/天', '20k以上', '10-15K·14薪']
+TITLES = ['Python 开发工程师', 'Java 后端开发', '前端工程师', '数据分析师', '产品经理', '销售代表', '测试工程师']
+QUERIES = [
+    ('', {}),
+    ('开发', {}),
+    ('数据分析', {'location': '上海'}),
+    ('', {'job_type': '全职', 'salary_min': 15000}),
+]
+
+
+def python_facets(jobs):
+    """原方式：逐条统计（薪资区间按交集计入）。"""
+    from app.job_facets import SALARY_BANDS
+    counts = {name: Counter() for name in ('location', 'job_type', 'experience_level')}
+    bands = [0] * len(SALARY_BANDS)
+    for job in jobs:
+        for name, counter in counts.items():
+            if getattr(job, name):
+                counter[getattr(job, name)] += 1
+        if job.salary_min is not None:
+            for i, (low, high, _) in enumerate(SALARY_BANDS):
+                if (low is None or job.salary_max >= low) and (high is None or job.salary_min <= high):
+                    bands[i] += 1
+    return counts, bands
+
+
+def main():
+    parser = argparse.ArgumentParser(description='职位搜索分面计数基准')
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_facets.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app, db
+    from app.job_facets import facet_counts, job_filters, apply_filters, get_index_holder
+    from app.job_search import ensure_job_fts, search_jobs, match_job_ids
+    from app.models import User, Job
+    from app.salary import parse_salary
+
+    logging.disable(logging.WARNING)
+    app = create_app()
+    rng = random.Random(0)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+                            phone_number='0', birthday='2000-01-01', password='x', is_hr=True))
+        db.session.commit()
+        now = datetime.utcnow()
+        rows = []
+        for i in range(args.jobs):
+            salary = rng.choice(SALARIES)
+            salary_min, salary_max, salary_period = parse_salary(salary)
+            rows.append({'title': rng.choice(TITLES), 'company_name': 'c', 'location': rng.choice(CITIES),
+                         'description': rng.choice(['负责核心系统开发', '负责数据分析与报表', '负责客户拓展']),
+                         'salary': salary, 'salary_min': salary_min, 'salary_max': salary_max,
+                         'salary_period': salary_period, 'job_type': rng.choice(JOB_TYPES),
+                         'experience_level': rng.choice(LEVELS), 'date_posted': now - timedelta(minutes=i),
+                         'created_at': now, 'user_id': 1, 'positions_needed': 1})
+        db.session.execute(Job.__table__.insert(), rows)
+        db.session.commit()
+        ensure_job_fts(rebuild=True)
+
+        started = time.perf_counter()
+        index = get_index_holder().index()
+        build_s = time.perf_counter() - started
+
+        print(f"=== 分面计数基准（{args.jobs} 个职位，不含结果缓存）===")
+        print(f"  分面快照构建: {build_s:.2f}s")
+        print(f"  {'查询':<28}{'匹配数':>8}{'逐条统计 ms':>14}{'分组 SQL ms':>14}{'快照 ms':>10}")
+        for text, params in QUERIES:
+            matched, _ = search_jobs(Job.query, text) if text else (Job.query, None)
+            filters = job_filters(**params)
+
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                jobs = apply_filters(matched, filters).order_by(None).all()
+                expected = python_facets(jobs)
+                db.session.expunge_all()
+            python_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                facets = facet_counts(matched, filters)
+            sql_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+            # 快照方式：有关键词时从数据库取匹配集合的职位 ID（计入耗时）
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                matched_ids = match_job_ids(text) if text else None
+                indexed = index.counts(matched_ids, **params)
+            index_ms = (time.perf_counter() - started) / args.repeat * 1000
+            assert indexed == facets
+
+            # 没有自身筛选的分面应与逐条统计一致
+            for name, counter in expected[0].items():
+                if name not in filters:
+                    assert {f['value']: f['count'] for f in facets[name]} == dict(counter.most_common(20)), name
+            if 'salary' not in filters:
+                assert [f['count'] for f in facets['salary']] == [c for c in expected[1] if c]
+            label = f"{text or '（无关键词）'} {params or ''}"
+            print(f"  {label:<28}{len(jobs):>8}{python_ms:>14.1f}{sql_ms:>14.1f}{index_ms:>10.1f}")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准：职位关键词搜索——LIKE '%q%' 全表扫描 vs FTS5 全文索引（CJK 二元切分 + BM25 排序）。
+
+在临时 SQLite 文件中生成随机中英文职位（只建搜索涉及的列），索引由与线上相同的建表/触发器 SQL 与回填函数构建。
+
+用法：
+    python scripts/bench_job_search.py --jobs 100000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Ensure project root is on sys.path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.job_search import schema_statements, rebuild_index, build_match_query, BM25_WEIGHTS, FTS_TABLE
+from smartrecruit_system.candidate_module.recommendation_config import SKILL_CATEGORIES, CHINESE_SKILLS
+
+TITLES = ['Python 开发工程师', 'Java 后端开发', '前端工程师', '数据分析师', '产品经理', '销售代表', '测试工程师',
+          '运维工程师', '算法工程师', '人力资源专员', '市场营销经理', '财务会计']
+PHRASES = ['负责核心业务系统的设计与开发', '熟悉 MySQL、Redis 等数据库', '具备良好的沟通能力和团队协作精神',
+           '有大型分布式系统经验者优先', '参与需求分析与技术方案评审', '熟悉 Docker 与 Kubernetes',
+           '负责客户关系维护与市场拓展', '编写自动化测试用例', '了解机器学习与深度学习算法',
+           'experience with React and TypeScript', 'strong communication skills', '五险一金，带薪年假']
+SKILLS = [s for skills in list(SKILL_CATEGORIES.values()) + list(CHINESE_SKILLS.values()) for s in skills]
+QUERIES = ['开发', '分布式系统', '机器学习', 'python', 'kubernetes', '沟通能力 团队', '区块链', 'six sigma']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='职位搜索基准')
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), 'bench_search.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE job (id INTEGER PRIMARY KEY, title TEXT, description TEXT, requirements TEXT, '
+                 'skills_required TEXT, date_posted TEXT)')
+    conn.executemany('INSERT INTO job VALUES (?, ?, ?, ?, ?, ?)', (
+        (i + 1, rng.choice(TITLES), '，'.join(rng.sample(PHRASES, 2) + rng.sample(SKILLS, 4)), rng.choice(PHRASES),
+         ' '.join(rng.sample(SKILLS, 3)), f'2024-01-{i % 28 + 1:02d}')
+        for i in range(args.jobs)))
+    conn.commit()
+
+    started = time.perf_counter()
+    for statement in schema_statements():
+        conn.execute(statement)
+    rebuild_index(conn)
+    conn.commit()
+    index_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    conn.execute("INSERT INTO job (title, description) VALUES ('新职位', '负责数据平台开发')")
+    conn.commit()
+    trigger_ms = (time.perf_counter() - started) * 1000
+
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    print(f"=== 职位搜索基准（{args.jobs} 个职位）===")
+    print(f"  建立索引: {index_s:.1f}s，单条写入（含触发器）: {trigger_ms:.2f}ms")
+    print(f"  {'查询':<14}{'LIKE 命中':>10}{'LIKE ms':>10}{'FTS 命中':>10}{'FTS ms':>10}")
+    for q in QUERIES:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            like = conn.execute('SELECT id FROM job WHERE title LIKE ? OR description LIKE ? ORDER BY date_posted DESC',
+                                (f'%{q}%', f'%{q}%')).fetchall()
+        like_ms = (time.perf_counter() - started) / args.repeat * 1000
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fts = conn.execute(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? '
+                               f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT 50', (build_match_query(q),)).fetchall()
+            total = conn.execute(f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?',
+                                 (build_match_query(q),)).fetchone()[0]
+        fts_ms = (time.perf_counter() - started) / args.repeat * 1000
+        print(f"  {q:<14}{len(like):>10}{like_ms:>10.1f}{total:>10}{fts_ms:>10.1f}")
+    print("  （FTS 计时含取 BM25 前 50 条与统计总命中数；FTS 额外匹配 requirements / skills_required 列）")
+    conn.close()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM HTTP 客户端微基准：对比“每次调用新建连接”与“池化 keep-alive”两种模式。
+
+使用本地桩服务器模拟 Gemini 接口（纯 HTTP，仅体现 TCP 握手成本；
+真实环境中的 TLS 握手会让差距更明显）。
+
+用法：
+    python scripts/bench_llm_pool.py --calls 200 --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import llm_client
+
+RESPONSE_BODY = json.dumps({
+    'candidates': [{'content': {'parts': [{'text': '请介绍一下你最近的项目？'}]}}]
+}).encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(RESPONSE_BODY)))
+        self.end_headers()
+        self.wfile.write(RESPONSE_BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.stats_lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def run_mode(server, pooled: bool, calls: int, concurrency: int):
+    os.environ['LLM_HTTP_POOLING'] = '1' if pooled else '0'
+    llm_client.reset_sessions()
+    server.connections = 0
+    url = f'http://127.0.0.1:{server.server_address[1]}/v1beta/models/stub:generateContent'
+    payload = {'contents': [{'parts': [{'text': 'ping'}]}]}
+
+    def one_call(_):
+        started = time.perf_counter()
+        resp = llm_client.post('gemini', url, json=payload, timeout=10)
+        resp.raise_for_status()
+        resp.json()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one_call, range(calls)))
+    elapsed = time.perf_counter() - started
+    return {
+        'mode': 'pooled' if pooled else 'per-call',
+        'total_s': elapsed,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'connections': server.connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LLM HTTP 连接池微基准')
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    try:
+        # 预热一次，排除解释器/导入开销
+        run_mode(server, pooled=True, calls=min(10, args.calls), concurrency=1)
+        results = [
+            run_mode(server, pooled=False, calls=args.calls, concurrency=args.concurrency),
+            run_mode(server, pooled=True, calls=args.calls, concurrency=args.concurrency),
+        ]
+    finally:
+        server.shutdown()
+        llm_client.reset_sessions()
+
+    print(f"=== LLM HTTP 客户端基准（{args.calls} 次调用，并发 {args.concurrency}）===")
+    for r in results:
+        print(f"{r['mode']:>9}: 总耗时 {r['total_s']:.3f}s  平均 {r['mean_ms']:.2f}ms  "
+              f"p95 {r['p95_ms']:.2f}ms  新建连接 {r['connections']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准：每个请求加载当前用户（app.load_user 中的 User.query.get）的耗时与内存。
+
+在临时 SQLite 库中创建带大简历的用户，分别测量：
+  - before: 简历二进制在 user 行内、随用户一起加载（迁移前的映射）
+  - after:  运行 migrate_cv_blobs 迁移后，简历存放在 resume_blob、按需加载
+
+用法：
+    python scripts/bench_user_load.py --users 20 --cv-mb 5 --requests 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Ensure project root is on sys.path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def measure(app, load, user_ids, requests):
+    from app import db
+    latencies = []
+    peaks = []
+    with app.app_context():
+        for i in range(requests):
+            user_id = user_ids[i % len(user_ids)]
+            tracemalloc.start()
+            started = time.perf_counter()
+            user = load(user_id)
+            _ = user.first_name
+            latencies.append(time.perf_counter() - started)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            db.session.remove()  # 每个请求结束时清理会话，与线上一致
+    latencies.sort()
+    return {
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'peak_kb': sum(peaks) / len(peaks) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用户加载基准（简历二进制迁移前后）')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--cv-mb', type=float, default=5)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_user_load_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from sqlalchemy.orm import undefer
+    from app import create_app, db
+    from app.models import User
+    from migrate_cv_blobs import migrate_cv_blobs
+
+    app = create_app()
+    user_ids = []
+    with app.app_context():
+        db.create_all()
+        cv_bytes = int(args.cv_mb * 1024 * 1024)
+        for i in range(args.users):
+            user = User(first_name=f'bench{i}', last_name='user', company_name='-', email=f'bench{i}@example.com',
+                        phone_number='0', birthday='2000-01-01', password='x', cv_file=f'cv{i}.pdf')
+            db.session.add(user)
+            db.session.flush()
+            # 迁移前的布局：二进制直接写在 user.cv_data 列
+            db.session.execute(db.text("UPDATE user SET cv_data = :data WHERE id = :id"),
+                               {'data': os.urandom(cv_bytes), 'id': user.id})
+            user_ids.append(user.id)
+        db.session.commit()
+
+    before = measure(app, lambda uid: User.query.options(undefer(User.legacy_cv_data)).get(uid),
+                     user_ids, args.requests)
+    migrate_cv_blobs(vacuum=False)
+    after = measure(app, lambda uid: User.query.get(uid), user_ids, args.requests)
+
+    print(f"\n=== 用户加载基准（{args.users} 个用户，简历 {args.cv_mb}MB，{args.requests} 次请求）===")
+    for name, r in (('before', before), ('after', after)):
+        print(f"{name:>6}: 平均 {r['mean_ms']:.3f}ms  p95 {r['p95_ms']:.3f}ms  每请求峰值内存 {r['peak_kb']:.1f}KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本机向量编码服务（app/embedding_service.py）：启动时加载并预热模型，通过本地 socket 为 Web/任务 worker 编码。
+
+每台主机运行一个实例，并为 Web 与任务 worker 设置相同的 EMBEDDING_SERVICE。
+
+用法：
+    EMBEDDING_SERVICE=unix:instance/embedding.sock python scripts/embedding_server.py
+    python scripts/embedding_server.py --address 127.0.0.1:8765 --batch-size 64 --wait-ms 10
+    python scripts/embedding_server.py --ping     # 检查服务是否可用
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+# Ensure project root is on sys.path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import embedding_service, embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本机向量编码服务')
+    parser.add_argument('--address', default=None, help='unix:/path/to.sock 或 host:port，默认读取 EMBEDDING_SERVICE')
+    parser.add_argument('--batch-size', type=int, default=None, help='微批最大文本数')
+    parser.add_argument('--wait-ms', type=float, default=None, help='凑批最长等待（毫秒）')
+    parser.add_argument('--ping', action='store_true', help='检查服务状态后退出')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    address = args.address or embedding_service.service_address()
+    if not address:
+        print('❌ 请通过 --address 或 EMBEDDING_SERVICE 指定服务地址')
+        sys.exit(1)
+
+    if args.ping:
+        try:
+            info = embedding_service.EmbeddingClient(address).ping()
+            print(f"✅ 编码服务可用：{info['model']} (dim={info['dim']})")
+        except embedding_service.EmbeddingServiceError as e:
+            print(f'❌ 编码服务不可用: {e}')
+            sys.exit(1)
+        return
+
+    # 服务进程自身必须在本进程加载模型
+    os.environ.pop('EMBEDDING_SERVICE', None)
+    from app.utils import get_sentence_transformer
+    model = get_sentence_transformer()
+    if model is None:
+        print('❌ 无法加载 SentenceTransformer 模型')
+        sys.exit(1)
+
+    server = embedding_service.create_server(model, embeddings.model_name(), address=address,
+                                             max_batch=args.batch_size, max_wait_ms=args.wait_ms)
+    stop = lambda *_: threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    print(f'🚀 编码服务已启动：{address}（模型 {server.model_name}，dim={server.dim}）')
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.batcher.close()
+        if server.unix_path and os.path.exists(server.unix_path):
+            os.unlink(server.unix_path)
+        print(f'✅ 编码服务已退出，共执行 {server.batcher.batches} 个批次')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报告：int8 量化向量相对 float32 的排序漂移。
+
+默认语料为 testing_resumes/ 下的简历：每份简历整体以及每一行（>= 20 字符）各编码为一个向量，
+每个向量轮流作为查询，对其余向量按 float32 与 int8（QuantizedMatrix）分别打分排序，比较：
+  - recall@k：两种排序 top-k 的重合比例
+  - Spearman：完整排序的秩相关系数
+  - 分数误差：|float32 分数 - int8 分数| 的均值/最大值
+  - 每个向量的存储字节数
+
+需要可用的编码模型（进程内 SentenceTransformer 或 EMBEDDING_SERVICE）；
+--synthetic N 使用带簇结构的随机向量，可在没有模型时估计大规模下的漂移。
+
+用法：
+    python scripts/report_quantization_drift.py --k 5
+    python scripts/report_quantization_drift.py --synthetic 20000 --dim 768 --k 10
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+
+import numpy as np
+
+# Ensure project root is on sys.path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import embeddings
+from app.embeddings import QuantizedMatrix, normalize, to_bytes
+
+
+def resume_corpus(directory: str):
+    from app.extraction import extract
+    texts = []
+    for path in sorted(glob.glob(os.path.join(directory, '*'))):
+        try:
+            result = extract(path, os.path.basename(path))
+        except Exception as e:
+            print(f'⚠️ 跳过 {os.path.basename(path)}: {e}')
+            continue
+        text = '\n'.join(result['pages'])
+        texts.append(text)
+        texts.extend(line.strip() for line in text.splitlines() if len(line.strip()) >= 20)
+    return texts
+
+
+def synthetic_corpus(n: int, dim: int, topics: int = 200):
+    rng = np.random.default_rng(0)
+    centers = normalize(rng.standard_normal((topics, dim)))
+    return normalize(centers[rng.integers(0, topics, size=n)] + 0.03 * rng.standard_normal((n, dim)))
+
+
+def spearman(a, b):
+    ra = np.empty(len(a))
+    rb = np.empty(len(b))
+    ra[np.argsort(-a, kind='stable')] = np.arange(len(a))
+    rb[np.argsort(-b, kind='stable')] = np.arange(len(b))
+    return float(np.corrcoef(ra, rb)[0, 1]) if len(a) > 1 else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='int8 量化排序漂移报告')
+    parser.add_argument('--corpus', default=os.path.join(PROJECT_ROOT, 'testing_resumes'))
+    parser.add_argument('--synthetic', type=int, default=0, help='使用 N 个随机向量代替简历语料')
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200, help='最多使用多少个查询')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('pdfminer').setLevel(logging.WARNING)
+
+    if args.synthetic:
+        vectors = synthetic_corpus(args.synthetic, args.dim)
+        source = f'synthetic n={args.synthetic}'
+    else:
+        os.environ.setdefault('EXTRACT_POOL', '0')
+        texts = resume_corpus(args.corpus)
+        vectors = embeddings.encode(texts) if texts else None
+        if vectors is None:
+            print('❌ 编码模型不可用（或语料为空），可改用 --synthetic N')
+            sys.exit(1)
+        source = f'{args.corpus} ({len(texts)} 段文本)'
+
+    quantized = QuantizedMatrix.from_float(vectors)
+    n, dim = vectors.shape
+    k = min(args.k, n - 1)
+    recalls, correlations, errors = [], [], []
+    for q in range(min(n, args.queries)):
+        mask = np.arange(n) != q
+        exact = (vectors @ vectors[q])[mask]
+        approx = (quantized @ vectors[q])[mask]
+        top_exact = set(np.argpartition(-exact, k - 1)[:k])
+        top_approx = set(np.argpartition(-approx, k - 1)[:k])
+        recalls.append(len(top_exact & top_approx) / k)
+        correlations.append(spearman(exact, approx))
+        errors.append(np.abs(exact - approx))
+    errors = np.concatenate(errors)
+
+    print(f'📊 语料：{source}，dim={dim}，查询 {len(recalls)} 个')
+    print(f'  recall@{k}        {np.mean(recalls):.4f}（最差 {np.min(recalls):.4f}）')
+    print(f'  Spearman         {np.mean(correlations):.5f}（最差 {np.min(correlations):.5f}）')
+    print(f'  分数误差         均值 {errors.mean():.5f}，最大 {errors.max():.5f}')
+    print(f"  每向量存储       float32 {len(to_bytes(vectors[0], 'float32'))} B，"
+          f"int8 {len(to_bytes(vectors[0], 'int8'))} B")
+    print(f'  进程内矩阵       float32 {vectors.nbytes / 1e6:.2f} MB，int8 {quantized.nbytes / 1e6:.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务 worker：领取并执行任务队列（app/task_queue.py）中的任务，如简历解析与AI分析。
+
+与 Web 进程并行运行，可启动多个实例；Ctrl+C 会在当前任务完成后退出。
+run.py 默认已在 Web 进程内启动 worker 线程，单独部署 worker 时请设置 TASK_WORKER_EMBEDDED=0。
+
+用法：
+    python scripts/task_worker.py            # 常驻运行
+    python scripts/task_worker.py --once     # 处理完当前到期任务后退出（适合 cron）
+    python scripts/task_worker.py --stats    # 查看各状态任务数量
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+# Ensure project root is on sys.path
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app, task_queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description='后台任务 worker')
+    parser.add_argument('--once', action='store_true', help='处理完到期任务后退出')
+    parser.add_argument('--stats', action='store_true', help='打印任务状态统计后退出')
+    parser.add_argument('--purge-days', type=float, default=None, help='删除早于N天结束的任务后退出')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    # 创建应用会导入各蓝图，从而注册任务处理函数
+    app = create_app()
+    queue = task_queue.get_queue()
+
+    if args.stats:
+        print(f"📊 任务队列 {queue.db_path}")
+        for status, count in sorted(queue.counts().items()):
+            print(f"  {status}: {count}")
+        return
+    if args.purge_days is not None:
+        removed = queue.purge_finished(args.purge_days * 86400)
+        print(f"🧹 已删除 {removed} 条已结束的任务")
+        return
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    print(f"🚀 任务 worker 已启动，队列：{queue.db_path}")
+    processed = task_queue.run_worker(app, once=args.once, stop_event=stop_event)
+    print(f"✅ worker 退出，共处理 {processed} 个任务")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,25 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app, jsonify, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app, jsonify, session, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import os
+import re
+import json
 import logging
 from app.models import Job, Application, User, db
 from app.utils import (
     evaluate_cv,
     generate_interview_questions,
     generate_feedback,
-    extract_text_from_resume,
+    generate_feedback_batch,
+    get_user_resume_text,
     extract_text_from_file,
     allowed_file,
     get_allowed_cv_extensions,
 )
-from app.utils import _gemini_generate  # 使用 Gemini，避免走 HF 降级
+from app.utils import _gemini_generate, _generate_first_valid, llm_cache_ttl, stream_generate  # 使用 Gemini/DeepSeek，避免走 HF 降级
 from app import applications_collection
 from datetime import datetime
 from sqlalchemy import text
-from .candidate_ai import update_user_skills_from_resume
+from .candidate_ai import enqueue_resume_processing
 
 applications_bp = Blueprint('applications', __name__, url_prefix='/applications')
 
@@ -66,13 +69,12 @@ def pre_apply(job_id):
             g.user.cv_data = cv_data
             db.session.commit()
 
-            # 基于AI自动解析技能并保存
-            try:
-                parsed_skills = update_user_skills_from_resume(g.user, cv_data or b'', filename)
-                if parsed_skills:
-                    flash('已基于简历自动更新技能标签。', 'success')
-            except Exception as e:
-                current_app.logger.warning(f'AI skill extraction failed: {e}')
+            # 技能提取交给后台任务队列，申请流程无需等待
+            if cv_data:
+                try:
+                    enqueue_resume_processing(g.user, analyze=False)
+                except Exception as e:
+                    current_app.logger.warning(f'Failed to enqueue resume processing: {e}')
 
             flash('简历上传成功！', 'success')
             return redirect(url_for('smartrecruit.candidate.applications.apply', job_id=job_id))
@@ -115,52 +117,78 @@ def virtual_interview():
 
     return render_template('smartrecruit/candidate/virtual_interview.html')
 
+def _vi_cv_text(user):
+    """获取简历文本，若没有则根据资料拼接"""
+    try:
+        cv_text = get_user_resume_text(user) or ''
+    except Exception:
+        cv_text = ''
+    if not cv_text:
+        cv_text = f"姓名:{user.first_name} {user.last_name}\n公司:{user.company_name}\n职位:{user.position or ''}\n简介:{user.bio or ''}\n经验:{user.experience or ''}\n教育:{user.education or ''}\n技能:{user.skills or ''}"
+    return cv_text
+
+def _parse_vi_questions(text):
+    """解析模型输出的问题列表：优先JSON数组，否则按行切分"""
+    text = text.strip()
+    # 去掉markdown代码块围栏
+    text = text.replace('```json', '').replace('```', '').strip()
+    # 优先尝试提取方括号JSON
+    m = re.search(r"\[[\s\S]*\]", text)
+    if m:
+        try:
+            parsed = json.loads(m.group(0))
+            if isinstance(parsed, list):
+                questions = [str(x).strip().strip('"\'') for x in parsed if str(x).strip()]
+                if questions:
+                    return questions
+        except Exception:
+            pass
+    # 若仍未解析，按行切分并过滤噪声
+    lines = [ln.strip('- ').strip() for ln in text.splitlines() if ln.strip()]
+    filtered = [ln for ln in lines if ln not in ('[',']','```json','```')]
+    return filtered or None
+
+def _clean_streamed_question(line):
+    """清理流式输出中的一行：去掉编号、项目符号、引号与 JSON/代码块噪声"""
+    line = line.strip().rstrip(',').strip()
+    if line in ('', '[', ']', '```', '```json'):
+        return []
+    if line.startswith('[') and line.endswith(']'):
+        return _parse_vi_questions(line) or []
+    line = re.sub(r'^(\d+[\.\)、]|[-*•])\s*', '', line).strip().strip('"\'').strip()
+    return [line] if line else []
+
+def _vi_score_prompt(question, answer, job_desc):
+    return (
+        "使用中文，对候选人的回答给出简洁、可执行的反馈，并在最后单独一行输出‘评分：X/10’。\n"
+        f"问题：{question}\n回答：{answer}\n职位描述：{job_desc}\n反馈："
+    )
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sse_response(events):
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @applications_bp.route('/api/virtual_interview/start', methods=['GET'])
 def api_vi_start():
     """返回基于简历/资料动态生成的问题列表。"""
     if g.user is None:
         return jsonify({'success': False, 'message': '请先登录'}), 401
     try:
-        # 获取简历文本，若没有则根据资料拼接
-        cv_text = ''
-        if getattr(g.user, 'cv_data', None) and getattr(g.user, 'cv_file', None):
-            try:
-                cv_text = extract_text_from_resume(g.user.cv_data, g.user.cv_file) or ''
-            except Exception:
-                cv_text = ''
-        if not cv_text:
-            cv_text = f"姓名:{g.user.first_name} {g.user.last_name}\n公司:{g.user.company_name}\n职位:{g.user.position or ''}\n简介:{g.user.bio or ''}\n经验:{g.user.experience or ''}\n教育:{g.user.education or ''}\n技能:{g.user.skills or ''}"
+        cv_text = _vi_cv_text(g.user)
         job_desc = request.args.get('job_desc', '')
 
-        # 强制优先使用 Gemini，避免走 HF
+        # 仅使用 Gemini/DeepSeek，避免走 HF
         prompt = (
             "基于以下候选人简历与职位描述，用中文生成5道不重复的结构化面试问题。\n"
             "每道题尽量具体，长度不超过40字。只输出JSON数组，数组元素为字符串，不要任何额外文字。\n"
             f"简历:\n{cv_text}\n职位描述:\n{job_desc}\n输出:"
         )
-        questions = None
-        gem = _gemini_generate(prompt, max_tokens=600)
-        if gem:
-            import json, re
-            text = gem.strip()
-            # 去掉markdown代码块围栏
-            text = text.replace('```json', '').replace('```', '').strip()
-            # 优先尝试提取方括号JSON
-            m = re.search(r"\[[\s\S]*\]", text)
-            if m:
-                candidate = m.group(0)
-                try:
-                    parsed = json.loads(candidate)
-                    if isinstance(parsed, list):
-                        questions = [str(x).strip().strip('"\'') for x in parsed if str(x).strip()]
-                except Exception:
-                    questions = None
-            # 若仍未解析，按行切分并过滤噪声
-            if not questions:
-                lines = [ln.strip('- ').strip() for ln in text.splitlines() if ln.strip()]
-                filtered = [ln for ln in lines if ln not in ('[',']','```json','```')]
-                if filtered:
-                    questions = filtered
+        # Gemini 为主、DeepSeek 对冲竞速，取先返回的有效结果
+        questions = _generate_first_valid(prompt, 600, _parse_vi_questions, providers=('gemini', 'deepseek'),
+                                         cache_ttl=llm_cache_ttl('vi_questions'))
 
         if not questions:
             # 退回到旧的通用生成（内部仍可能降级），再取前5
@@ -172,6 +200,49 @@ def api_vi_start():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@applications_bp.route('/api/virtual_interview/start/stream', methods=['GET'])
+def api_vi_start_stream():
+    """流式版本：以 SSE 逐题推送（question 事件），结束时 done 事件携带与 JSON 接口相同的结构。"""
+    if g.user is None:
+        return jsonify({'success': False, 'message': '请先登录'}), 401
+    cv_text = _vi_cv_text(g.user)
+    job_desc = request.args.get('job_desc', '')
+    # 逐行输出便于边生成边推送
+    prompt = (
+        "基于以下候选人简历与职位描述，用中文生成5道不重复的结构化面试问题。\n"
+        "每道题尽量具体，长度不超过40字。每行输出一道题，不要编号、引号或任何额外文字。\n"
+        f"简历:\n{cv_text}\n职位描述:\n{job_desc}\n输出:"
+    )
+
+    def events():
+        questions = []
+        buffer = ''
+        try:
+            for chunk in stream_generate(prompt, 600, providers=('gemini', 'deepseek'),
+                                         cache_ttl=llm_cache_ttl('vi_questions')):
+                buffer += chunk
+                *lines, buffer = buffer.split('\n')
+                for line in lines:
+                    for q in _clean_streamed_question(line):
+                        if len(questions) < 5:
+                            questions.append(q)
+                            yield _sse('question', {'index': len(questions) - 1, 'question': q})
+            for q in _clean_streamed_question(buffer):
+                if len(questions) < 5:
+                    questions.append(q)
+                    yield _sse('question', {'index': len(questions) - 1, 'question': q})
+        except Exception as e:
+            logging.warning(f"Streaming interview questions failed: {e}")
+        if not questions:
+            # 缓冲降级：通用生成（内部仍可能降级），再取前5
+            generated = generate_interview_questions(cv_text, job_desc)
+            questions = generated[:5] if isinstance(generated, list) else []
+            for i, q in enumerate(questions):
+                yield _sse('question', {'index': i, 'question': q})
+        yield _sse('done', {'success': True, 'questions': questions})
+
+    return _sse_response(events())
+
 @applications_bp.route('/api/virtual_interview/score', methods=['POST'])
 def api_vi_score():
     """对单题作答给出反馈和（文本中包含）评分。"""
@@ -185,16 +256,43 @@ def api_vi_score():
         if not q or not a:
             return jsonify({'success': False, 'message': '缺少问题或答案'}), 400
         # 先用 Gemini 直接打分
-        prompt = (
-            "使用中文，对候选人的回答给出简洁、可执行的反馈，并在最后单独一行输出‘评分：X/10’。\n"
-            f"问题：{q}\n回答：{a}\n职位描述：{job_desc}\n反馈："
-        )
-        fb = _gemini_generate(prompt, max_tokens=400)
+        prompt = _vi_score_prompt(q, a, job_desc)
+        fb = _gemini_generate(prompt, max_tokens=400, cache_ttl=llm_cache_ttl('vi_score'))
         feedback = (fb.strip() if fb else None) or generate_feedback(q, a, job_desc)
         return jsonify({'success': True, 'feedback': feedback})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@applications_bp.route('/api/virtual_interview/score/stream', methods=['POST'])
+def api_vi_score_stream():
+    """流式版本：以 SSE 推送反馈片段（token 事件），结束时 done 事件携带完整反馈。"""
+    if g.user is None:
+        return jsonify({'success': False, 'message': '请先登录'}), 401
+    data = request.get_json(silent=True) or {}
+    q = data.get('question', '')
+    a = data.get('answer', '')
+    job_desc = data.get('job_desc', '')
+    if not q or not a:
+        return jsonify({'success': False, 'message': '缺少问题或答案'}), 400
+    prompt = _vi_score_prompt(q, a, job_desc)
+
+    def events():
+        parts = []
+        try:
+            for chunk in stream_generate(prompt, 400, providers=('gemini',), cache_ttl=llm_cache_ttl('vi_score')):
+                parts.append(chunk)
+                yield _sse('token', {'text': chunk})
+        except Exception as e:
+            logging.warning(f"Streaming interview feedback failed: {e}")
+        feedback = ''.join(parts).strip()
+        if not feedback:
+            # 缓冲降级：DeepSeek/HF/本地评分
+            feedback = generate_feedback(q, a, job_desc)
+            yield _sse('token', {'text': feedback})
+        yield _sse('done', {'success': True, 'feedback': feedback})
+
+    return _sse_response(events())
+
 @applications_bp.route('/virtual_feedback', methods=['GET'])
 def virtual_feedback():
     """AI 虚拟面试反馈（仅前端界面，不接入API）"""
@@ -347,13 +445,15 @@ def generate_feedbacks():
         flash('面试数据不完整，请重新开始。', 'danger')
         return redirect(url_for('smartrecruit.candidate.jobs.job_list'))
 
-    # 生成反馈
+    # 生成反馈：所有问答并发评分（或单次批量评分），保持题目顺序
+    job = Job.query.get(job_id)
+    job_description = job.description if job else ''
+    answered = [(question, responses.get(str(i), '')) for i, question in enumerate(questions)]
+    feedback_texts = generate_feedback_batch(answered, job_description)
+
     feedbacks = []
     total_score = 0
-    
-    for i, question in enumerate(questions):
-        response = responses.get(str(i), '')
-        feedback = generate_feedback(question, response)
+    for (question, response), feedback in zip(answered, feedback_texts):
         feedbacks.append({
             'question': question,
             'response': response,
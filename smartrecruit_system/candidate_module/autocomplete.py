@@ -0,0 +1,301 @@
+"""
+职位搜索框的输入联想（search-as-you-type）。
+
+进程内的有序数组索引，词条来自职位标题、公司名、工作地点（按使用该词条的职位数加权）
+以及 recommendation_config 中的技能词典。每个词条生成若干前缀键：
+
+  - 小写原文，以及从词中各分段（空白/标点分隔、中英文交界）起始的后缀（「Python 开发工程师」也可由「开发」联想）
+  - 含中文时的全拼与首字母（「数据分析师」-> shujufenxishi / sjfxs），需要安装 pypinyin
+
+(键, 词条 ID) 按键排序存放，前缀查询用 bisect 定位区间；区间较小时直接按权重取前 N，
+区间很大（一两个字母的前缀）时结果按前缀缓存，词条变化时清除受影响前缀的缓存。
+
+职位发布/编辑/删除时由 hr_module/recruitment.py 调用 update_job_terms 增量更新（写入前用 signature_before_write
+记下职位表状态；若索引在那之前已落后于其它进程的修改，则不做增量更新，改为下次查询时整体重建）；
+其它进程中的变化每隔 AUTOCOMPLETE_REFRESH_INTERVAL 秒检查一次职位表，变化时整体重建。
+
+Env:
+  - AUTOCOMPLETE_REFRESH_INTERVAL: 检查职位表变化的间隔（秒），默认 30
+"""
+import os
+import re
+import time
+import heapq
+import bisect
+import logging
+import threading
+try:
+    from pypinyin import lazy_pinyin  # type: ignore
+except Exception:
+    lazy_pinyin = None  # type: ignore
+
+from .recommendation_config import SKILL_CATEGORIES, CHINESE_SKILLS
+
+# 结果中同权重时的类型顺序
+TERM_TYPES = ('title', 'skill', 'company', 'location')
+MAX_SUGGESTIONS = 20
+# 前缀区间超过该条数时改用按前缀缓存的结果
+SCAN_LIMIT = 512
+# 每个词条最多从前几个分段起始生成后缀键
+MAX_SEGMENTS = 4
+# Job.company_name 的默认值，不作为联想词
+_PLACEHOLDER_COMPANY = '未知公司'
+
+_SEP = r'\s/\\|、,，;；:：()（）\[\]【】<>《》\-_·.。+&'
+_CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK = re.compile(f'[{_CJK_CHARS}]')
+# 分段起始：分隔符之后、英文/数字与中文交界处
+_SEGMENT_START = re.compile(f'(?<=[{_SEP}])[^{_SEP}]|(?<=[a-zA-Z0-9])[{_CJK_CHARS}]|(?<=[{_CJK_CHARS}])[a-zA-Z0-9]')
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text: str) -> str:
+    """查询与键的规范化：小写、去掉首尾空白、连续空白合并为一个空格。"""
+    return ' '.join((text or '').lower().split())
+
+
+def _pinyin_keys(text: str):
+    # 非中文片段原样返回，并加 \x00 标记，以便首字母键保留完整的英文/数字
+    tokens = lazy_pinyin(text, errors=lambda chars: ['\x00' + chars])
+    full = _NON_ALNUM.sub('', ''.join(token.lstrip('\x00') for token in tokens).lower())
+    initials = _NON_ALNUM.sub('', ''.join(token[1:] if token.startswith('\x00') else token[:1]
+                                         for token in tokens).lower())
+    return full, initials
+
+
+def term_keys(text: str) -> set:
+    """词条的全部前缀键。"""
+    starts = [0] + [match.start() for match in _SEGMENT_START.finditer(text)]
+    keys = set()
+    for start in starts[:MAX_SEGMENTS]:
+        suffix = text[start:]
+        keys.add(normalize(suffix))
+        if lazy_pinyin is not None and _CJK.search(suffix):
+            keys.update(_pinyin_keys(suffix))
+    keys.discard('')
+    return keys
+
+
+class AutocompleteIndex:
+    """有序 (键, 词条 ID) 数组上的前缀查询，支持增量增删词条，线程安全。"""
+
+    def __init__(self):
+        self._terms = []      # 词条 ID -> [类型, 原文, 权重, 键集合]；删除后为 None
+        self._ids = {}        # (类型, 原文) -> 词条 ID
+        self._entries = []    # 按键排序的 (键, 词条 ID)
+        self._top = {}        # 前缀 -> 排好序的词条 ID（只缓存大区间）
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, weighted_terms):
+        """weighted_terms: [(类型, 原文, 权重), ...]，一次性构建（最后整体排序）。"""
+        index = cls()
+        for kind, text, weight in weighted_terms:
+            index._add(kind, text, weight, bulk=True)
+        index._entries.sort()
+        return index
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _invalidate(self, keys):
+        if self._top:
+            for key in keys:
+                for end in range(1, len(key) + 1):
+                    self._top.pop(key[:end], None)
+
+    def _add(self, kind, text, weight, bulk=False):
+        text = (text or '').strip()
+        if not text or weight <= 0:
+            return
+        term_id = self._ids.get((kind, text))
+        if term_id is None:
+            term_id = len(self._terms)
+            keys = term_keys(text)
+            self._terms.append([kind, text, 0, keys])
+            self._ids[(kind, text)] = term_id
+            for key in keys:
+                if bulk:
+                    self._entries.append((key, term_id))
+                else:
+                    bisect.insort(self._entries, (key, term_id))
+        term = self._terms[term_id]
+        term[2] += weight
+        if not bulk:
+            self._invalidate(term[3])
+
+    def _remove(self, kind, text, weight):
+        term_id = self._ids.get((kind, (text or '').strip()))
+        if term_id is None:
+            return
+        term = self._terms[term_id]
+        term[2] -= weight
+        self._invalidate(term[3])
+        if term[2] <= 0:
+            for key in term[3]:
+                position = bisect.bisect_left(self._entries, (key, term_id))
+                if position < len(self._entries) and self._entries[position] == (key, term_id):
+                    del self._entries[position]
+            del self._ids[(term[0], term[1])]
+            self._terms[term_id] = None
+
+    def add(self, kind, text, weight=1):
+        with self._lock:
+            self._add(kind, text, weight)
+
+    def remove(self, kind, text, weight=1):
+        with self._lock:
+            self._remove(kind, text, weight)
+
+    def _rank_key(self, term_id):
+        kind, text, weight, _ = self._terms[term_id]
+        return (-weight, len(text), TERM_TYPES.index(kind), text)
+
+    def _ranked(self, lo, hi, limit):
+        term_ids = {term_id for _, term_id in self._entries[lo:hi]}
+        return heapq.nsmallest(limit, term_ids, key=self._rank_key)
+
+    def suggest(self, prefix: str, limit: int = 8) -> list:
+        """返回 [{'text', 'type', 'count'}]，按权重倒序；同一原文只保留排名最前的类型。"""
+        prefix = normalize(prefix)
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        if not prefix:
+            return []
+        with self._lock:
+            lo = bisect.bisect_left(self._entries, (prefix,))
+            hi = bisect.bisect_left(self._entries, (prefix + '\U0010ffff',))
+            # 多取一些，去重后仍能凑满 limit 条
+            if hi - lo > SCAN_LIMIT:
+                ranked = self._top.get(prefix)
+                if ranked is None:
+                    ranked = self._top[prefix] = self._ranked(lo, hi, MAX_SUGGESTIONS * 2)
+            else:
+                ranked = self._ranked(lo, hi, limit * 2)
+            suggestions, seen = [], set()
+            for term_id in ranked:
+                kind, text, weight, _ = self._terms[term_id]
+                if text.lower() in seen:
+                    continue
+                seen.add(text.lower())
+                suggestions.append({'text': text, 'type': kind, 'count': weight})
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
+
+
+def skill_terms():
+    """技能词典中的词条，权重为 1。"""
+    skills = {skill for group in list(SKILL_CATEGORIES.values()) + list(CHINESE_SKILLS.values()) for skill in group}
+    return [('skill', skill, 1) for skill in sorted(skills)]
+
+
+def job_terms(job) -> list:
+    """一个职位贡献的 (类型, 原文)；职位变化前后各取一次传给 update_job_terms。"""
+    terms = [('title', job.title), ('company', job.company_name), ('location', job.location)]
+    return [(kind, text.strip()) for kind, text in terms
+            if text and text.strip() and not (kind == 'company' and text.strip() == _PLACEHOLDER_COMPANY)]
+
+
+class AutocompleteHolder:
+    """进程内的 AutocompleteIndex，每隔 refresh_interval 秒检查一次职位表（Job.change_signature），变化时重建。"""
+
+    def __init__(self, refresh_interval: float = 30):
+        self.refresh_interval = refresh_interval
+        self._index = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _current_signature():
+        from app.models import Job
+        return Job.change_signature()
+
+    @staticmethod
+    def _load() -> AutocompleteIndex:
+        from app.models import Job, db
+        weighted = skill_terms()
+        for kind, column in (('title', Job.title), ('company', Job.company_name), ('location', Job.location)):
+            weighted.extend((kind, text, count) for text, count in db.session.query(column, db.func.count())
+                            .group_by(column) if not (kind == 'company' and text == _PLACEHOLDER_COMPANY))
+        return AutocompleteIndex.build(weighted)
+
+    def index(self) -> AutocompleteIndex:
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < self.refresh_interval:
+            return self._index
+        with self._lock:
+            if self._index is None or now - self._checked_at >= self.refresh_interval:
+                signature = self._current_signature()
+                if self._index is None or signature != self._signature:
+                    started = time.perf_counter()
+                    self._index = self._load()
+                    self._signature = signature
+                    logging.info(f"Built autocomplete index with {len(self._index)} terms "
+                                 f"in {time.perf_counter() - started:.2f}s")
+                self._checked_at = time.monotonic()
+        return self._index
+
+    def update(self, old_terms, new_terms, before=None):
+        """
+        增量更新（索引尚未构建时不处理，首次查询时整体构建）。
+
+        before 为本进程写入前的职位表状态：与索引记录的状态一致时说明索引此前是最新的，应用增量后记下新状态；
+        否则（其它进程在此期间有修改，或未提供 before）标记为过期，下次查询时检查职位表并整体重建。
+        """
+        with self._lock:
+            if self._index is None:
+                return
+            if before is None or before != self._signature:
+                self._checked_at = 0.0
+                return
+            for kind, text in old_terms:
+                self._index.remove(kind, text)
+            for kind, text in new_terms:
+                self._index.add(kind, text)
+            # 本进程的变化已经应用，记下新的职位表状态，避免下次检查时整体重建
+            self._signature = self._current_signature()
+
+
+_holder = None
+_holder_lock = threading.Lock()
+
+
+def get_autocomplete() -> AutocompleteHolder:
+    global _holder
+    if _holder is None:
+        with _holder_lock:
+            if _holder is None:
+                _holder = AutocompleteHolder(float(os.getenv('AUTOCOMPLETE_REFRESH_INTERVAL', '30')))
+    return _holder
+
+
+def reset_autocomplete():
+    global _holder
+    with _holder_lock:
+        _holder = None
+
+
+def suggest(prefix: str, limit: int = 8) -> list:
+    return get_autocomplete().index().suggest(prefix, limit)
+
+
+def signature_before_write():
+    """职位发布/编辑/删除写入前调用，返回当时的职位表状态，提交后传给 update_job_terms；索引未构建时返回 None。"""
+    if _holder is None or _holder._index is None:
+        return None
+    try:
+        return _holder._current_signature()
+    except Exception as e:
+        logging.warning(f"Failed to read job table signature: {e}")
+        return None
+
+
+def update_job_terms(old_terms=(), new_terms=(), before=None):
+    """职位发布/编辑/删除提交后调用，before 为 signature_before_write() 的返回值；失败只记录日志（下次检查职位表时会整体重建）。"""
+    if _holder is None:
+        return
+    try:
+        _holder.update(old_terms, new_terms, before)
+    except Exception as e:
+        logging.warning(f"Failed to update autocomplete index: {e}")
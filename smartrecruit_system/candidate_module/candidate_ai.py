@@ -1,25 +1,59 @@
 from flask import current_app
-from app.models import db
-from app.utils import extract_text_from_resume, ai_extract_skills_from_text
+from app.models import db, User
+from app.utils import extract_text_from_resume, ai_extract_skills_from_text, ai_analyze_resume_text
+from app import task_queue
+from app.embeddings import upsert_candidate_embedding
+from .recommendation_cache import invalidate_user
 
-def update_user_skills_from_resume(user, file_bytes: bytes, filename: str) -> list:
+RESUME_TASK = 'resume_processing'
+
+def update_user_skills_from_resume(user, file_bytes: bytes, filename: str, resume_text: str = None) -> list:
     """从上传的简历文件中解析文本，调用AI提取技能，并保存到User.skills(JSON字符串)。
 
     Returns: 提取到的技能列表
     """
-    resume_text = ''
-    try:
-        resume_text = extract_text_from_resume(file_bytes, filename) or ''
-    except Exception:
-        resume_text = ''
+    if resume_text is None:
+        try:
+            resume_text = extract_text_from_resume(file_bytes, filename) or ''
+        except Exception:
+            resume_text = ''
 
     skills = ai_extract_skills_from_text(resume_text or (getattr(user, 'position', '') or '') )
     try:
         import json
         user.skills = json.dumps(skills, ensure_ascii=False)
         db.session.commit()
+        invalidate_user(user.id)
     except Exception as e:
         current_app.logger.warning(f'Failed to save AI skills: {e}')
     return skills
 
+def enqueue_resume_processing(user, analyze: bool = True) -> int:
+    """上传简历后排队：后台解析文本、提取技能并（可选）生成分析报告，返回任务ID"""
+    return task_queue.enqueue(RESUME_TASK, {'user_id': user.id, 'filename': user.cv_file, 'analyze': analyze},
+                              user_id=user.id)
 
+@task_queue.register(RESUME_TASK)
+def process_resume(payload: dict) -> dict:
+    """后台任务：解析简历文本 -> 更新技能标签 -> 生成简历分析报告"""
+    user = User.query.get(payload['user_id'])
+    # 用户已删除或已重新上传简历，本任务作废
+    if user is None or user.cv_file != payload.get('filename'):
+        return {'skipped': True}
+    filename = user.cv_file
+    cv_data = user.cv_data or b''
+    resume_text = ''
+    if cv_data:
+        resume_text = extract_text_from_resume(cv_data, filename) or ''
+
+    skills = update_user_skills_from_resume(user, cv_data, filename, resume_text=resume_text)
+    result = {'skills': skills}
+    try:
+        result['embedded'] = upsert_candidate_embedding(user.id, resume_text)
+        # 简历向量决定语义召回的职位，更新后同样让推荐缓存失效
+        invalidate_user(user.id)
+    except Exception as e:
+        current_app.logger.warning(f'Failed to embed resume for user {user.id}: {e}')
+    if payload.get('analyze'):
+        result['analysis'] = ai_analyze_resume_text(resume_text)
+    return result
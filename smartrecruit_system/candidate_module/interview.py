@@ -117,9 +117,9 @@ def start_interview(job_id):
         
         # 获取用户简历内容
         cv_text = ""
-        if g.user.cv_data:
-            from app.utils import extract_text_from_resume
-            cv_text = extract_text_from_resume(g.user.cv_data, g.user.cv_file or "resume.pdf")
+        if g.user.has_cv:
+            from app.utils import get_user_resume_text
+            cv_text = get_user_resume_text(g.user, "resume.pdf")
         
         if not cv_text:
             # 如果没有简历文件，使用用户资料
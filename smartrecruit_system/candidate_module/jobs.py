@@ -1,10 +1,17 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app, jsonify
 from app.models import Job, db
+from app.skill_matcher import extract_skills, RECRUIT
+from app.job_skills import load_job_skills
+from app.job_search import search_jobs
+from app.job_pagination import paginate_jobs, paginate_scored, InvalidCursor
+from app.job_facets import job_filters, apply_filters, search_facets
+import time
 import logging
+from datetime import datetime, timedelta
+from .autocomplete import suggest, MAX_SUGGESTIONS
 from .recommendation_config import (
-    RECOMMENDATION_WEIGHTS, SKILL_CATEGORIES, CHINESE_SKILLS, 
-    EXPERIENCE_LEVELS, RECOMMENDATION_PARAMS, COMPANY_SKILL_MAPPING,
-    OPTIMIZATION_CONFIG
+    RECOMMENDATION_WEIGHTS, EXPERIENCE_LEVELS, RECOMMENDATION_PARAMS,
+    COMPANY_SKILL_MAPPING, OPTIMIZATION_CONFIG
 )
 
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
@@ -36,9 +43,10 @@ def job_list():
         flash('请先登录。', 'danger')
         return redirect(url_for('common.auth.sign'))
     
+    next_cursor = None
     try:
-        # 获取所有职位（移除status过滤，因为Job模型没有这个字段）
-        jobs = Job.query.order_by(Job.date_posted.desc()).all()
+        # 只取第一页（移除status过滤，因为Job模型没有这个字段），后续页由页面滚动时通过搜索接口加载
+        jobs, next_cursor = paginate_jobs(Job.query, limit=request.args.get('limit', type=int))
         
         # 获取推荐职位（基于用户技能）
         recommended_jobs = get_job_recommendations(g.user)
@@ -54,6 +62,7 @@ def job_list():
     
     return render_template('smartrecruit/candidate/snippet_career_list.html', 
                          jobs=jobs, 
+                         next_cursor=next_cursor,
                          recommended_jobs=recommended_jobs,
                          user_skills=user_skills)
 
@@ -81,17 +90,21 @@ def job_search():
     query = request.args.get('q', '')
     location = request.args.get('location', '')
     
+    next_cursor = None
     try:
         # 构建查询（移除status过滤）
         jobs_query = Job.query
+        rank = None
         
         if query:
-            jobs_query = jobs_query.filter(Job.title.contains(query) | Job.description.contains(query))
+            # SQLite 下走 FTS5 全文索引并按相关度排序，否则回退为 LIKE
+            jobs_query, rank = search_jobs(jobs_query, query)
         
         if location:
             jobs_query = jobs_query.filter(Job.location.contains(location))
         
-        jobs = jobs_query.order_by(Job.date_posted.desc()).all()
+        # 只取第一页，后续页由页面滚动时通过搜索接口加载
+        jobs, next_cursor = paginate_jobs(jobs_query, limit=request.args.get('limit', type=int), rank=rank)
     except Exception as e:
         flash('搜索职位失败，请稍后重试。', 'danger')
         jobs = []
@@ -104,6 +117,7 @@ def job_search():
 
     return render_template('smartrecruit/candidate/job_search.html', 
                          jobs=jobs, 
+                         next_cursor=next_cursor,
                          query=query, 
                          location=location,
                          user_skills=user_skills)
@@ -145,12 +159,22 @@ def job_recommendations():
 
 @jobs_bp.route('/api/search_jobs')
 def api_search_jobs():
-    """智能搜索API"""
+    """
+    智能搜索API（游标分页）
+
+    每次返回一页（limit，默认 20、最多 100），按匹配度降序。匹配度在窗口内排序（job_pagination.paginate_scored）：
+    按发布时间倒序（有关键词且走全文索引时按相关度）每 SCORE_WINDOW_PAGES（5）页职位为一个窗口，窗口内全部打分后分页，
+    因此每次请求最多为 5 * limit 个职位打分。next_cursor 非空时带上 cursor=next_cursor 请求下一页。
+    total 为满足条件的职位总数，facets 为地点/职位类型/经验要求/薪资区间的计数（app/job_facets.py），
+    都只在第一页计算。
+    """
     if g.user is None:
         return jsonify({'error': '请先登录'}), 401
     
     try:
         query = request.args.get('q', '')
+        cursor = request.args.get('cursor') or None
+        limit = request.args.get('limit', type=int)
         location = request.args.get('location', '')
         salary_min = request.args.get('salary_min', type=float)
         salary_max = request.args.get('salary_max', type=float)
@@ -158,32 +182,29 @@ def api_search_jobs():
         experience_level = request.args.get('experience_level', '')
         
         # 构建查询
-        jobs_query = Job.query
+        matched_query = Job.query
+        rank = None
         
         if query:
-            jobs_query = jobs_query.filter(Job.title.contains(query) | Job.description.contains(query))
-        
-        if location:
-            jobs_query = jobs_query.filter(Job.location.contains(location))
-        
-        if salary_min is not None:
-            jobs_query = jobs_query.filter(Job.salary >= salary_min)
-        
-        if salary_max is not None:
-            jobs_query = jobs_query.filter(Job.salary <= salary_max)
+            matched_query, rank = search_jobs(matched_query, query)
         
-        if job_type:
-            jobs_query = jobs_query.filter(Job.job_type == job_type)
+        # 地点、职位类型、经验要求与薪资区间（月薪，元，区间有交集即可）
+        filter_params = dict(location=location, job_type=job_type, experience_level=experience_level,
+                             salary_min=salary_min, salary_max=salary_max)
+        jobs_query = apply_filters(matched_query, job_filters(**filter_params))
         
-        if experience_level:
-            jobs_query = jobs_query.filter(Job.experience_level == experience_level)
-        
-        jobs = jobs_query.order_by(Job.date_posted.desc()).all()
-        
-        # 计算技能匹配度
+        total = jobs_query.order_by(None).count() if cursor is None else None
+        # 各分面取值的计数（不应用该分面自身的筛选），同样只在第一页计算
+        facets = search_facets(matched_query, query, **filter_params) if cursor is None else None
+
+        def score(jobs):
+            job_keywords = get_job_keywords_map(jobs)
+            return [calculate_job_match(g.user, job, job_keywords[job.id]) for job in jobs]
+
+        # 按技能匹配度排序的一页
+        scored, next_cursor = paginate_scored(jobs_query, score, cursor=cursor, limit=limit, rank=rank)
         jobs_with_match = []
-        for job in jobs:
-            match_score = calculate_job_match(g.user, job)
+        for job, match_score in scored:
             jobs_with_match.append({
                 'id': job.id,
                 'title': job.title,
@@ -194,34 +215,141 @@ def api_search_jobs():
                 'match_score': match_score
             })
         
-        # 按匹配度排序
-        jobs_with_match.sort(key=lambda x: x['match_score'], reverse=True)
-        
         return jsonify({
             'success': True,
             'jobs': jobs_with_match,
-            'total': len(jobs_with_match)
+            'total': total,
+            'facets': facets,
+            'next_cursor': next_cursor
         })
         
+    except InvalidCursor:
+        return jsonify({
+            'success': False,
+            'message': '无效的分页游标'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'搜索失败: {str(e)}'
         }), 500
 
+@jobs_bp.route('/api/autocomplete')
+def api_autocomplete():
+    """
+    搜索框输入联想：按前缀（含拼音全拼/首字母）返回职位标题、技能、公司、地点词条
+
+    只查进程内索引（autocomplete.py），除定期检查职位表是否变化外不访问数据库，可在每次按键时调用。
+    """
+    if g.user is None:
+        return jsonify({'error': '请先登录'}), 401
+    
+    try:
+        limit = min(max(request.args.get('limit', 8, type=int), 1), MAX_SUGGESTIONS)
+        return jsonify({
+            'success': True,
+            'suggestions': suggest(request.args.get('q', ''), limit)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'联想失败: {str(e)}'
+        }), 500
+
 def get_job_recommendations(user):
-    """获取职位推荐"""
+    """获取职位推荐（按用户缓存前 N 个职位及分数，见 recommendation_cache.py）"""
     try:
-        # 获取所有职位
-        all_jobs = Job.query.all()
+        from .recommendation_engine import available, get_engine
+        from . import recommendation_cache
+        features = get_engine().features() if available() else None
+        use_cache = recommendation_cache.enabled() and getattr(user, 'id', None) is not None
+        cache_key = (recommendation_cache.user_fingerprint(user), getattr(features, 'version', None))
+        ranked = recommendation_cache.get_cache().get(user.id, cache_key) if use_cache else None
+        if ranked is None:
+            # 先读离线批量计算的结果，用户资料在那之后有变化时才实时打分
+            ranked = load_precomputed_recommendations(user)
+            if ranked is None:
+                ranked = rank_jobs(user, features)
+            if use_cache:
+                recommendation_cache.get_cache().set(user.id, cache_key, ranked, get_fresh_boost_deadline(features))
+        jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in ranked]))}
+        return [{'job': jobs_by_id[job_id], 'match_score': score}
+                for job_id, score in ranked if job_id in jobs_by_id]
+        
+    except Exception as e:
+        logging.error(f"获取职位推荐失败: {e}")
+        return []
+
+def rank_jobs(user, features=None):
+    """实时计算推荐，返回按分数降序的 [(job_id, 分数)]；features 为向量化打分的职位特征快照，None 时逐职位打分"""
+    # 有简历向量时先用 ANN 索引召回语义最相近的职位，否则遍历所有职位
+    semantic_scores = get_semantic_job_candidates(user)
+    if features is not None:
+        # 向量化打分，结果与逐职位流程一致
+        return features.recommend(user, semantic_scores)
+    return [(rec['job'].id, rec['match_score']) for rec in score_job_recommendations(user, semantic_scores)]
+
+def load_precomputed_recommendations(user):
+    """
+    读取离线计算的推荐 [(job_id, 分数)]。没有记录、表不可用，或计算后用户资料变化、职位表变化、
+    新职位提升窗口已变化（expires_at 已过）时返回 None，由调用方实时打分。
+    """
+    try:
+        from app.models import JobRecommendation
+        from .recommendation_cache import user_fingerprint
+        from .recommendation_engine import jobs_signature
+        # SAVEPOINT 中查询：表尚未创建时不影响当前事务
+        with db.session.begin_nested():
+            rows = JobRecommendation.query.filter_by(user_id=user.id).order_by(JobRecommendation.rank).all()
+        if not rows or rows[0].profile_hash != user_fingerprint(user):
+            return None
+        if rows[0].expires_at is not None and rows[0].expires_at <= datetime.utcnow():
+            return None
+        if rows[0].jobs_signature != jobs_signature():
+            return None
+        return [(row.job_id, row.score) for row in rows if row.job_id is not None]
+    except Exception as e:
+        logging.warning(f"读取离线推荐失败: {e}")
+        return None
+
+def get_fresh_window_end(features=None):
+    """最近一个职位离开「7 天内发布」提升窗口的时刻（UTC），推荐分数届时会变化；无此类职位返回 None"""
+    if not OPTIMIZATION_CONFIG['enable_fresh_job_boost']:
+        return None
+    now = datetime.utcnow()
+    if features is not None:
+        return features.fresh_window_end(now)
+    oldest = db.session.query(db.func.min(Job.date_posted)).filter(
+        Job.date_posted > now - timedelta(days=8)).scalar()
+    return oldest + timedelta(days=8) if oldest else None
+
+def get_fresh_boost_deadline(features=None):
+    """get_fresh_window_end 对应的 time.time() 时间戳"""
+    window_end = get_fresh_window_end(features)
+    return None if window_end is None else time.time() + (window_end - datetime.utcnow()).total_seconds()
+
+def score_job_recommendations(user, semantic_scores):
+    """逐职位计算推荐分数（未安装 numpy 时使用，也是向量化实现的对照基准）"""
+    try:
+        if semantic_scores:
+            all_jobs = Job.query.filter(Job.id.in_(list(semantic_scores))).all()
+        else:
+            all_jobs = Job.query.all()
+        job_keywords = get_job_keywords_map(all_jobs)
         
         # 计算每个职位的匹配度
         job_matches = []
         for job in all_jobs:
-            match_score = calculate_job_match(user, job)
+            match_score = calculate_job_match(user, job, job_keywords[job.id])
             
             # 应用优化因子
-            optimized_score = apply_optimization_factors(user, job, match_score)
+            optimized_score = apply_optimization_factors(user, job, match_score, job_keywords[job.id])
+            
+            # 融合语义相似度
+            if semantic_scores:
+                weight = RECOMMENDATION_PARAMS['semantic_weight']
+                semantic = max(0.0, semantic_scores.get(job.id, 0.0)) * 100
+                optimized_score = (1 - weight) * optimized_score + weight * semantic
             
             # 只推荐匹配度达到最小要求的职位
             if optimized_score >= RECOMMENDATION_PARAMS['min_match_score']:
@@ -238,7 +366,27 @@ def get_job_recommendations(user):
         logging.error(f"获取职位推荐失败: {e}")
         return []
 
-def apply_optimization_factors(user, job, base_score):
+def get_semantic_job_candidates(user):
+    """用候选人简历向量在职位 ANN 索引中检索 top-K，返回 {job_id: 余弦相似度}；无向量或索引不可用时返回空字典"""
+    try:
+        from app.embeddings import candidate_vector
+        from app.ann_index import get_index
+        vector = candidate_vector(user.id)
+        if vector is None:
+            return {}
+        return dict(get_index('job').search(vector, RECOMMENDATION_PARAMS['ann_candidates']))
+    except Exception as e:
+        logging.warning(f"语义召回失败，回退到全量打分: {e}")
+        return {}
+
+def get_job_keywords_map(jobs):
+    """批量读取职位发布时保存的技能关键词，返回 {job_id: 关键词集合}；job_skill 表不可用时解析职位描述"""
+    stored = load_job_skills(job.id for job in jobs)
+    if stored is None:
+        return {job.id: set(extract_job_keywords(job.description)) for job in jobs}
+    return {job.id: stored.get(job.id, set()) for job in jobs}
+
+def apply_optimization_factors(user, job, base_score, job_keywords=None):
     """应用优化因子"""
     try:
         optimized_score = base_score
@@ -256,7 +404,7 @@ def apply_optimization_factors(user, job, base_score):
         
         # 技能匹配提升
         if OPTIMIZATION_CONFIG['enable_skill_boost']:
-            skill_boost = calculate_skill_boost(user, job)
+            skill_boost = calculate_skill_boost(user, job, job_keywords)
             optimized_score *= skill_boost
         
         return min(100, optimized_score)  # 确保不超过100分
@@ -286,11 +434,12 @@ def calculate_company_type_boost(user, job):
         logging.error(f"计算公司类型提升失败: {e}")
         return 1.0
 
-def calculate_skill_boost(user, job):
+def calculate_skill_boost(user, job, job_keywords=None):
     """计算技能匹配提升"""
     try:
         user_skills = extract_user_skills(user)
-        job_keywords = extract_job_keywords(job.description)
+        if job_keywords is None:
+            job_keywords = get_job_keywords_map([job])[job.id]
         
         if not user_skills or not job_keywords:
             return 1.0
@@ -312,7 +461,7 @@ def calculate_skill_boost(user, job):
         logging.error(f"计算技能提升失败: {e}")
         return 1.0
 
-def calculate_job_match(user, job):
+def calculate_job_match(user, job, job_keywords=None):
     """计算职位匹配度"""
     try:
         # 获取用户技能
@@ -320,8 +469,9 @@ def calculate_job_match(user, job):
         if not user_skills:
             return 50  # 默认50%匹配度
         
-        # 从职位描述中提取关键词
-        job_keywords = extract_job_keywords(job.description)
+        # 职位关键词在发布时已提取并保存
+        if job_keywords is None:
+            job_keywords = get_job_keywords_map([job])[job.id]
         
         # 计算技能匹配度
         matched_skills = 0
@@ -415,7 +565,8 @@ def extract_user_skills(user):
         skills = []
         
         # 从简历数据中提取技能
-        if hasattr(user, 'cv_data') and user.cv_data:
+        # 只检查是否有简历，避免为此加载简历二进制
+        if getattr(user, 'has_cv', False):
             # 这里可以添加简历解析逻辑
             pass
         
@@ -467,23 +618,8 @@ def extract_job_keywords(description):
         if not description:
             return []
         
-        # 使用配置文件中的技能分类
-        keywords = []
-        description_lower = description.lower()
-        
-        # 从英文技能分类中提取
-        for category, skills in SKILL_CATEGORIES.items():
-            for skill in skills:
-                if skill in description_lower:
-                    keywords.append(skill)
-        
-        # 从中文技能分类中提取
-        for category, skills in CHINESE_SKILLS.items():
-            for skill in skills:
-                if skill in description_lower:
-                    keywords.append(skill)
-        
-        return list(set(keywords))  # 去重
+        # 配置文件中的中英文技能分类已编译为共享的多模式自动机，单次扫描得到全部关键词
+        return extract_skills(description, RECRUIT)
         
     except Exception as e:
         logging.error(f"提取职位关键词失败: {e}")
@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app, jsonify
 from werkzeug.utils import secure_filename
 import os
 from app.models import User, db
-from app.utils import allowed_file, get_allowed_cv_extensions, extract_text_from_resume, ai_analyze_resume_text
-from .candidate_ai import update_user_skills_from_resume
+from app.utils import allowed_file, get_allowed_cv_extensions
+from app import task_queue
+from .candidate_ai import enqueue_resume_processing, RESUME_TASK
+from .recommendation_cache import invalidate_user
 
 profile_bp = Blueprint('profile', __name__, url_prefix='/profile')
 
@@ -30,6 +32,7 @@ def settings():
                 g.user.cv_file = None
                 g.user.cv_data = None
                 db.session.commit()
+                invalidate_user(g.user.id)
                 flash('已删除当前简历。', 'success')
             except Exception:
                 db.session.rollback()
@@ -69,33 +72,15 @@ def settings():
                         g.user.cv_file = filename
                         g.user.cv_data = cv_data
                         db.session.commit()
+                        invalidate_user(g.user.id)
 
-                        # 基于AI自动解析技能并保存
-                        try:
-                            parsed_skills = update_user_skills_from_resume(g.user, cv_data or b'', filename)
-                            if parsed_skills:
-                                flash('已基于简历自动更新技能标签。', 'success')
-                        except Exception as e:
-                            current_app.logger.warning(f'AI skill extraction failed: {e}')
-
-                        # 生成简历分析报告并展示
-                        try:
-                            resume_text = ''
-                            if cv_data:
-                                resume_text = extract_text_from_resume(cv_data, filename) or ''
-                            analysis = ai_analyze_resume_text(resume_text)
-                            analysis_msg = '概述：' + analysis.get('summary','')
-                            if analysis.get('strengths'):
-                                analysis_msg += '\n优势：' + '；'.join(analysis['strengths'])
-                            if analysis.get('weaknesses'):
-                                analysis_msg += '\n可改进：' + '；'.join(analysis['weaknesses'])
-                            if analysis.get('suggestions'):
-                                analysis_msg += '\n建议：' + '；'.join(analysis['suggestions'])
-                            if analysis.get('recommended_roles'):
-                                analysis_msg += '\n推荐岗位：' + '、'.join(analysis['recommended_roles'])
-                            flash(analysis_msg, 'info')
-                        except Exception as e:
-                            current_app.logger.warning(f'AI resume analysis failed: {e}')
+                        # 技能提取与简历分析耗时较长，交给后台任务队列处理
+                        if cv_data:
+                            try:
+                                enqueue_resume_processing(g.user, analyze=True)
+                                flash('简历正在后台解析，技能标签与分析报告稍后自动更新。', 'info')
+                            except Exception as e:
+                                current_app.logger.warning(f'Failed to enqueue resume processing: {e}')
 
                         flash('简历上传成功！' if file_ext not in video_exts else '视频简历上传成功！', 'success')
                         return redirect(url_for('smartrecruit.candidate.profile.settings'))
@@ -139,10 +124,23 @@ def settings():
                 flash('不支持的头像格式。支持格式：PNG, JPG, JPEG, GIF', 'danger')
 
         db.session.commit()
+        invalidate_user(g.user.id)
         flash('个人信息更新成功！', 'success')
         return redirect(url_for('smartrecruit.candidate.profile.settings'))
     
-    return render_template('smartrecruit/candidate/settings.html', user=g.user)
+    resume_job = task_queue.job_status(task_queue.latest_job(RESUME_TASK, g.user.id))
+    return render_template('smartrecruit/candidate/settings.html', user=g.user, resume_job=resume_job)
+
+@profile_bp.route('/resume_status', methods=['GET'])
+def resume_status():
+    """简历后台解析任务状态（JSON，供页面轮询）；可用 ?job_id= 指定任务，默认最近一次"""
+    if g.user is None:
+        return jsonify({'success': False, 'message': '请先登录'}), 401
+    job_id = request.args.get('job_id', type=int)
+    job = task_queue.get_job(job_id) if job_id else task_queue.latest_job(RESUME_TASK, g.user.id)
+    if job is None or job['user_id'] != g.user.id:
+        return jsonify({'success': False, 'message': '未找到任务'}), 404
+    return jsonify({'success': True, 'job': task_queue.job_status(job)})
 
 @profile_bp.route('/career_path')
 def career_path():
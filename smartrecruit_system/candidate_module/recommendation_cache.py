@@ -0,0 +1,163 @@
+"""
+按用户缓存职位推荐结果（前 N 个职位 ID 与分数）。
+
+候选人首页、职位列表和推荐接口都会调用 get_job_recommendations，缓存命中时不再重新打分。
+一条缓存在以下情况下失效：
+
+  - 职位发布/编辑/删除（hr_module/recruitment.py -> recommendation_engine.mark_jobs_changed）时清空全部缓存；
+    其它进程中的职位变化由职位特征快照的版本号发现
+  - 用户技能/资料变化：update_user_skills_from_resume、个人设置保存时清除该用户的缓存；
+    此外缓存键包含用户技能、职位、公司、简历哈希以及简历向量（文本哈希、模型）的指纹，
+    其它进程中的修改（如 worker 进程写入简历向量）同样不会命中旧结果
+  - 新职位提升的时间窗口：某个职位不再满足「7 天内发布」时结果会变化，缓存到期时间不晚于最近的该时刻
+  - 兜底 TTL
+
+命中率等计数通过 stats() 查看（/health/recommendations）。
+
+Env:
+  - RECOMMENDATION_CACHE_ENABLED: 设为 0 关闭缓存，默认 1
+  - RECOMMENDATION_CACHE_SIZE: 最多缓存的用户数（LRU），默认 2048
+  - RECOMMENDATION_CACHE_TTL: 缓存最长有效期（秒），默认 600
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+_LOOKUP = object()
+
+
+def embedding_states(user_ids=None) -> dict:
+    """批量读取简历向量状态 {user_id: (text_hash, model)}，user_ids 为 None 时读取全部；表不可用时返回空字典。"""
+    from app.models import db, CandidateEmbedding
+    query = db.session.query(CandidateEmbedding.user_id, CandidateEmbedding.text_hash, CandidateEmbedding.model)
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        query = query.filter(CandidateEmbedding.user_id.in_(user_ids))
+    try:
+        # SAVEPOINT 中查询：表尚未创建时不影响当前事务
+        with db.session.begin_nested():
+            rows = query.all()
+    except Exception:
+        return {}
+    return {user_id: (digest, model) for user_id, digest, model in rows}
+
+
+def user_fingerprint(user, embedding=_LOOKUP) -> str:
+    """
+    参与推荐打分的用户字段摘要，任何一项变化都不会再命中旧缓存。
+
+    简历向量决定语义召回的职位，其状态也计入指纹；embedding 为 embedding_states() 中该用户的值，
+    不传时按用户 ID 查询。
+    """
+    if embedding is _LOOKUP:
+        user_id = getattr(user, 'id', None)
+        embedding = embedding_states([user_id]).get(user_id) if user_id is not None else None
+    fields = [getattr(user, name, None) for name in ('skills', 'position', 'company_name', 'cv_sha256')]
+    fields.extend(embedding or (None, None))
+    raw = '\x1f'.join('' if value is None else str(value) for value in fields)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class RecommendationCache:
+    """进程内 LRU，键为用户 ID，值为 (指纹, 到期时间, [(job_id, 分数), ...])，线程安全。"""
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 600):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'expired': 0, 'invalidations': 0}
+
+    def get(self, user_id: int, fingerprint):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[0] == fingerprint and entry[1] > now:
+                    self._entries.move_to_end(user_id)
+                    self._counters['hits'] += 1
+                    return entry[2]
+                del self._entries[user_id]
+                self._counters['expired'] += 1
+            self._counters['misses'] += 1
+        return None
+
+    def set(self, user_id: int, fingerprint, ranked, expires_at: float = None):
+        """expires_at 为绝对时间（time.time()），不晚于 now + ttl。"""
+        now = time.time()
+        expires_at = now + self.ttl if expires_at is None else min(expires_at, now + self.ttl)
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[user_id] = (fingerprint, expires_at, list(ranked))
+            self._entries.move_to_end(user_id)
+            self._counters['stores'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._counters['invalidations'] += 1
+
+    def invalidate_all(self):
+        with self._lock:
+            self._counters['invalidations'] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv('RECOMMENDATION_CACHE_ENABLED', '1') not in ('0', 'false', 'False', 'no')
+
+
+def get_cache() -> RecommendationCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    max_entries = int(os.getenv('RECOMMENDATION_CACHE_SIZE', '2048'))
+                    ttl = float(os.getenv('RECOMMENDATION_CACHE_TTL', '600'))
+                except ValueError:
+                    max_entries, ttl = 2048, 600
+                _cache = RecommendationCache(max_entries=max_entries, ttl=ttl)
+    return _cache
+
+
+def reset_cache():
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def invalidate_user(user_id: int):
+    """用户技能/资料变化后调用。"""
+    if _cache is not None:
+        _cache.invalidate_user(user_id)
+
+
+def invalidate_all():
+    """职位变化后调用。"""
+    if _cache is not None:
+        _cache.invalidate_all()
+
+
+def stats() -> dict:
+    return get_cache().stats()
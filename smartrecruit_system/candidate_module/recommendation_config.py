@@ -118,7 +118,9 @@ RECOMMENDATION_PARAMS = {
     'location_boost': 1.1,           # 地理位置匹配提升因子
     'salary_boost': 1.05,            # 薪资匹配提升因子
     'fresh_job_boost': 1.15,         # 新职位提升因子（7天内）
-    'popular_job_boost': 1.1         # 热门职位提升因子（申请人数多）
+    'popular_job_boost': 1.1,        # 热门职位提升因子（申请人数多）
+    'semantic_weight': 0.3,          # 简历与职位语义相似度在最终分数中的权重
+    'ann_candidates': 200            # 有简历向量时先用 ANN 索引召回的职位数
 }
 
 # 公司类型技能映射
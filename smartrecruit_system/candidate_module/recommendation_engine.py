@@ -0,0 +1,313 @@
+"""
+向量化的职位推荐打分。
+
+原实现对每个职位调用 calculate_job_match / apply_optimization_factors，每个职位都重新解析一次
+用户技能并做嵌套的子串匹配。这里把职位侧特征预先整理为数组，常驻进程内存：
+
+  - 职位 × 技能关键词稀疏矩阵（按列压缩：每个关键词对应包含它的职位行号）
+  - 职位经验等级、公司类型位掩码、发布时间（微秒）
+
+每次请求只在用户侧解析一次技能（用户技能 × 关键词的小矩阵），技能匹配、经验匹配、各项优化因子
+与语义融合都是数组运算，最后用 argpartition 取前 N。各项公式与 jobs.py 中的逐职位函数一一对应，
+运算顺序相同，分数完全一致（tests/test_recommendation_engine.py 对随机数据逐项比对）。
+
+Env:
+  - RECOMMENDATION_REFRESH_INTERVAL: 检查职位表变化的间隔（秒），默认 30
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None  # type: ignore
+
+from .recommendation_config import (
+    RECOMMENDATION_WEIGHTS, EXPERIENCE_LEVELS, RECOMMENDATION_PARAMS,
+    COMPANY_SKILL_MAPPING, OPTIMIZATION_CONFIG
+)
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_DATE = -(1 << 63)
+# (now - date_posted).days <= 7 等价于 now - date_posted < 8 天
+_FRESH_WINDOW_US = 8 * 86400 * 10 ** 6
+
+
+def available() -> bool:
+    return np is not None
+
+
+def experience_level(text):
+    """与 calculate_experience_match 相同的经验等级推断；text 为 None 时返回 None（原函数此时按 50 分处理）。"""
+    if text is None:
+        return None
+    text = text.lower()
+    for config in EXPERIENCE_LEVELS.values():
+        if any(keyword in text for keyword in config['keywords']):
+            return config['level']
+    return 2
+
+
+def company_type_mask(name) -> int:
+    """公司名命中的公司类型位掩码（位序同 COMPANY_SKILL_MAPPING），两个掩码有交集即同类型公司。"""
+    if not name:
+        return 0
+    name = name.lower()
+    mask = 0
+    for bit, config in enumerate(COMPANY_SKILL_MAPPING.values()):
+        if any(keyword in name for keyword in config['keywords']):
+            mask |= 1 << bit
+    return mask
+
+
+def _micros(value) -> int:
+    return _NO_DATE if value is None else (value - _EPOCH) // _MICROSECOND
+
+
+class JobFeatures:
+    """
+    职位侧特征快照，按 job_id 升序排列，构建后只读。
+
+    关键词矩阵以 CSC 形式保存：vocab[c] 列的非零行为 indices[indptr[c]:indptr[c + 1]]。
+    """
+
+    def __init__(self, ids, levels, companies, posted, vocab, indptr, indices, version: int = 0):
+        self.version = version      # 快照版本号，重新构建时递增（推荐缓存据此判断职位是否变化）
+        self.ids = ids
+        self.levels = levels        # 经验等级，-1 表示 experience_level 为空
+        self.companies = companies  # 公司类型位掩码
+        self.posted = posted        # 发布时间（UTC 微秒），空值为 _NO_DATE
+        self.vocab = vocab
+        self._vocab_lower = [keyword.lower() for keyword in vocab]
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, jobs):
+        """jobs 为 (job_id, company_name, experience_level, date_posted, 关键词集合) 的可迭代对象。"""
+        rows = sorted(jobs, key=lambda row: row[0])
+        n = len(rows)
+        levels = [experience_level(row[2]) for row in rows]
+        postings = {}
+        for position, row in enumerate(rows):
+            for keyword in row[4]:
+                postings.setdefault(keyword, []).append(position)
+        vocab = sorted(postings)
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(postings[keyword]) for keyword in vocab])
+        return cls(
+            ids=np.fromiter((row[0] for row in rows), dtype=np.int64, count=n),
+            levels=np.fromiter((-1 if level is None else level for level in levels), dtype=np.int64, count=n),
+            companies=np.fromiter((company_type_mask(row[1]) for row in rows), dtype=np.int64, count=n),
+            posted=np.fromiter((_micros(row[3]) for row in rows), dtype=np.int64, count=n),
+            vocab=vocab,
+            indptr=indptr,
+            indices=np.fromiter((p for keyword in vocab for p in postings[keyword]), dtype=np.int64,
+                                count=int(indptr[-1])),
+        )
+
+    def fresh_window_end(self, now):
+        """当前处于新职位窗口内的职位中，最早离开窗口的时刻（此后推荐分数会变化）；没有则返回 None。"""
+        fresh = self.posted[self.posted > _micros(now) - _FRESH_WINDOW_US]
+        if not len(fresh):
+            return None
+        return _EPOCH + timedelta(microseconds=int(fresh.min()) + _FRESH_WINDOW_US)
+
+    def matched_skills(self, user_skills):
+        """每个职位命中的用户技能数：某个职位关键词是该用户技能的子串即算命中（同 calculate_job_match）。"""
+        matched = np.zeros(len(self.ids), dtype=np.int64)
+        for skill in user_skills:
+            skill = skill.lower()
+            columns = [c for c, keyword in enumerate(self._vocab_lower) if keyword in skill]
+            if not columns:
+                continue
+            hit = np.zeros(len(self.ids), dtype=bool)
+            for c in columns:
+                hit[self.indices[self.indptr[c]:self.indptr[c + 1]]] = True
+            matched += hit
+        return matched
+
+    def scores(self, user, semantic_scores=None, now=None):
+        """
+        返回 (行号, 分数)：分数即原逐职位流程中参与排序的 optimized_score。
+
+        semantic_scores 非空时只对其中的职位打分并融合语义相似度（同 get_job_recommendations）。
+        """
+        from .jobs import extract_user_skills, calculate_salary_match, calculate_location_match
+        if semantic_scores:
+            rows = np.flatnonzero(np.isin(self.ids, np.fromiter(semantic_scores, dtype=np.int64)))
+        else:
+            rows = np.arange(len(self.ids))
+
+        user_skills = extract_user_skills(user)
+        if user_skills:
+            matched = self.matched_skills(user_skills)[rows]
+            skill_match_score = matched / len(user_skills) * 100 * RECOMMENDATION_WEIGHTS['skill_match']
+
+            user_level = experience_level(getattr(user, 'position', ''))
+            if user_level is None:
+                experience = np.full(len(rows), 50, dtype=np.int64)
+            else:
+                levels = self.levels[rows]
+                diff = np.abs(levels - user_level)
+                experience = np.select([levels < 0, diff == 0, diff == 1, diff == 2], [50, 100, 75, 50], 25)
+            experience_score = experience * RECOMMENDATION_WEIGHTS['experience_match']
+            # 薪资、地理位置匹配目前与职位无关，每个用户只需计算一次
+            salary_score = calculate_salary_match(user, None) * RECOMMENDATION_WEIGHTS['salary_match']
+            location_score = calculate_location_match(user, None) * RECOMMENDATION_WEIGHTS['location_match']
+
+            total = skill_match_score + experience_score + salary_score + location_score
+            score = np.clip(np.trunc(total), 0, 100)
+        else:
+            matched = None
+            score = np.full(len(rows), 50.0)
+
+        # 优化因子：逐项相乘的顺序与 apply_optimization_factors 相同
+        if OPTIMIZATION_CONFIG['enable_fresh_job_boost']:
+            now = datetime.utcnow() if now is None else now
+            fresh = self.posted[rows] > _micros(now) - _FRESH_WINDOW_US
+            score = np.where(fresh, score * RECOMMENDATION_PARAMS['fresh_job_boost'], score)
+        if OPTIMIZATION_CONFIG['enable_company_type_boost']:
+            same_type = (self.companies[rows] & company_type_mask(getattr(user, 'company_name', ''))) != 0
+            score = np.where(same_type, score * 1.1, score)
+        if OPTIMIZATION_CONFIG['enable_skill_boost'] and matched is not None:
+            boosted = matched / len(user_skills) > 0.5
+            score = np.where(boosted, score * RECOMMENDATION_PARAMS['skill_boost_factor'], score)
+        score = np.minimum(score, 100)
+
+        if semantic_scores:
+            weight = RECOMMENDATION_PARAMS['semantic_weight']
+            semantic = np.array([max(0.0, semantic_scores.get(int(i), 0.0)) * 100 for i in self.ids[rows]],
+                                dtype=np.float64)
+            score = (1 - weight) * score + weight * semantic
+        return rows, score
+
+    def recommend(self, user, semantic_scores=None, limit=None, min_score=None, now=None):
+        """返回按分数降序的 [(job_id, 分数)]，同分按 job_id 升序（与原实现的稳定排序一致）。"""
+        limit = RECOMMENDATION_PARAMS['max_recommendations'] if limit is None else limit
+        min_score = RECOMMENDATION_PARAMS['min_match_score'] if min_score is None else min_score
+        rows, score = self.scores(user, semantic_scores, now)
+        eligible = np.flatnonzero(score >= min_score)
+        if limit <= 0 or len(eligible) == 0:
+            return []
+        if len(eligible) > limit:
+            # 先用 argpartition 找出第 limit 名的分数，保留所有不低于它的职位（含同分），再精确排序
+            kth = score[eligible][np.argpartition(-score[eligible], limit - 1)[limit - 1]]
+            eligible = eligible[score[eligible] >= kth]
+        top = eligible[np.lexsort((eligible, -score[eligible]))[:limit]]
+        # 原实现中各项优化因子都未启用且未融合语义时分数为 int，min(100, x) 截断时也返回 int 100
+        multiplied = bool(semantic_scores) or any(OPTIMIZATION_CONFIG[flag] for flag in (
+            'enable_fresh_job_boost', 'enable_company_type_boost', 'enable_skill_boost'))
+        result = []
+        for i in top:
+            value = float(score[i])
+            if not semantic_scores and (value >= 100 or not multiplied):
+                value = int(value)
+            result.append((int(self.ids[rows[i]]), value))
+        return result
+
+
+class RecommendationEngine:
+    """
+    进程内的职位特征快照，每隔 refresh_interval 秒检查一次职位表（Job.change_signature：行数、最大 ID、
+    最近发布/修改时间）与 job_skill 行数，变化时整体重新构建；本进程内的职位发布/编辑/删除通过 mark_stale() 立即生效。
+    """
+
+    def __init__(self, refresh_interval: float = 30):
+        self.refresh_interval = refresh_interval
+        self._features = None
+        self._version = 0
+        self._signature = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        self._stale = True
+
+    def _current_signature(self):
+        from app.models import Job, db
+        signature = Job.change_signature()
+        try:
+            with db.session.begin_nested():
+                skills = db.session.execute(db.text('SELECT COUNT(*) FROM job_skill')).scalar()
+        except Exception:
+            skills = None
+        return signature + (skills,)
+
+    def _load(self):
+        from app.models import Job, db
+        from app.job_skills import load_job_skills
+        from .jobs import extract_job_keywords
+        jobs = db.session.query(Job.id, Job.company_name, Job.experience_level, Job.date_posted).all()
+        skills = load_job_skills()
+        if skills is None:
+            descriptions = dict(db.session.query(Job.id, Job.description))
+            skills = {job_id: set(extract_job_keywords(text)) for job_id, text in descriptions.items()}
+        return JobFeatures.build((job_id, company, level, posted, skills.get(job_id, ()))
+                                 for job_id, company, level, posted in jobs)
+
+    def features(self, check: bool = False) -> JobFeatures:
+        """check=True 时不等检查间隔，立即比较职位表摘要（离线批量计算前使用）。"""
+        now = time.monotonic()
+        if not self._stale and not check and now - self._checked_at < self.refresh_interval:
+            return self._features
+        with self._lock:
+            if self._stale or check or now - self._checked_at >= self.refresh_interval:
+                signature = self._current_signature()
+                if self._stale or signature != self._signature:
+                    self._stale = False
+                    started = time.perf_counter()
+                    features = self._load()
+                    self._version += 1
+                    features.version = self._version
+                    self._features = features
+                    self._signature = signature
+                    logging.info(f"Built recommendation features for {len(self._features)} jobs "
+                                 f"in {time.perf_counter() - started:.2f}s")
+                self._checked_at = time.monotonic()
+        return self._features
+
+    def recommend(self, user, semantic_scores=None):
+        return self.features().recommend(user, semantic_scores)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> RecommendationEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RecommendationEngine(float(os.getenv('RECOMMENDATION_REFRESH_INTERVAL', '30')))
+    return _engine
+
+
+def jobs_signature() -> str:
+    """职位表当前状态的摘要（与快照的变化检测相同），离线推荐据此判断职位是否变化。"""
+    return hashlib.sha1(repr(get_engine()._current_signature()).encode('utf-8')).hexdigest()
+
+
+def mark_jobs_changed():
+    """职位发布/编辑/删除后调用：清空推荐缓存与搜索分面计数缓存，下次推荐时重新构建职位特征。"""
+    from app import job_facets
+    from .recommendation_cache import invalidate_all
+    if _engine is not None:
+        _engine.mark_stale()
+    invalidate_all()
+    job_facets.invalidate_all()
+
+
+def reset_engine():
+    global _engine
+    with _engine_lock:
+        _engine = None
@@ -0,0 +1,151 @@
+"""
+离线批量计算候选人职位推荐，写入 job_recommendation 表（scripts/precompute_recommendations.py，适合每晚定时运行）。
+
+在线推荐（jobs.get_job_recommendations）优先读取该表；离线计算后用户资料、职位表或新职位提升窗口
+有变化时，该用户的离线结果作废，改为实时打分，直到下次运行重新写入。
+
+增量运行时只重算以下用户：
+  - 还没有离线结果
+  - 上次计算后资料或简历向量变化（用户指纹不同）
+  - 上次计算后职位表有变化（jobs_signature 不同）
+  - 新职位提升窗口已变化（expires_at 已过）
+full=True 时全部重算。
+
+用户按 chunk_size 分块；processes > 1 时分发到多个子进程打分（每个子进程各自加载一次职位特征），
+结果由主进程统一写库，避免 SQLite 多进程并发写入。
+"""
+import time
+import logging
+import multiprocessing
+from datetime import datetime
+
+from app.models import db, User, JobRecommendation
+from .recommendation_cache import embedding_states, user_fingerprint
+
+
+def active_candidates():
+    """参与离线推荐的用户：非 HR 的候选人。"""
+    return User.query.filter(
+        db.or_(User.is_hr.is_(False), User.is_hr.is_(None)),
+        db.or_(User.user_type == 'candidate', User.user_type.is_(None)),
+    )
+
+
+def stale_user_ids(signature: str, full: bool = False):
+    """返回 (需要重算的用户 ID 列表, 活跃候选人总数)。"""
+    now = datetime.utcnow()
+    # 每个用户只有一行 rank 为 0 或 1，其余名次的状态字段与之相同
+    stored = {
+        user_id: (profile_hash, jobs_signature, expires_at)
+        for user_id, profile_hash, jobs_signature, expires_at in db.session.query(
+            JobRecommendation.user_id, JobRecommendation.profile_hash,
+            JobRecommendation.jobs_signature, JobRecommendation.expires_at,
+        ).filter(JobRecommendation.rank <= 1)
+    }
+    todo = []
+    total = 0
+    users = active_candidates().with_entities(User.id, User.skills, User.position, User.company_name, User.cv_sha256)
+    embeddings = embedding_states()
+    for user in users.order_by(User.id):
+        total += 1
+        state = stored.get(user.id)
+        fingerprint = user_fingerprint(user, embeddings.get(user.id))
+        if (full or state is None or state[0] != fingerprint or state[1] != signature
+                or (state[2] is not None and state[2] <= now)):
+            todo.append(user.id)
+    return todo, total
+
+
+def score_users(user_ids) -> list:
+    """为一批用户实时打分，返回 [(user_id, 用户指纹, [(job_id, 分数), ...])]。"""
+    from .jobs import rank_jobs
+    from .recommendation_engine import available, get_engine
+    features = get_engine().features() if available() else None
+    embeddings = embedding_states(user_ids)
+    return [(user.id, user_fingerprint(user, embeddings.get(user.id)), rank_jobs(user, features))
+            for user in User.query.filter(User.id.in_(user_ids))]
+
+
+def save_results(results, signature: str, expires_at=None):
+    """替换这批用户的离线推荐。"""
+    computed_at = datetime.utcnow()
+    rows = []
+    for user_id, fingerprint, ranked in results:
+        state = {'user_id': user_id, 'profile_hash': fingerprint, 'jobs_signature': signature,
+                 'expires_at': expires_at, 'computed_at': computed_at}
+        if not ranked:
+            rows.append(dict(state, rank=0, job_id=None, score=None))
+        rows.extend(dict(state, rank=rank, job_id=job_id, score=score)
+                    for rank, (job_id, score) in enumerate(ranked, 1))
+    JobRecommendation.query.filter(JobRecommendation.user_id.in_([r[0] for r in results])).delete(
+        synchronize_session=False)
+    if rows:
+        db.session.execute(JobRecommendation.__table__.insert(), rows)
+    db.session.commit()
+
+
+_worker_app = None
+
+
+def _init_worker():
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+    _worker_app.app_context().push()
+
+
+def _score_chunk(user_ids) -> list:
+    """子进程中执行：打分后释放会话，避免身份映射随处理的用户数增长。"""
+    try:
+        return score_users(user_ids)
+    finally:
+        db.session.remove()
+
+
+def precompute_recommendations(processes: int = 1, chunk_size: int = 500, full: bool = False, progress=None) -> dict:
+    """
+    增量计算离线推荐（需在应用上下文中调用）。
+
+    Args:
+        processes (int): 打分进程数，1 表示在当前进程内完成。
+        chunk_size (int): 每个任务块的用户数。
+        full (bool): 忽略已有结果，全部重算。
+        progress (callable): 每写完一块调用 progress(已完成, 需重算总数)。
+
+    Returns:
+        dict: candidates / computed / skipped / seconds / users_per_sec
+    """
+    from .jobs import get_fresh_window_end
+    from .recommendation_engine import available, get_engine, jobs_signature
+    started = time.perf_counter()
+    signature = jobs_signature()
+    todo, total = stale_user_ids(signature, full)
+    chunks = [todo[start:start + chunk_size] for start in range(0, len(todo), max(1, chunk_size))]
+    done = 0
+    if chunks:
+        # 职位表已变化（如其它进程编辑了职位）时先重建特征快照，再按新特征打分
+        expires_at = get_fresh_window_end(get_engine().features(check=True) if available() else None)
+        if processes > 1 and len(chunks) > 1:
+            pool = multiprocessing.get_context('spawn').Pool(min(processes, len(chunks)), initializer=_init_worker)
+            try:
+                batches = pool.imap_unordered(_score_chunk, chunks)
+                for results in batches:
+                    save_results(results, signature, expires_at)
+                    done += len(results)
+                    if progress:
+                        progress(done, len(todo))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for chunk in chunks:
+                results = score_users(chunk)
+                save_results(results, signature, expires_at)
+                done += len(results)
+                if progress:
+                    progress(done, len(todo))
+    seconds = time.perf_counter() - started
+    stats = {'candidates': total, 'computed': done, 'skipped': total - len(todo), 'seconds': round(seconds, 3),
+             'users_per_sec': round(done / seconds, 1) if seconds > 0 else 0.0}
+    logging.info(f"Precomputed recommendations: {stats}")
+    return stats
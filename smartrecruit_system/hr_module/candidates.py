@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app, abort, jsonify
 from app.models import Job, User, Application, db
 from app import applications_collection
 
@@ -35,6 +35,45 @@ def view_candidates(job_id):
                          job=job, 
                          candidates=candidates)
 
+@candidates_bp.route('/api/job/<int:job_id>/matches')
+def api_job_matches(job_id):
+    """按简历语义相似度为职位检索最匹配的候选人（ANN top-k）"""
+    if g.user is None:
+        return jsonify({'error': '请先登录'}), 401
+    if not getattr(g.user, 'is_hr', False):
+        return jsonify({'error': '只有HR用户才能访问'}), 403
+
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != g.user.id:
+        abort(403)
+
+    k = max(1, min(request.args.get('k', 20, type=int), 100))
+    from app.embeddings import job_vector
+    from app.ann_index import get_index
+    vector = job_vector(job_id)
+    if vector is None:
+        return jsonify({'job_id': job_id, 'matches': [], 'message': '职位向量尚未生成'})
+
+    # 多取一些，过滤掉 HR 账号后再截断
+    hits = get_index('candidate').search(vector, k * 2)
+    users = {u.id: u for u in User.query.filter(User.id.in_([uid for uid, _ in hits])).all()} if hits else {}
+    applied = {a.user_id for a in Application.query.filter_by(job_id=job_id).all()}
+    matches = []
+    for user_id, score in hits:
+        user = users.get(user_id)
+        if user is None or user.is_hr:
+            continue
+        matches.append({
+            'user_id': user.id,
+            'name': f'{user.first_name} {user.last_name}',
+            'position': user.position,
+            'score': round(score * 100, 1),
+            'applied': user.id in applied,
+        })
+        if len(matches) >= k:
+            break
+    return jsonify({'job_id': job_id, 'matches': matches})
+
 @candidates_bp.route('/view_interview/<int:application_id>')
 def view_interview(application_id):
     """查看面试详情"""
@@ -4,6 +4,10 @@ from datetime import datetime
 import os
 import logging
 from app.models import Job, User, Application, db
+from app.embeddings import schedule_job_embedding, delete_job_embedding
+from app.job_skills import save_job_skills, delete_job_skills
+from smartrecruit_system.candidate_module.recommendation_engine import mark_jobs_changed
+from smartrecruit_system.candidate_module.autocomplete import job_terms, signature_before_write, update_job_terms
 
 recruitment_bp = Blueprint('recruitment', __name__, url_prefix='/recruitment')
 
@@ -48,7 +52,9 @@ def publish_recruitment():
             job_type = request.form.get('job_type')
             department = request.form.get('department')
 
+            before = signature_before_write()
             if job_to_edit:
+                old_terms = job_terms(job_to_edit)
                 job_to_edit.title = title
                 job_to_edit.location = location
                 job_to_edit.description = description
@@ -65,7 +71,11 @@ def publish_recruitment():
                 job_to_edit.application_deadline = application_deadline
                 job_to_edit.job_type = job_type
                 job_to_edit.department = department
+                save_job_skills(job_to_edit)
                 db.session.commit()
+                schedule_job_embedding(job_to_edit.id)
+                mark_jobs_changed()
+                update_job_terms(old_terms, job_terms(job_to_edit), before)
                 flash('招聘启事更新成功！', 'success')
             else:
                 new_job = Job(
@@ -88,7 +98,12 @@ def publish_recruitment():
                     department=department
                 )
                 db.session.add(new_job)
+                db.session.flush()
+                save_job_skills(new_job)
                 db.session.commit()
+                schedule_job_embedding(new_job.id)
+                mark_jobs_changed()
+                update_job_terms(new_terms=job_terms(new_job), before=before)
                 flash('招聘启事发布成功！', 'success')
 
             return redirect(url_for('smartrecruit.hr.recruitment.my_jobs'))
@@ -121,6 +136,8 @@ def edit_job(job_id):
         abort(403)
 
     if request.method == 'POST':
+        before = signature_before_write()
+        old_terms = job_terms(job)
         job.title = request.form['title']
         job.location = request.form['location']
         job.description = request.form['description']
@@ -137,8 +154,12 @@ def edit_job(job_id):
         job.application_deadline = datetime.strptime(request.form['application_deadline'], '%Y-%m-%d') if request.form.get('application_deadline') else None
         job.job_type = request.form.get('job_type')
         job.department = request.form.get('department')
+        save_job_skills(job)
         
         db.session.commit()
+        schedule_job_embedding(job.id)
+        mark_jobs_changed()
+        update_job_terms(old_terms, job_terms(job), before)
         flash('职位更新成功！', 'success')
         return redirect(url_for('smartrecruit.hr.recruitment.my_jobs'))
 
@@ -155,7 +176,13 @@ def delete_job(job_id):
     if job.user_id != g.user.id:
         abort(403)
 
+    before = signature_before_write()
+    old_terms = job_terms(job)
+    delete_job_embedding(job.id)
+    delete_job_skills(job.id)
     db.session.delete(job)
     db.session.commit()
+    mark_jobs_changed()
+    update_job_terms(old_terms, before=before)
     flash('职位删除成功！', 'success')
     return redirect(url_for('smartrecruit.hr.recruitment.my_jobs'))
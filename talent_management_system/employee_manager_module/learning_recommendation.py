@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, jsonify, g, flash, redirect, url_for
 from app.models import User, Job, Application, db
+from app.skill_matcher import extract_skills, LEARNING
 import json
 from datetime import datetime
 import re
@@ -139,47 +140,16 @@ def extract_user_skills(user_profile):
     """从用户资料中提取技能"""
     skills = set()
     
-    # 从个人简介中提取
-    if user_profile.get('bio'):
-        bio = user_profile['bio'].lower()
-        for category, subcategories in SKILL_CATEGORIES.items():
-            for subcategory, skill_list in subcategories.items():
-                for skill in skill_list:
-                    if skill.lower() in bio:
-                        skills.add(skill.lower())
-    
-    # 从工作经验中提取
-    if user_profile.get('experience'):
-        experience = user_profile['experience'].lower()
-        for category, subcategories in SKILL_CATEGORIES.items():
-            for subcategory, skill_list in subcategories.items():
-                for skill in skill_list:
-                    if skill.lower() in experience:
-                        skills.add(skill.lower())
-    
-    # 从教育背景中提取
-    if user_profile.get('education'):
-        education = user_profile['education'].lower()
-        for category, subcategories in SKILL_CATEGORIES.items():
-            for subcategory, skill_list in subcategories.items():
-                for skill in skill_list:
-                    if skill.lower() in education:
-                        skills.add(skill.lower())
+    # 从个人简介、工作经验、教育背景中提取
+    for field in ('bio', 'experience', 'education'):
+        if user_profile.get(field):
+            skills.update(extract_skills(user_profile[field], LEARNING))
     
     return list(skills)
 
 def analyze_job_requirements(job_description):
     """分析职位要求"""
-    requirements = set()
-    description = job_description.lower()
-    
-    for category, subcategories in SKILL_CATEGORIES.items():
-        for subcategory, skill_list in subcategories.items():
-            for skill in skill_list:
-                if skill.lower() in description:
-                    requirements.add(skill.lower())
-    
-    return list(requirements)
+    return extract_skills(job_description, LEARNING)
 
 def calculate_skill_gap(user_skills, job_requirements):
     """计算技能差距"""
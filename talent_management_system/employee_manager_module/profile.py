@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, g, send_file
 from app.models import User, db
 from app.models import TaskEvaluation
+from app.skill_matcher import extract_skills, PROFILE
 from datetime import datetime
 import json
 import os
@@ -446,23 +447,4 @@ def extract_skills_from_text(text):
     if not text:
         return []
     
-    # 技能关键词列表
-    skill_keywords = [
-        'Python', 'Java', 'JavaScript', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust', 'Swift',
-        'HTML', 'CSS', 'React', 'Vue', 'Angular', 'Node.js', 'Django', 'Flask', 'Spring',
-        'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Oracle', 'SQL Server',
-        'Docker', 'Kubernetes', 'AWS', 'Azure', 'Google Cloud', 'Linux', 'Windows',
-        'Git', 'SVN', 'Jenkins', 'CI/CD', 'Agile', 'Scrum', 'DevOps',
-        'Machine Learning', 'AI', 'Data Science', 'Big Data', 'Hadoop', 'Spark',
-        'Excel', 'PowerBI', 'Tableau', 'Photoshop', 'Illustrator', 'Figma',
-        '项目管理', '团队协作', '沟通能力', '领导力', '创新思维', '问题解决'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in skill_keywords:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills
+    return extract_skills(text, PROFILE, labels=True)
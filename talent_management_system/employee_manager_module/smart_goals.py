@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session
 from app.models import User, db
+from app.skill_matcher import extract_skills, PROFILE
 from datetime import datetime, timedelta
 import json
 import re
@@ -281,25 +282,7 @@ def extract_skills_from_text(text):
     if not text:
         return []
     
-    skill_keywords = [
-        'Python', 'Java', 'JavaScript', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust', 'Swift',
-        'HTML', 'CSS', 'React', 'Vue', 'Angular', 'Node.js', 'Django', 'Flask', 'Spring',
-        'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Oracle', 'SQL Server',
-        'Docker', 'Kubernetes', 'AWS', 'Azure', 'Google Cloud', 'Linux', 'Windows',
-        'Git', 'SVN', 'Jenkins', 'CI/CD', 'Agile', 'Scrum', 'DevOps',
-        'Machine Learning', 'AI', 'Data Science', 'Big Data', 'Hadoop', 'Spark',
-        'Excel', 'PowerBI', 'Tableau', 'Photoshop', 'Illustrator', 'Figma',
-        '项目管理', '团队协作', '沟通能力', '领导力', '创新思维', '问题解决'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in skill_keywords:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills
+    return extract_skills(text, PROFILE, labels=True)
 
 def get_target_skills_by_position(position):
     """根据职位获取目标技能"""
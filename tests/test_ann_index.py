@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ANN 索引测试：IVF 与精确检索的召回、增量增删、持久化，以及与向量表的同步
+"""
+
+import numpy as np
+import pytest
+
+from app import create_app, db, embeddings, utils, ann_index
+from app.ann_index import FlatIndex, IVFFlatIndex, save_index, load_index
+from app.config import Config
+from app.models import User, Job
+
+from test_embeddings import FakeModel
+
+
+def _clustered(n, dim=32, topics=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = embeddings.normalize(rng.standard_normal((topics, dim)))
+    labels = rng.integers(0, topics, size=n)
+    return embeddings.normalize(centers[labels] + 0.05 * rng.standard_normal((n, dim)))
+
+
+def test_ivf_recall_against_exact_search():
+    """IVF 检索的 top-k 与精确检索高度一致"""
+    vectors = _clustered(2000)
+    ids = np.arange(2000) + 1000
+    flat, ivf = FlatIndex(32), IVFFlatIndex(32, nprobe=8)
+    flat.add(ids, vectors)
+    ivf.add(ids, vectors)
+    queries = _clustered(30, seed=1)
+    hits = total = 0
+    for q in queries:
+        truth = {i for i, _ in flat.search(q, 10)}
+        hits += len(truth & {i for i, _ in ivf.search(q, 10)})
+        total += len(truth)
+    assert hits / total >= 0.9
+    # 扫描全部簇时等价于精确检索
+    assert ivf.search(queries[0], 10, nprobe=ivf.nlist) == flat.search(queries[0], 10)
+
+
+@pytest.mark.parametrize('cls', [FlatIndex, IVFFlatIndex])
+def test_incremental_update_and_persistence(cls, tmp_path):
+    """增删后检索结果正确，保存再加载后结果不变"""
+    vectors = _clustered(300)
+    index = cls(32)
+    index.add(np.arange(300), vectors)
+    assert index.search(vectors[42], 1)[0][0] == 42
+
+    index.remove([42])
+    assert 42 not in {i for i, _ in index.search(vectors[42], 5)}
+    index.add([42], vectors[7:8])  # 同一 ID 重新写入时覆盖旧向量
+    assert len(index) == 300
+    assert {i for i, _ in index.search(vectors[7], 2)} == {7, 42}
+
+    path = str(tmp_path / 'idx.npz')
+    save_index(index, path, {'model': 'm'})
+    loaded, meta = load_index(path)
+    assert meta['model'] == 'm' and meta['backend'] == index.backend
+    assert len(loaded) == 300
+    assert loaded.search(vectors[100], 5) == index.search(vectors[100], 5)
+
+
+
+def test_concurrent_saves_use_separate_temp_files(tmp_path):
+    """多个进程/线程同时保存同一索引：各自使用独立临时文件，不互相覆盖，也不留下临时文件"""
+    import threading
+    index = FlatIndex(32)
+    index.add(np.arange(200), _clustered(200))
+    path = str(tmp_path / 'idx.npz')
+    errors = []
+
+    def save(n):
+        try:
+            for _ in range(20):
+                save_index(index, path, {'writer': n})
+        except Exception as e:  # pragma: no cover - 失败时记录
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    loaded, meta = load_index(path)
+    assert len(loaded) == 200 and meta['writer'] in range(4)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['idx.npz']
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'ann.db'}")
+    monkeypatch.setenv('TASK_QUEUE_DB', str(tmp_path / 'tasks.db'))
+    monkeypatch.setenv('TASK_QUEUE_EAGER', '1')
+    monkeypatch.setenv('ANN_INDEX_DIR', str(tmp_path / 'ann'))
+    monkeypatch.setenv('ANN_SYNC_INTERVAL', '0')
+    fake = FakeModel()
+    monkeypatch.setattr(utils, 'get_sentence_transformer', lambda: fake)
+    from app import task_queue
+    task_queue.reset_queue()
+    embeddings.reset_matrix()
+    ann_index.reset_indexes()
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    ann_index.reset_indexes()
+    embeddings.reset_matrix()
+    task_queue.reset_queue()
+
+
+def _user(email, is_hr=False):
+    user = User(first_name='u', last_name=email[:3], company_name='c', email=email,
+                phone_number='0', birthday='2000-01-01', password='x', is_hr=is_hr)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_indexes_follow_publish_delete_and_serve_both_directions(app):
+    """职位/候选人向量写入与删除后索引同步更新，支持职位→候选人与候选人→职位检索"""
+    hr = _user('hr@example.com', is_hr=True)
+    jobs = [Job(title=t, location='北京', description=d, salary='10k', user_id=hr.id)
+            for t, d in [('py', 'python flask backend'), ('fe', 'react frontend css'), ('da', 'pandas data analysis')]]
+    db.session.add_all(jobs)
+    db.session.commit()
+    for job in jobs:
+        embeddings.schedule_job_embedding(job.id)
+
+    alice, bob = _user('alice@example.com'), _user('bob@example.com')
+    assert embeddings.upsert_candidate_embedding(alice.id, 'python flask backend developer')
+    assert embeddings.upsert_candidate_embedding(bob.id, 'react css frontend')
+
+    top_job = ann_index.get_index('job').search(embeddings.candidate_vector(alice.id), 1)
+    assert top_job[0][0] == jobs[0].id
+    top_candidate = ann_index.get_index('candidate').search(embeddings.job_vector(jobs[1].id), 1)
+    assert top_candidate[0][0] == bob.id
+
+    embeddings.delete_job_embedding(jobs[0].id)
+    db.session.delete(jobs[0])
+    db.session.commit()
+    assert jobs[0].id not in dict(ann_index.get_index('job').search(embeddings.candidate_vector(alice.id), 3))
+
+    # 新进程：从磁盘加载索引后增量同步
+    ann_index.reset_indexes()
+    manager = ann_index.get_index('candidate')
+    assert not manager.sync()
+    assert len(manager.index) == 2
+
+    from app.models import CandidateEmbedding
+    db.session.delete(CandidateEmbedding.query.get(bob.id))
+    db.session.commit()
+    assert manager.sync(force=True)
+    assert [i for i, _ in manager.search(embeddings.job_vector(jobs[1].id), 5)] == [alice.id]
+
+
+def test_hr_job_matches_endpoint(app):
+    """HR 按职位检索候选人接口：仅职位发布者可访问，返回相似度排序"""
+    hr, other_hr = _user('hr@example.com', is_hr=True), _user('hr2@example.com', is_hr=True)
+    job = Job(title='py', location='北京', description='python flask backend', salary='10k', user_id=hr.id)
+    db.session.add(job)
+    db.session.commit()
+    embeddings.schedule_job_embedding(job.id)
+    alice, bob = _user('alice@example.com'), _user('bob@example.com')
+    embeddings.upsert_candidate_embedding(alice.id, 'python flask backend developer')
+    embeddings.upsert_candidate_embedding(bob.id, 'react css frontend')
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = other_hr.id
+    assert client.get(f'/smartrecruit/hr/candidates/api/job/{job.id}/matches').status_code == 403
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = hr.id
+    data = client.get(f'/smartrecruit/hr/candidates/api/job/{job.id}/matches?k=5').get_json()
+    assert [m['user_id'] for m in data['matches']] == [alice.id, bob.id]
+    assert data['matches'][0]['score'] > data['matches'][1]['score']
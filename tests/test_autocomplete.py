@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+职位搜索输入联想测试：前缀/分段/拼音匹配、按权重排序、增量增删与接口
+"""
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.models import User, Job
+from smartrecruit_system.candidate_module import autocomplete
+from smartrecruit_system.candidate_module.autocomplete import (
+    AutocompleteIndex, term_keys, job_terms, update_job_terms, get_autocomplete, signature_before_write, SCAN_LIMIT,
+)
+
+
+def _texts(index, prefix, limit=8):
+    return [item['text'] for item in index.suggest(prefix, limit)]
+
+
+def test_prefix_and_segment_match():
+    """原文前缀与词中分段起始（空白、中英文交界）均可联想，大小写无关"""
+    index = AutocompleteIndex.build([('title', 'Python 开发工程师', 3), ('title', 'Java开发', 1),
+                                     ('company', '字节跳动', 2)])
+    assert _texts(index, 'py') == ['Python 开发工程师']
+    assert _texts(index, 'PYTHON 开') == ['Python 开发工程师']
+    assert _texts(index, '开发') == ['Python 开发工程师', 'Java开发']
+    assert _texts(index, '字节') == ['字节跳动']
+    assert _texts(index, '跳动') == []
+    assert _texts(index, '  ') == []
+
+
+def test_pinyin_keys():
+    """中文词条可用全拼与首字母联想"""
+    pytest.importorskip('pypinyin')
+    assert {'shujufenxishi', 'sjfxs'} <= term_keys('数据分析师')
+    assert 'pythonkf' in term_keys('Python开发')
+    index = AutocompleteIndex.build([('title', '数据分析师', 1), ('location', '上海', 5)])
+    assert _texts(index, 'shuju') == ['数据分析师']
+    assert _texts(index, 'sjf') == ['数据分析师']
+    assert _texts(index, 'sh') == ['上海', '数据分析师']
+
+
+def test_ranking_and_incremental_update():
+    """按权重排序；同一原文只保留一条；增删后大区间的缓存结果随之更新"""
+    terms = [('title', f'a{i:04d}', 1) for i in range(SCAN_LIMIT * 2)]
+    index = AutocompleteIndex.build(terms + [('skill', 'A0001', 1)])
+    assert index.suggest('a', 2) == [{'text': 'a0000', 'type': 'title', 'count': 1},
+                                     {'text': 'a0001', 'type': 'title', 'count': 1}]
+    index.add('company', 'a9999', 5)
+    assert _texts(index, 'a', 2) == ['a9999', 'a0000']
+    index.add('title', 'a0500')
+    index.add('title', 'a0500')
+    assert _texts(index, 'a', 3) == ['a9999', 'a0500', 'a0000']
+    index.remove('company', 'a9999', 5)
+    assert _texts(index, 'a', 2) == ['a0500', 'a0000']
+    assert _texts(index, 'a999') == []
+    index.remove('skill', 'missing')
+    assert len(index) == SCAN_LIMIT * 2 + 1
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'autocomplete.db'}")
+    autocomplete.reset_autocomplete()
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    autocomplete.reset_autocomplete()
+
+
+def test_api_and_job_changes(app):
+    """接口返回职位/公司/地点/技能词条；职位发布、编辑、删除后增量更新"""
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    db.session.add_all([Job(title='Python 开发工程师', company_name='星辰科技', location='杭州', description='x',
+                            salary='10k', user_id=hr.id) for _ in range(2)])
+    db.session.commit()
+    client = app.test_client()
+    url = '/smartrecruit/candidate/jobs/api/autocomplete'
+    assert client.get(url, query_string={'q': 'py'}).status_code == 401
+    with client.session_transaction() as sess:
+        sess['user_id'] = hr.id
+
+    def suggestions(q, **params):
+        data = client.get(url, query_string={'q': q, **params}).get_json()
+        assert data['success']
+        return [(item['text'], item['type']) for item in data['suggestions']]
+
+    assert suggestions('py', limit=2) == [('Python 开发工程师', 'title'), ('python', 'skill')]
+    assert suggestions('星辰') == [('星辰科技', 'company')]
+    assert suggestions('杭') == [('杭州', 'location')]
+    assert suggestions('') == []
+
+    before = signature_before_write()
+    job = Job(title='Go 工程师', company_name='星辰科技', location='杭州', description='x', salary='10k', user_id=hr.id)
+    db.session.add(job)
+    db.session.commit()
+    update_job_terms(new_terms=job_terms(job), before=before)
+    signature = get_autocomplete()._signature
+    assert before is not None and signature != before
+    assert suggestions('go 工') == [('Go 工程师', 'title')]
+
+    before = signature_before_write()
+    old_terms = job_terms(job)
+    job.title = 'Golang 工程师'
+    db.session.commit()
+    update_job_terms(old_terms, job_terms(job), before)
+    assert suggestions('gol') == [('Golang 工程师', 'title')]
+
+    before = signature_before_write()
+    old_terms = job_terms(job)
+    db.session.delete(job)
+    db.session.commit()
+    update_job_terms(old_terms, before=before)
+    assert suggestions('gol') == []
+    assert client.get(url, query_string={'q': '星辰'}).get_json()['suggestions'][0]['count'] == 2
+    # 增量更新后记录了新的职位表状态，下次检查时不会整体重建
+    assert get_autocomplete()._signature != signature
+
+
+def test_rebuilds_after_edits_from_other_processes(app, monkeypatch):
+    """其它进程修改职位标题（不经过本进程的 update_job_terms）时，检查间隔后整体重建"""
+    monkeypatch.setenv('AUTOCOMPLETE_REFRESH_INTERVAL', '0')
+    autocomplete.reset_autocomplete()
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    job = Job(title='Go 工程师', location='杭州', description='x', salary='10k', user_id=hr.id)
+    db.session.add(job)
+    db.session.commit()
+    assert autocomplete.suggest('gol') == []
+    job.title = 'Golang 工程师'
+    db.session.commit()
+    assert [item['text'] for item in autocomplete.suggest('gol')] == ['Golang 工程师']
+
+
+def test_local_update_does_not_hide_other_process_edits(app, monkeypatch):
+    """索引已落后于其它进程的修改时，本进程的增量更新不记录新状态，而是在下次查询时整体重建"""
+    monkeypatch.setenv('AUTOCOMPLETE_REFRESH_INTERVAL', '3600')
+    autocomplete.reset_autocomplete()
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    other = Job(title='Go 工程师', location='杭州', description='x', salary='10k', user_id=hr.id)
+    db.session.add(other)
+    db.session.commit()
+    assert autocomplete.suggest('gol') == []
+
+    # 其它进程改名（不经过本进程的 update_job_terms），检查间隔内本进程尚未发现
+    other.title = 'Golang 工程师'
+    db.session.commit()
+    assert autocomplete.suggest('gol') == []
+
+    before = signature_before_write()
+    job = Job(title='Rust 工程师', location='杭州', description='x', salary='10k', user_id=hr.id)
+    db.session.add(job)
+    db.session.commit()
+    update_job_terms(new_terms=job_terms(job), before=before)
+    assert [item['text'] for item in autocomplete.suggest('gol')] == ['Golang 工程师']
+    assert [item['text'] for item in autocomplete.suggest('rust 工')] == ['Rust 工程师']
+    assert get_autocomplete()._signature == get_autocomplete()._current_signature()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本机编码服务测试：并发请求合并为微批、结果与进程内编码一致、服务不可用时降级
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app import embedding_service, embeddings
+
+from test_embeddings import FakeModel
+
+
+class SlowModel(FakeModel):
+    """每次 encode 固定耗时，记录调用次数"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        time.sleep(0.02)
+        return super().encode(texts, **kwargs)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    address = f"unix:{tmp_path / 'emb.sock'}"
+    model = SlowModel()
+    server = embedding_service.create_server(model, embeddings.model_name(), address=address,
+                                             max_batch=64, max_wait_ms=20)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('EMBEDDING_SERVICE', address)
+    embedding_service.reset_client()
+    embeddings._query_cache.clear()
+    model.calls = 0
+    yield server, model
+    embedding_service.reset_client()
+    embedding_service.close_server(server)
+
+
+def test_concurrent_requests_are_micro_batched(service):
+    """并发的单条编码请求被合并为少量批次，每个调用方拿到自己的向量"""
+    server, model = service
+    texts = [f'python backend skill{i}' for i in range(16)]
+    results = {}
+
+    def worker(i):
+        results[i] = embedding_service.get_client().encode([texts[i]], model=embeddings.model_name())
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    expected = FakeModel().encode(texts)
+    for i in range(len(texts)):
+        assert np.allclose(results[i][0], expected[i])
+    assert model.calls < len(texts) / 2
+
+
+def test_embeddings_route_through_service(service, monkeypatch):
+    """配置 EMBEDDING_SERVICE 后 embeddings.encode 不在本进程加载模型"""
+    from app import utils
+    monkeypatch.setattr(utils, 'get_sentence_transformer', lambda: pytest.fail('local model loaded'))
+    assert embeddings.available()
+    vectors = embeddings.encode(['react frontend', 'python flask'])
+    assert vectors.shape == (2, FakeModel.dim)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+    with pytest.raises(embedding_service.EmbeddingServiceError):
+        embedding_service.get_client().encode(['x'], model='other-model')
+
+
+def test_service_unavailable_degrades(tmp_path, monkeypatch):
+    """服务不可用时默认返回 None，开启回退后使用进程内模型"""
+    from app import utils
+    monkeypatch.setenv('EMBEDDING_SERVICE', f"unix:{tmp_path / 'missing.sock'}")
+    monkeypatch.setattr(utils, 'get_sentence_transformer', lambda: FakeModel())
+    embedding_service.reset_client()
+    assert embeddings.encode(['python']) is None
+    assert not embeddings.available()
+
+    monkeypatch.setenv('EMBEDDING_SERVICE_FALLBACK', '1')
+    assert embeddings.encode(['python']).shape == (1, FakeModel.dim)
+    embedding_service.reset_client()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+职位向量测试：发布时编码并存储、进程内矩阵打分与逐对计算一致
+"""
+
+import hashlib
+
+import numpy as np
+import pytest
+
+from app import create_app, db, embeddings, utils
+from app.config import Config
+from app.models import User, Job, JobEmbedding
+
+
+class FakeModel:
+    """按词哈希生成的确定性向量，代替 SentenceTransformer"""
+    dim = 32
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                out[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1
+        return out
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'emb.db'}")
+    monkeypatch.setenv('TASK_QUEUE_DB', str(tmp_path / 'tasks.db'))
+    monkeypatch.setenv('TASK_QUEUE_EAGER', '1')
+    fake = FakeModel()
+    monkeypatch.setattr(utils, 'get_sentence_transformer', lambda: fake)
+    from app import task_queue
+    task_queue.reset_queue()
+    embeddings.reset_matrix()
+    embeddings._query_cache.clear()
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        app.fake_model = fake
+        yield app
+        db.session.remove()
+    embeddings.reset_matrix()
+    task_queue.reset_queue()
+
+
+def _jobs(descriptions):
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    jobs = [Job(title=f'job{i}', location='北京', description=d, salary='10k', user_id=hr.id)
+            for i, d in enumerate(descriptions)]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return jobs
+
+
+def test_job_embedding_computed_once_and_scored_in_bulk(app):
+    """职位向量只在内容变化时重新编码；批量打分与逐对余弦一致"""
+    jobs = _jobs(['python flask backend', 'react frontend css', 'python data analysis pandas'])
+    for job in jobs:
+        embeddings.schedule_job_embedding(job.id)
+    assert JobEmbedding.query.count() == 3
+    encoded_before = len(app.fake_model.encoded)
+    assert embeddings.upsert_job_embeddings(jobs) == 0
+    assert len(app.fake_model.encoded) == encoded_before
+
+    scores = embeddings.score_jobs('python backend developer')
+    assert set(scores) == {j.id for j in jobs}
+    cv = embeddings.encode(['python backend developer'])[0]
+    for job in jobs:
+        expected = float(embeddings.encode([embeddings.job_text(job)])[0] @ cv)
+        assert scores[job.id] == pytest.approx(expected, abs=1e-6)
+
+    top = embeddings.get_matrix().top_k(cv, 2)
+    assert [job_id for job_id, _ in top][0] == jobs[0].id
+    assert utils.compute_similarity('python backend developer', '', job_id=jobs[0].id) == pytest.approx(scores[jobs[0].id], abs=1e-6)
+
+
+def test_edit_and_delete_refresh_matrix(app):
+    """编辑后重新编码、删除后从矩阵移除"""
+    job, other = _jobs(['java spring', 'go gin'])
+    embeddings.upsert_job_embeddings([job, other])
+    job.description = 'python flask'
+    db.session.commit()
+    assert embeddings.upsert_job_embeddings([job]) == 1
+
+    embeddings.delete_job_embedding(other.id)
+    db.session.commit()
+    assert list(embeddings.get_matrix().snapshot()[0]) == [job.id]
+    assert embeddings.job_vector(other.id) is None
+
+
+def test_int8_storage_scores_close_to_float32(app, monkeypatch):
+    """int8 存储：字节数约为 1/4，进程内矩阵以量化值打分，与 float32 结果基本一致"""
+    jobs = _jobs(['python flask backend', 'react frontend css', 'python data analysis pandas', 'go gin grpc'])
+    embeddings.upsert_job_embeddings(jobs)
+    float_scores = embeddings.score_jobs('python backend developer')
+
+    monkeypatch.setenv('EMBEDDING_STORAGE', 'int8')
+    assert embeddings.upsert_job_embeddings(jobs, force=True) == len(jobs)
+    row = JobEmbedding.query.get(jobs[0].id)
+    assert len(row.vector) == row.dim + 4
+    assert np.allclose(embeddings.from_bytes(row.vector, row.dim),
+                       embeddings.encode([embeddings.job_text(jobs[0])])[0], atol=0.01)
+
+    assert isinstance(embeddings.get_matrix().snapshot()[1], embeddings.QuantizedMatrix)
+    int8_scores = embeddings.score_jobs('python backend developer')
+    for job_id, score in float_scores.items():
+        assert int8_scores[job_id] == pytest.approx(score, abs=0.01)
+    assert sorted(int8_scores, key=int8_scores.get) == sorted(float_scores, key=float_scores.get)
+    assert embeddings.job_vector(jobs[1].id).dtype == np.float32
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本提取引擎测试：进程池执行、页数上限、超时返回部分文本、OCR 前缩放
+"""
+
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app import extraction, utils
+
+
+def _pdf_bytes(pages):
+    images = [Image.new('RGB', (200, 200), 'white') for _ in range(pages)]
+    buf = BytesIO()
+    images[0].save(buf, format='PDF', save_all=True, append_images=images[1:])
+    return buf.getvalue()
+
+
+def test_pool_extraction_enforces_page_limit(monkeypatch):
+    """进程池中提取 PDF，超出页数上限的部分被跳过"""
+    monkeypatch.setenv('EXTRACT_POOL', '1')
+    try:
+        result = extraction.extract(_pdf_bytes(5), 'cv.pdf', max_pages=2)
+    finally:
+        extraction.shutdown_pool()
+    assert result['page_count'] == 5
+    assert len(result['pages']) == 2
+    assert result['truncated'] == 'page_limit'
+
+
+def test_timeout_returns_partial_text(monkeypatch):
+    """超过时间预算抛出 ExtractionTimeout；公开函数返回部分文本而不是报错"""
+    monkeypatch.setenv('EXTRACT_POOL', '0')
+    with pytest.raises(extraction.ExtractionTimeout) as info:
+        extraction.extract(_pdf_bytes(3), 'cv.pdf', timeout=-1)
+    assert info.value.page_count == 3
+    assert info.value.partial_text == ''
+
+    monkeypatch.setenv('EXTRACT_TIMEOUT', '-1')
+    assert utils.extract_text_from_resume(_pdf_bytes(3), 'cv.pdf') == ''
+
+
+def test_image_downscaled_before_ocr(monkeypatch, tmp_path):
+    """OCR 前按最长边上限等比缩小图片"""
+    import pytesseract
+    seen = {}
+
+    def fake_ocr(image, timeout=0):
+        seen['size'] = image.size
+        return ' 识别结果 '
+
+    monkeypatch.setenv('EXTRACT_POOL', '0')
+    monkeypatch.setenv('EXTRACT_OCR_MAX_SIDE', '500')
+    monkeypatch.setattr(pytesseract, 'image_to_string', fake_ocr)
+    path = tmp_path / 'scan.png'
+    Image.new('RGB', (4000, 2000), 'white').save(path)
+    assert utils.extract_text_from_file(str(path)) == '识别结果'
+    assert seen['size'] == (500, 250)
+
+
+def test_unsupported_type_keeps_error_contract(tmp_path):
+    """不支持的类型仍按原约定抛出 Exception"""
+    path = tmp_path / 'notes.txt'
+    path.write_text('hello')
+    with pytest.raises(Exception, match='Unsupported file type'):
+        utils.extract_text_from_file(str(path))
+
+
+def test_hard_timeout_spares_other_inflight_documents(monkeypatch):
+    """硬超时只换下进程池：其它在途任务正常完成，之后旧池子进程（含卡死的）被终止"""
+    import time
+    monkeypatch.setenv('EXTRACT_WORKERS', '2')
+    extraction.shutdown_pool()
+    try:
+        pool, stuck = extraction._submit(time.sleep, (30,), hard_timeout=0.1)
+        _, other = extraction._submit(time.sleep, (1,), hard_timeout=10)
+        processes = list(pool._processes.values())
+        assert processes
+        extraction._retire_pool(pool, stuck)
+        assert extraction.get_pool() is not pool
+        assert other.result(timeout=10) is None
+        deadline = time.time() + 5
+        while any(p.is_alive() for p in processes) and time.time() < deadline:
+            time.sleep(0.05)
+        assert not any(p.is_alive() for p in processes)
+    finally:
+        extraction.shutdown_pool()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+职位搜索分面计数测试：分面快照与分组 SQL 结果一致且与逐条统计一致、排除自身筛选、接口返回与缓存失效
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from app import create_app, db, job_facets
+from app.config import Config
+from app.job_facets import facet_counts, job_filters, apply_filters, search_facets, get_index_holder, SALARY_BANDS
+from app.job_search import ensure_job_fts, search_jobs, match_job_ids
+from app.models import User, Job
+from smartrecruit_system.candidate_module.recommendation_engine import mark_jobs_changed
+
+CITIES = ['北京', '上海', '深圳', 'Remote']
+SALARIES = ['8k-12k', '15k-25k', '30-50万/年', '面议', '4000', '60k以上']
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'facets.db'}")
+    job_facets.reset_cache()
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    job_facets.reset_cache()
+
+
+def _hr():
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    return hr
+
+
+def _random_jobs(count, seed=0):
+    rng = random.Random(seed)
+    hr = _hr()
+    db.session.add_all(Job(title=rng.choice(['Python 开发', '数据分析师', '销售代表']), location=rng.choice(CITIES),
+                           description=rng.choice(['负责后端开发', '负责数据分析', '负责客户拓展']),
+                           salary=rng.choice(SALARIES), job_type=rng.choice(['全职', '实习', None]),
+                           experience_level=rng.choice(['初级', '高级', '不限', '']), user_id=hr.id)
+                       for _ in range(count))
+    db.session.commit()
+    return hr
+
+
+def _expected(jobs, name):
+    if name == 'salary':
+        counts = [sum(1 for job in jobs if job.salary_min is not None
+                      and (low is None or job.salary_max >= low) and (high is None or job.salary_min <= high))
+                  for low, high, _ in SALARY_BANDS]
+        return [count for count in counts if count]
+    return dict(Counter(getattr(job, name) for job in jobs if getattr(job, name)))
+
+
+def _actual(facets, name):
+    if name == 'salary':
+        return [item['count'] for item in facets[name]]
+    return {item['value']: item['count'] for item in facets[name]}
+
+
+def test_index_and_sql_match_brute_force(app):
+    """随机数据与随机筛选下，快照与分组 SQL 一致，且每个分面等于「去掉自身筛选」后的逐条统计"""
+    ensure_job_fts()
+    _random_jobs(300)
+    index = get_index_holder().index()
+    rng = random.Random(1)
+    for _ in range(40):
+        text = rng.choice(['', '开发', '数据', '客户拓展'])
+        params = {'location': rng.choice(['', '北京', 'remote', '海']), 'job_type': rng.choice(['', '全职', '兼职']),
+                  'experience_level': rng.choice(['', '高级']),
+                  'salary_min': rng.choice([None, 10000, 30000]), 'salary_max': rng.choice([None, 20000])}
+        matched = search_jobs(Job.query, text)[0] if text else Job.query
+        filters = job_filters(**params)
+        by_sql = facet_counts(matched, filters)
+        by_index = index.counts(match_job_ids(text) if text else None, **params)
+        assert by_sql == by_index
+        for name in by_sql:
+            jobs = apply_filters(matched, filters, exclude=name).order_by(None).all()
+            assert _actual(by_sql, name) == _expected(jobs, name), (text, params, name)
+
+
+def test_search_api_returns_cached_facets(app):
+    """接口首页返回分面计数，翻页时不再计算；职位变化后缓存失效"""
+    hr = _random_jobs(30)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = hr.id
+    url = '/smartrecruit/candidate/jobs/api/search_jobs'
+
+    data = client.get(url, query_string={'location': '北京', 'limit': 5}).get_json()
+    facets = data['facets']
+    assert sum(item['count'] for item in facets['location']) == 30
+    assert sum(item['count'] for item in facets['job_type']) == data['total'] - \
+        Job.query.filter(Job.location.contains('北京'), Job.job_type.is_(None)).count()
+    assert client.get(url, query_string={'location': '北京', 'limit': 5,
+                                         'cursor': data['next_cursor']}).get_json()['facets'] is None
+
+    db.session.add(Job(title='新职位', location='北京', description='x', salary='10k', user_id=hr.id))
+    db.session.commit()
+    # 未通知变化前命中缓存；mark_jobs_changed 后重新统计
+    assert client.get(url, query_string={'location': '北京'}).get_json()['facets'] == facets
+    mark_jobs_changed()
+    facets = client.get(url, query_string={'location': '北京'}).get_json()['facets']
+    assert sum(item['count'] for item in facets['location']) == 31
+
+
+def test_snapshot_sees_edits_from_other_processes(app, monkeypatch):
+    """其它进程只修改职位字段（不经过本进程的 mark_jobs_changed）时，快照在检查间隔后重建"""
+    monkeypatch.setenv('JOB_FACET_REFRESH_INTERVAL', '0')
+    job_facets.reset_cache()
+    _random_jobs(20)
+    job = Job.query.first()
+    get_index_holder().index()
+    job.location = '拉萨'
+    db.session.commit()
+    locations = {item['value']: item['count'] for item in get_index_holder().index().counts(None)['location']}
+    assert locations['拉萨'] == 1
+
+
+def test_sql_fallback_without_numpy(app, monkeypatch):
+    """numpy 不可用时使用分组 SQL"""
+    _random_jobs(50)
+    monkeypatch.setattr(job_facets, 'np', None)
+    facets = search_facets(Job.query, '', location='上海')
+    assert facets == facet_counts(Job.query, job_filters(location='上海'))
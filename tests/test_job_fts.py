@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+职位全文检索测试：CJK 二元切分（Python 与触发器 SQL 一致）、触发器同步、BM25 排序与 LIKE 回退
+"""
+
+import random
+import sqlite3
+
+import pytest
+
+from app import create_app, db, job_search
+from app.config import Config
+from app.job_search import cjk_bigrams, build_match_query, search_jobs, ensure_job_fts, fts_available
+from app.models import User, Job
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'fts.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _jobs(rows):
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    jobs = [Job(title=title, location='北京', description=description, salary='10k', user_id=hr.id,
+                skills_required=skills) for title, description, skills in rows]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return jobs
+
+
+def _search(text):
+    query, rank = search_jobs(Job.query, text)
+    return [job.title for job in query.all()], rank is not None
+
+
+def test_bigram_sql_matches_python():
+    """触发器中的 SQL 切分与 Python 实现逐字符一致"""
+    conn = sqlite3.connect(':memory:')
+    alphabet = '软件开发工程师 Python数据,。あイ한글x1-'
+    rng = random.Random(0)
+    samples = ['', '开', '软件开发', 'Python开发工程师', 'C++/Go 后端', 'a开b发c'] + \
+              [''.join(rng.choice(alphabet) for _ in range(rng.randrange(12))) for _ in range(200)]
+    sql = 'SELECT ' + job_search._bigram_sql(':t')
+    for text in samples:
+        assert conn.execute(sql, {'t': text}).fetchone()[0] == cjk_bigrams(text)
+    assert cjk_bigrams('软件开发') == ' 软件  件开  开发 '
+    assert build_match_query('Python 开发') == '"Python" AND "开发"'
+    assert build_match_query('男') is None
+
+
+def test_fts_search_ranked_and_synced(app):
+    """FTS 结果按相关度排序，增删改由触发器同步"""
+    ensure_job_fts()
+    assert fts_available()
+    jobs = _jobs([
+        ('销售代表', '负责客户开发与维护', None),
+        ('Python 开发工程师', '负责后端开发，熟悉 Django', 'Python'),
+        ('测试工程师', '编写自动化测试', 'python'),
+    ])
+    titles, ranked = _search('开发')
+    assert ranked and titles[0] == 'Python 开发工程师' and set(titles) == {'销售代表', 'Python 开发工程师'}
+    assert _search('PYTHON')[0][0] == 'Python 开发工程师'
+    assert _search('python 测试')[0] == ['测试工程师']
+    assert _search('发工')[0] == ['Python 开发工程师']
+    # 二元短语要求相邻：「开维」不在任何文本中
+    assert _search('开维')[0] == []
+
+    jobs[2].description = '负责数据平台开发'
+    db.session.commit()
+    assert '测试工程师' in _search('平台开发')[0]
+    assert _search('自动化')[0] == []
+    db.session.delete(jobs[1])
+    db.session.commit()
+    assert 'Python 开发工程师' not in _search('开发')[0]
+
+
+def test_plus_and_hash_terms_stay_distinct(app):
+    """分词器丢弃 + 和 #，「C++」「C#」与单独的「C」仍能区分（与 LIKE 匹配一致）"""
+    ensure_job_fts()
+    _jobs([('C++ 开发工程师', '负责交易系统', None), ('C# 开发工程师', '负责桌面客户端', '.NET'),
+           ('嵌入式工程师', '熟悉 C 语言', None), ('游戏开发', '使用 Unity', 'c#, C++')])
+    assert sorted(_search('C++')[0]) == ['C++ 开发工程师', '游戏开发']
+    assert sorted(_search('c#')[0]) == ['C# 开发工程师', '游戏开发']
+    assert _search('C# 桌面')[0] == ['C# 开发工程师']
+    assert len(_search('C')[0]) == 4
+    assert sorted(Job.query.get(job_id).title for job_id in job_search.match_job_ids('C++ 开发')) == \
+        ['C++ 开发工程师', '游戏开发']
+
+
+def test_backfill_and_like_fallback(app, monkeypatch):
+    """已有职位在建索引时回填；未建索引、单字查询或非 SQLite 时回退 LIKE"""
+    _jobs([('Java 开发', '后端开发', None), ('前台', '接待', None)])
+    assert _search('开发') == (['Java 开发'], False)
+    ensure_job_fts()
+    assert _search('开发') == (['Java 开发'], True)
+    assert _search('台') == (['前台'], False)
+    monkeypatch.setattr(job_search, 'is_sqlite', lambda: False)
+    assert _search('开发') == (['Java 开发'], False)
+
+
+def test_search_api_uses_index(app):
+    """职位搜索接口返回全文检索结果"""
+    ensure_job_fts()
+    _jobs([('数据分析师', '负责数据分析', 'SQL'), ('前台', '接待', None)])
+    user = User.query.first()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.id
+    data = client.get('/smartrecruit/candidate/jobs/api/search_jobs?q=数据').get_json()
+    assert data['success'] and [job['title'] for job in data['jobs']] == ['数据分析师']
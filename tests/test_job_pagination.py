@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+职位列表游标分页测试：逐页遍历不重不漏、同一发布时间按 ID 排序、相关度排序翻页、无效游标与每页上限
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.job_pagination import (paginate_jobs, paginate_scored, decode_cursor, encode_cursor, InvalidCursor,
+                                MAX_PAGE_SIZE, SCORE_WINDOW_PAGES)
+from app.job_search import ensure_job_fts, search_jobs
+from app.models import User, Job
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'page.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _jobs(count):
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    base = datetime(2024, 1, 1)
+    # 每 3 个职位共用一个发布时间，检验同一时间下按 ID 翻页
+    db.session.add_all(Job(title=f'职位{i}', location='北京', description='负责后端开发' if i % 2 else '负责销售',
+                           salary='10k', user_id=hr.id, date_posted=base + timedelta(days=i // 3))
+                       for i in range(count))
+    db.session.commit()
+    return hr
+
+
+def _walk(jobs_query, limit, rank=None):
+    ids, cursor = [], None
+    while True:
+        page, cursor = paginate_jobs(jobs_query, cursor=cursor, limit=limit, rank=rank)
+        assert len(page) <= limit
+        ids.extend(job.id for job in page)
+        if cursor is None:
+            return ids
+
+
+def test_keyset_walk_matches_full_order(app):
+    """逐页读取的结果与一次性排序完全一致"""
+    _jobs(47)
+    expected = [job.id for job in Job.query.order_by(Job.date_posted.desc(), Job.id.desc())]
+    for limit in (1, 5, 7, 47, 100):
+        assert _walk(Job.query, limit) == expected
+    # 新职位发布后，旧游标之后的内容不受影响
+    page, cursor = paginate_jobs(Job.query, limit=10)
+    db.session.add(Job(title='新职位', location='北京', description='x', salary='1', user_id=1))
+    db.session.commit()
+    assert [job.id for job in paginate_jobs(Job.query, cursor=cursor, limit=10)[0]] == expected[10:20]
+
+
+def test_ranked_walk_and_cursor_validation(app):
+    """全文检索按相关度翻页；游标与排序方式不符或格式错误时报错"""
+    ensure_job_fts()
+    _jobs(30)
+    jobs_query, rank = search_jobs(Job.query, '开发')
+    assert rank is not None
+    expected = [job.id for job in jobs_query.order_by(rank, Job.date_posted.desc(), Job.id.desc())]
+    assert len(expected) == 15
+    assert _walk(jobs_query, 4, rank=rank) == expected
+
+    page, cursor = paginate_jobs(Job.query, limit=2)
+    with pytest.raises(InvalidCursor):
+        paginate_jobs(jobs_query, cursor=cursor, rank=rank)
+    with pytest.raises(InvalidCursor):
+        decode_cursor('not-a-cursor')
+    assert decode_cursor(encode_cursor([datetime(2024, 1, 2, 3, 4, 5, 6), 9])) == [datetime(2024, 1, 2, 3, 4, 5, 6), 9]
+
+
+def test_scored_walk_sorts_each_window(app):
+    """按匹配度翻页：每个窗口内按分数降序（同分保持原顺序），逐页遍历不重不漏；中途改变 limit 不影响"""
+    _jobs(47)
+    order = [job.id for job in Job.query.order_by(Job.date_posted.desc(), Job.id.desc())]
+    score = lambda jobs: [job.id % 7 for job in jobs]
+    window = 4 * SCORE_WINDOW_PAGES
+    expected = []
+    for start in range(0, len(order), window):
+        expected.extend(sorted(order[start:start + window], key=lambda i: i % 7, reverse=True))
+
+    ids, cursor = [], None
+    while True:
+        page, cursor = paginate_scored(Job.query, score, cursor=cursor, limit=4)
+        assert len(page) <= 4 and all(s == job.id % 7 for job, s in page)
+        ids.extend(job.id for job, _ in page)
+        if cursor is None:
+            break
+    assert ids == expected
+
+    page, cursor = paginate_scored(Job.query, score, limit=3)
+    rest, _ = paginate_scored(Job.query, score, cursor=cursor, limit=50)
+    window = sorted(order[:3 * SCORE_WINDOW_PAGES], key=lambda i: i % 7, reverse=True)
+    assert [job.id for job, _ in page + rest] == window
+    with pytest.raises(InvalidCursor):
+        paginate_scored(Job.query, score, cursor='bad')
+
+def test_search_api_pages(app):
+    """搜索接口返回 next_cursor，首页带总数，每页条数有上限"""
+    hr = _jobs(MAX_PAGE_SIZE + 20)
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = hr.id
+    url = '/smartrecruit/candidate/jobs/api/search_jobs'
+
+    data = client.get(url, query_string={'limit': 1000}).get_json()
+    assert data['success'] and data['total'] == MAX_PAGE_SIZE + 20
+    assert len(data['jobs']) == MAX_PAGE_SIZE and data['next_cursor']
+    seen = {job['id'] for job in data['jobs']}
+    data = client.get(url, query_string={'limit': 1000, 'cursor': data['next_cursor']}).get_json()
+    assert len(data['jobs']) == 20 and data['next_cursor'] is None and data['total'] is None
+    seen |= {job['id'] for job in data['jobs']}
+    assert len(seen) == MAX_PAGE_SIZE + 20
+
+    data = client.get(url, query_string={'q': '销售', 'limit': 10}).get_json()
+    assert data['total'] == (MAX_PAGE_SIZE + 20) // 2 and len(data['jobs']) == 10
+
+    response = client.get(url, query_string={'cursor': 'bad'})
+    assert response.status_code == 400 and response.get_json()['success'] is False
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+职位技能持久化测试：发布/编辑/删除时维护 job_skill 表，推荐路径只读取预计算的技能集合
+"""
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.job_skills import save_job_skills, delete_job_skills, load_job_skills
+from app.models import User, Job, JobSkill
+from smartrecruit_system.candidate_module import jobs as jobs_module
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'skills.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _hr():
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.commit()
+    return hr
+
+
+def test_save_edit_and_delete_job_skills(app):
+    """保存时写入技能行，编辑后替换，删除后清空"""
+    job = Job(title='后端', location='北京', description='熟悉 Python 和 Docker，了解机器学习', salary='10k',
+              user_id=_hr().id)
+    db.session.add(job)
+    db.session.flush()
+    assert save_job_skills(job)
+    db.session.commit()
+    skills = load_job_skills([job.id])[job.id]
+    assert {'python', 'docker', '机器学习'} <= skills
+    # 'go' 不应在 'google' 等单词内部命中
+    assert 'go' not in skills
+
+    job.description = '精通 Java 与 MySQL'
+    save_job_skills(job)
+    db.session.commit()
+    assert load_job_skills([job.id])[job.id] == {'java', 'mysql'}
+    assert JobSkill.query.filter_by(skill='java').first().category
+
+    delete_job_skills(job.id)
+    db.session.commit()
+    assert load_job_skills([job.id]) == {}
+
+
+def test_recommendations_read_precomputed_skills(app, monkeypatch):
+    """推荐时不再解析职位描述"""
+    hr = _hr()
+    jobs = [Job(title=f'job{i}', location='北京', description=d, salary='10k', user_id=hr.id)
+            for i, d in enumerate(['Python 开发', 'Java 开发', '负责接待来访客人'])]
+    db.session.add_all(jobs)
+    db.session.flush()
+    for job in jobs:
+        save_job_skills(job)
+    db.session.commit()
+
+    def fail(description):
+        raise AssertionError('job description parsed at request time')
+    monkeypatch.setattr(jobs_module, 'extract_job_keywords', fail)
+    user = User(first_name='u', last_name='x', company_name='c', email='u@example.com', phone_number='0',
+                birthday='2000-01-01', password='x', skills='["Python"]')
+    db.session.add(user)
+    db.session.commit()
+
+    keywords = jobs_module.get_job_keywords_map(jobs)
+    assert keywords[jobs[2].id] == set()
+    scores = {job.id: jobs_module.calculate_job_match(user, job, keywords[job.id]) for job in jobs}
+    assert scores[jobs[0].id] > scores[jobs[1].id]
+    assert jobs_module.calculate_job_match(user, jobs[0]) == scores[jobs[0].id]
+    assert jobs_module.get_job_recommendations(user)
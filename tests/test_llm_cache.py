@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 响应缓存测试
+"""
+
+import time
+
+from app import llm_cache
+
+
+def test_key_ignores_whitespace_but_not_tokens():
+    """归一化后的 prompt 相同即命中同一键；max_tokens 不同则不同键"""
+    a = llm_cache.make_key('gemini', 'm', '问题： 你好\n\n  世界', 400)
+    b = llm_cache.make_key('gemini', 'm', '问题： 你好 世界', 400)
+    c = llm_cache.make_key('gemini', 'm', '问题： 你好 世界', 800)
+    assert a == b
+    assert a != c
+
+
+def test_memory_tier_lru_and_ttl():
+    """进程内层按 LRU 淘汰，过期条目视为未命中"""
+    cache = llm_cache.LLMResponseCache(max_entries=2)
+    cache.set('a', 'A', ttl=60)
+    cache.set('b', 'B', ttl=60)
+    assert cache.get('a') == 'A'
+    cache.set('c', 'C', ttl=60)
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+
+    cache.set('short', 'S', ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get('short') is None
+    stats = cache.stats()
+    assert stats['memory_hits'] == 2
+    assert stats['misses'] == 2
+
+
+def test_sqlite_tier_shared_between_instances(tmp_path):
+    """磁盘层在不同缓存实例（模拟不同 worker）之间共享"""
+    db_path = str(tmp_path / 'llm_cache.db')
+    writer = llm_cache.LLMResponseCache(max_entries=4, db_path=db_path)
+    reader = llm_cache.LLMResponseCache(max_entries=4, db_path=db_path)
+    writer.set('k', '缓存结果', ttl=60)
+    assert reader.get('k') == '缓存结果'
+    assert reader.stats()['disk_hits'] == 1
+    assert reader.get('k') == '缓存结果'
+    assert reader.stats()['memory_hits'] == 1
+
+
+def test_cached_decorator_skips_repeat_calls(monkeypatch):
+    """装饰器：相同 prompt 第二次调用不再执行被装饰函数，失败结果不缓存"""
+    monkeypatch.setenv('LLM_CACHE_ENABLED', '1')
+    monkeypatch.delenv('LLM_CACHE_DB', raising=False)
+    llm_cache.reset_cache()
+    calls = []
+
+    @llm_cache.cached('fake', lambda: 'fake-model')
+    def generate(prompt, max_tokens=800):
+        calls.append(prompt)
+        return None if prompt == 'fail' else f'echo:{prompt}'
+
+    assert generate('hello', max_tokens=100) == 'echo:hello'
+    assert generate('hello', max_tokens=100) == 'echo:hello'
+    assert generate('hello', max_tokens=100, cache_ttl=0) == 'echo:hello'
+    assert generate('fail') is None
+    assert generate('fail') is None
+    assert calls == ['hello', 'hello', 'fail', 'fail']
+    llm_cache.reset_cache()
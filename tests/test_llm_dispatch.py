@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 提供方调度测试：顺序降级与对冲竞速
+"""
+
+import time
+
+from app import utils
+
+
+def _fake_providers(monkeypatch, delays, outputs):
+    calls = []
+
+    def make(name):
+        def call(prompt, max_tokens, cache_ttl=None):
+            calls.append(name)
+            time.sleep(delays[name])
+            return outputs[name]
+        return call
+
+    monkeypatch.setattr(utils, '_PROVIDER_CALLS', {name: make(name) for name in delays})
+    return calls
+
+
+def test_sequential_mode_tries_in_order(monkeypatch):
+    """顺序模式：首个有效结果即返回，后续提供方不被调用"""
+    monkeypatch.setenv('LLM_DISPATCH_MODE', 'sequential')
+    calls = _fake_providers(monkeypatch, {'gemini': 0, 'deepseek': 0, 'hf': 0},
+                            {'gemini': None, 'deepseek': 'ok', 'hf': 'late'})
+    assert utils._generate_first_valid('p', 10, lambda t: t) == 'ok'
+    assert calls == ['gemini', 'deepseek']
+
+
+def test_race_mode_hedges_slow_primary(monkeypatch):
+    """竞速模式：主提供方超过对冲延迟后，次提供方先返回即胜出"""
+    monkeypatch.setenv('LLM_DISPATCH_MODE', 'race')
+    monkeypatch.setenv('LLM_HEDGE_DELAY', '0.05')
+    _fake_providers(monkeypatch, {'gemini': 1.0, 'deepseek': 0.01, 'hf': 0.01},
+                    {'gemini': 'slow', 'deepseek': 'fast', 'hf': 'fast-hf'})
+    started = time.perf_counter()
+    result = utils._generate_first_valid('p', 10, lambda t: t, providers=('gemini', 'deepseek'))
+    assert result == 'fast'
+    assert time.perf_counter() - started < 0.5
+
+
+def test_race_mode_skips_invalid_output(monkeypatch):
+    """竞速模式：解析失败的结果不算胜出，立即启动下一个提供方"""
+    monkeypatch.setenv('LLM_DISPATCH_MODE', 'race')
+    monkeypatch.setenv('LLM_HEDGE_DELAY', '5')
+    calls = _fake_providers(monkeypatch, {'gemini': 0, 'deepseek': 0, 'hf': 0},
+                            {'gemini': 'not json', 'deepseek': '["python"]', 'hf': None})
+    import json
+    result = utils._generate_first_valid('p', 10, json.loads)
+    assert result == ['python']
+    assert calls[:2] == ['gemini', 'deepseek']
+
+
+def test_generate_feedback_batch_keeps_order_and_falls_back(monkeypatch):
+    """并发评分：结果顺序与题目一致，单题失败使用本地降级评分"""
+    monkeypatch.setenv('LLM_FEEDBACK_MODE', 'parallel')
+
+    def fake_feedback(question, response, job_description):
+        if question == 'q2':
+            raise RuntimeError('provider exploded')
+        time.sleep(0.05 if question == 'q1' else 0)
+        return f'{question}:{response} 评分：8/10'
+
+    monkeypatch.setattr(utils, 'generate_feedback', fake_feedback)
+    pairs = [('q1', 'a1'), ('q2', 'a2'), ('q3', 'a3')]
+    feedbacks = utils.generate_feedback_batch(pairs, 'python')
+    assert feedbacks[0] == 'q1:a1 评分：8/10'
+    assert feedbacks[1].endswith('/10')
+    assert feedbacks[2] == 'q3:a3 评分：8/10'
+
+
+def test_batched_feedback_parsing_fills_gaps():
+    """批量评分：按 index 对齐，缺失的条目为 None 以便单独补评"""
+    text = '```json\n[{"index": 2, "feedback": "不错。评分：7/10"}, {"index": 1, "feedback": "好。评分：9/10"}]\n```'
+    assert utils._parse_batched_feedbacks(text, 3) == ['好。评分：9/10', '不错。评分：7/10', None]
+
+
+def test_stream_generate_skips_failed_provider_and_caches(monkeypatch):
+    """流式生成：开流前失败的提供方被跳过，完整文本写入缓存供下次直接返回"""
+    from app import llm_cache
+    monkeypatch.setenv('LLM_CACHE_ENABLED', '1')
+    monkeypatch.delenv('LLM_CACHE_DB', raising=False)
+    llm_cache.reset_cache()
+
+    def broken(prompt, max_tokens):
+        raise RuntimeError('connect failed')
+        yield  # pragma: no cover
+
+    def working(prompt, max_tokens):
+        yield '第一题\n'
+        yield '第二题'
+
+    monkeypatch.setattr(utils, '_PROVIDER_STREAMS', {'gemini': broken, 'deepseek': working})
+    assert list(utils.stream_generate('stream-p', 50)) == ['第一题\n', '第二题']
+
+    monkeypatch.setattr(utils, '_PROVIDER_STREAMS', {'gemini': broken, 'deepseek': broken})
+    assert list(utils.stream_generate('stream-p', 50)) == ['第一题\n第二题']
+    llm_cache.reset_cache()
+
+
+def test_cold_call_counts_one_cache_miss(monkeypatch):
+    """多提供方链路：一次未命中的调用只计一次 miss，再次调用计一次命中"""
+    from app import llm_cache
+    monkeypatch.setenv('LLM_CACHE_ENABLED', '1')
+    monkeypatch.delenv('LLM_CACHE_DB', raising=False)
+    monkeypatch.setenv('LLM_HEDGE_DELAY', '0')
+    llm_cache.reset_cache()
+    outputs = {'gemini': None, 'deepseek': None, 'hf': 'ok'}
+
+    def make(name):
+        @llm_cache.cached(name, lambda: f'{name}-model')
+        def generate(prompt, max_tokens=800):
+            return outputs[name]
+        return lambda prompt, max_tokens, cache_ttl=None: generate(prompt, max_tokens=max_tokens, cache_ttl=cache_ttl,
+                                                                    cache_checked=True)
+
+    monkeypatch.setattr(utils, '_PROVIDER_CALLS', {name: make(name) for name in outputs})
+    monkeypatch.setattr(utils, '_PROVIDER_MODELS', {name: (lambda n=name: f'{n}-model') for name in outputs})
+    for mode in ('sequential', 'race'):
+        monkeypatch.setenv('LLM_DISPATCH_MODE', mode)
+        llm_cache.get_cache().clear()
+        assert utils._generate_first_valid(f'cold-{mode}', 10, lambda t: t) == 'ok'
+        stats = llm_cache.stats()
+        assert (stats['misses'], stats['memory_hits'], stats['stores']) == (1, 0, 1), mode
+        assert utils._generate_first_valid(f'cold-{mode}', 10, lambda t: t) == 'ok'
+        assert llm_cache.stats()['memory_hits'] == 1
+        assert llm_cache.stats()['hit_rate'] == 0.5
+    llm_cache.reset_cache()
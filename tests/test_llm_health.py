@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 提供方熔断器测试
+"""
+
+import time
+
+import pytest
+import requests
+
+from app import create_app, db, llm_client, llm_health
+from app.config import Config
+from app.models import User
+
+
+def test_breaker_opens_after_threshold_and_probes():
+    """连续失败达到阈值后打开；冷却后半开只放行一个探测，成功后关闭"""
+    breaker = llm_health.CircuitBreaker(threshold=2, cooldown=0.05, probe_timeout=10)
+    assert breaker.allow_request('gemini')
+    breaker.record_failure('gemini', 'timeout')
+    assert breaker.allow_request('gemini')
+    breaker.record_failure('gemini', 'timeout')
+    assert not breaker.allow_request('gemini')
+
+    time.sleep(0.06)
+    assert breaker.allow_request('gemini')
+    assert not breaker.allow_request('gemini')
+    breaker.record_success('gemini')
+    assert breaker.states()['gemini']['state'] == llm_health.CLOSED
+    assert breaker.allow_request('gemini')
+
+
+def test_failed_probe_reopens():
+    """半开探测失败立即重新打开"""
+    breaker = llm_health.CircuitBreaker(threshold=1, cooldown=0.05)
+    breaker.record_failure('deepseek', 'HTTP 503')
+    time.sleep(0.06)
+    assert breaker.allow_request('deepseek')
+    breaker.record_failure('deepseek', 'HTTP 503')
+    assert breaker.states()['deepseek']['state'] == llm_health.OPEN
+    assert not breaker.allow_request('deepseek')
+
+
+def test_sqlite_state_shared_between_workers(tmp_path):
+    """SQLite 存储：一个 worker 打开的熔断器对另一个 worker 可见"""
+    db_path = str(tmp_path / 'llm_health.db')
+    worker_a = llm_health.CircuitBreaker(llm_health._SQLiteStore(db_path), threshold=1, cooldown=60)
+    worker_b = llm_health.CircuitBreaker(llm_health._SQLiteStore(db_path), threshold=1, cooldown=60)
+    worker_a.record_failure('hf', 'ConnectTimeout')
+    assert not worker_b.allow_request('hf')
+    assert worker_b.states()['hf']['last_error'] == 'ConnectTimeout'
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setenv('LLM_BREAKER_ENABLED', '1')
+    monkeypatch.delenv('LLM_HEALTH_DB', raising=False)
+    monkeypatch.setenv('LLM_BREAKER_THRESHOLD', '1')
+    monkeypatch.setenv('LLM_BREAKER_COOLDOWN', '0.05')
+    llm_health.reset_breaker()
+    yield llm_health.get_breaker()
+    llm_health.reset_breaker()
+    llm_client.reset_sessions()
+
+
+def test_last_error_hides_api_key(breaker, monkeypatch):
+    """连接异常信息中的 URL 查询串（Gemini 的 ?key=）不写入熔断状态"""
+    class FailingSession:
+        def post(self, url, **kwargs):
+            raise requests.exceptions.ConnectionError(
+                f"HTTPSConnectionPool(host='x', port=443): Max retries exceeded with url: "
+                f"/v1beta/models/m:generateContent?key={kwargs['params']['key']} (Caused by NewConnectionError)")
+
+    monkeypatch.setattr(llm_client, 'get_session', lambda provider: FailingSession())
+    with pytest.raises(requests.exceptions.ConnectionError):
+        llm_client.post('gemini', 'https://x/v1beta/models/m:generateContent', params={'key': 'SECRET123'})
+    error = llm_health.snapshot()['gemini']['last_error']
+    assert error.startswith('ConnectionError:') and 'generateContent?<redacted>' in error
+    assert 'SECRET123' not in error
+    # 旧版本已写入的记录在读取时同样脱敏
+    breaker.record_failure('hf', 'ConnectionError: https://x/y?key=OLDSECRET&alt=sse')
+    assert 'OLDSECRET' not in llm_health.snapshot()['hf']['last_error']
+
+
+def test_busy_error_releases_half_open_probe(breaker, monkeypatch):
+    """半开探测因等待在途名额超时而未发出时，下一个请求可以立即探测"""
+    monkeypatch.setenv('LLM_MAX_INFLIGHT', '1')
+    monkeypatch.setenv('LLM_INFLIGHT_WAIT', '0.01')
+    llm_client.reset_sessions()
+    breaker.record_failure('deepseek', 'HTTP 503')
+    time.sleep(0.06)
+    semaphore = llm_client._inflight_semaphore()
+    semaphore.acquire()
+    try:
+        with pytest.raises(llm_client.LLMBusyError):
+            llm_client.post('deepseek', 'https://x')
+        with pytest.raises(llm_client.LLMBusyError):
+            list(llm_client.iter_sse('deepseek', 'https://x'))
+    finally:
+        semaphore.release()
+    assert breaker.states()['deepseek']['state'] == llm_health.HALF_OPEN
+    assert breaker.allow_request('deepseek')
+
+
+def test_health_endpoint_requires_hr(tmp_path, monkeypatch):
+    """/health/llm 需要 HR 或高管登录"""
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'health.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        users = [User(first_name='u', last_name='x', company_name='c', email=f'{i}@example.com', phone_number='0',
+                      birthday='2000-01-01', password='x', is_hr=is_hr) for i, is_hr in enumerate([False, True])]
+        db.session.add_all(users)
+        db.session.commit()
+        client = app.test_client()
+        assert client.get('/health/llm').status_code == 401
+        for user, status in zip(users, (403, 200)):
+            with client.session_transaction() as sess:
+                sess['user_id'] = user.id
+            assert client.get('/health/llm').status_code == status
+        assert 'providers' in client.get('/health/llm').get_json()
+        db.session.remove()
+
+
+def test_stream_closed_early_still_closes_breaker(breaker, monkeypatch):
+    """流式调用：2xx 即计为成功，调用方读到 [DONE] 后提前退出也能关闭半开熔断器"""
+    class FakeResponse:
+        status_code = 200
+        encoding = None
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_lines(self, decode_unicode=False):
+            yield 'data: {"text": "hi"}'
+            yield 'data: [DONE]'
+            yield 'data: unreachable'
+
+    class FakeSession:
+        def post(self, url, **kwargs):
+            return FakeResponse()
+
+    monkeypatch.setattr(llm_client, 'get_session', lambda provider: FakeSession())
+    breaker.record_failure('deepseek', 'HTTP 503')
+    time.sleep(0.06)
+    for data in llm_client.iter_sse('deepseek', 'https://x/chat/completions'):
+        if data == '[DONE]':
+            break
+    assert llm_health.snapshot()['deepseek']['state'] == llm_health.CLOSED
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常用查询的执行计划测试：每个热点查询都应通过组合索引定位（EXPLAIN QUERY PLAN 中为 SEARCH 而非全表扫描），
+带排序的查询不应再额外排序；以及 add_query_indexes.py 为旧库补建索引
+"""
+
+import pytest
+from sqlalchemy import inspect
+
+from app import create_app, db
+from app.config import Config
+from app.models import User, Job, Application, Feedback, FeedbackNotification, TaskEvaluation
+
+# (查询, 期望使用的索引, 是否要求由索引直接给出排序)，查询条件与各模块中的写法一致
+HOT_QUERIES = [
+    (lambda: Application.query.filter_by(user_id=1, is_active=True).order_by(Application.timestamp.desc()),
+     'ix_application_user_active_time', True),
+    (lambda: Application.query.filter_by(user_id=1, is_active=True), 'ix_application_user_active_time', False),
+    (lambda: Application.query.filter_by(job_id=1), 'ix_application_job_status', False),
+    (lambda: Application.query.filter_by(job_id=1, status='Pending'), 'ix_application_job_status', False),
+    (lambda: Job.query.filter_by(user_id=1).order_by(Job.date_posted.desc()).limit(5), 'ix_job_user_date_posted', True),
+    (lambda: Feedback.query.filter_by(sender_id=1).order_by(Feedback.created_at.desc()).limit(5),
+     'ix_feedback_sender_created', True),
+    (lambda: Feedback.query.filter_by(recipient_id=1), 'ix_feedback_recipient_status', False),
+    (lambda: Feedback.query.filter_by(recipient_id=1, status='sent'), 'ix_feedback_recipient_status', False),
+    (lambda: FeedbackNotification.query.filter_by(user_id=1, is_read=False)
+     .order_by(FeedbackNotification.created_at.desc()).limit(5), 'ix_feedback_notification_user_read_created', True),
+    (lambda: TaskEvaluation.query.filter_by(evaluator_id=1).order_by(TaskEvaluation.created_at.desc()),
+     'ix_task_evaluation_evaluator_created', True),
+    (lambda: TaskEvaluation.query.filter_by(employee_id=1).order_by(TaskEvaluation.created_at.desc()),
+     'ix_task_evaluation_employee_created', True),
+    (lambda: User.query.filter_by(user_type='employee'), 'ix_user_user_type', False),
+    (lambda: User.query.filter(User.supervisor_id == 1, User.user_type == 'employee'), 'ix_user_supervisor_type', False),
+]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'indexes.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _plan(query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+@pytest.mark.parametrize('make_query, index_name, ordered', HOT_QUERIES)
+def test_hot_query_uses_index(app, make_query, index_name, ordered):
+    """热点查询不退化为全表扫描"""
+    query = make_query()
+    table = query.column_descriptions[0]['entity'].__table__.name
+    plan = _plan(query)
+    scans = [detail for detail in plan if detail.startswith(f'SCAN {table}')]
+    assert not scans, f'{table} 全表扫描: {plan}'
+    assert any(detail.startswith(f'SEARCH {table} USING') and f'INDEX {index_name} ' in detail
+               for detail in plan), plan
+    if ordered:
+        assert not any('TEMP B-TREE' in detail for detail in plan), plan
+
+
+def test_migration_adds_missing_indexes(app):
+    """旧库（只有表没有索引）执行迁移后补齐全部索引，重复执行无副作用"""
+    from add_query_indexes import add_query_indexes, MODELS
+
+    expected = {model.__table__.name: {index.name for index in model.__table__.indexes} for model in MODELS}
+    for names in expected.values():
+        for name in names:
+            db.session.execute(db.text(f'DROP INDEX {name}'))
+    db.session.commit()
+    assert all(not names & {index['name'] for index in inspect(db.engine).get_indexes(table)}
+               for table, names in expected.items())
+
+    assert add_query_indexes()
+    assert add_query_indexes()
+    for table, names in expected.items():
+        assert names <= {index['name'] for index in inspect(db.engine).get_indexes(table)}
+    # 迁移后执行了 ANALYZE，查询规划仍应走索引
+    for make_query, _, _ in HOT_QUERIES:
+        assert not any(detail.startswith('SCAN') for detail in _plan(make_query()))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推荐缓存测试：命中与统计、职位变化/用户资料变化时失效、新职位提升窗口决定到期时间
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.job_skills import save_job_skills
+from app.models import User, Job
+from smartrecruit_system.candidate_module import jobs as jobs_module
+from smartrecruit_system.candidate_module import recommendation_cache, recommendation_engine
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'rec_cache.db'}")
+    monkeypatch.setattr(jobs_module, 'get_semantic_job_candidates', lambda user: {})
+    recommendation_engine.reset_engine()
+    recommendation_cache.reset_cache()
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    recommendation_engine.reset_engine()
+    recommendation_cache.reset_cache()
+
+
+def _setup(posted_ago=timedelta(days=30)):
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    user = User(first_name='u', last_name='x', company_name='c', email='u@example.com', phone_number='0',
+                birthday='2000-01-01', password='x', skills=json.dumps(['Python开发']))
+    db.session.add_all([hr, user])
+    db.session.flush()
+    for i, text in enumerate(['Python 开发', 'Java 开发']):
+        job = Job(title=f'job{i}', location='北京', description=text, salary='10k', user_id=hr.id,
+                  date_posted=datetime.utcnow() - posted_ago)
+        db.session.add(job)
+        db.session.flush()
+        save_job_skills(job)
+    db.session.commit()
+    return hr, user
+
+
+def _publish(hr, text):
+    job = Job(title='new', location='北京', description=text, salary='10k', user_id=hr.id,
+              date_posted=datetime.utcnow() - timedelta(days=30))
+    db.session.add(job)
+    db.session.flush()
+    save_job_skills(job)
+    db.session.commit()
+    return job
+
+
+def test_cache_hit_and_job_invalidation(app, monkeypatch):
+    """第二次请求命中缓存；发布职位后失效"""
+    hr, user = _setup()
+    first = jobs_module.get_job_recommendations(user)
+    calls = []
+    original = recommendation_engine.JobFeatures.recommend
+    monkeypatch.setattr(recommendation_engine.JobFeatures, 'recommend',
+                        lambda self, *a, **kw: calls.append(1) or original(self, *a, **kw))
+    assert jobs_module.get_job_recommendations(user) == first
+    assert calls == []
+    stats = recommendation_cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['hit_rate'] == 0.5
+
+    job = _publish(hr, 'Python 开发')
+    recommendation_engine.mark_jobs_changed()
+    assert job.id in {rec['job'].id for rec in jobs_module.get_job_recommendations(user)}
+    assert calls == [1]
+
+
+def test_user_changes_miss_cache(app):
+    """用户技能变化（指纹不同）或显式失效后重新打分"""
+    _, user = _setup()
+    jobs_module.get_job_recommendations(user)
+    user.skills = json.dumps(['Java 后端'])
+    db.session.commit()
+    assert recommendation_cache.get_cache().get(user.id, (recommendation_cache.user_fingerprint(user), 1)) is None
+    jobs_module.get_job_recommendations(user)
+    assert recommendation_cache.stats()['entries'] == 1
+    recommendation_cache.invalidate_user(user.id)
+    assert recommendation_cache.stats()['entries'] == 0
+    assert recommendation_cache.stats()['invalidations'] == 1
+
+
+def test_embedding_written_elsewhere_misses_cache(app, monkeypatch):
+    """其它进程（任务 worker）写入简历向量后不再命中旧缓存，无需本进程显式失效"""
+    from app.models import CandidateEmbedding
+    _, user = _setup()
+    jobs_module.get_job_recommendations(user)
+    key = (recommendation_cache.user_fingerprint(user), recommendation_engine.get_engine().features().version)
+    assert recommendation_cache.get_cache().get(user.id, key) is not None
+
+    db.session.add(CandidateEmbedding(user_id=user.id, model='m', dim=1, vector=b'\0' * 4, text_hash='a' * 64))
+    db.session.commit()
+    assert recommendation_cache.user_fingerprint(user) != key[0]
+    assert recommendation_cache.user_fingerprint(user) == recommendation_cache.user_fingerprint(
+        user, recommendation_cache.embedding_states([user.id]).get(user.id))
+    calls = []
+    live = jobs_module.rank_jobs
+    monkeypatch.setattr(jobs_module, 'rank_jobs', lambda *a: calls.append(1) or live(*a))
+    jobs_module.get_job_recommendations(user)
+    assert calls == [1]
+
+def test_expiry_follows_fresh_job_window(app, monkeypatch):
+    """最近的「新职位」将在 1 小时后离开 7 天窗口，缓存在那之前到期"""
+    monkeypatch.setenv('RECOMMENDATION_CACHE_TTL', '86400')
+    _, user = _setup(posted_ago=timedelta(days=8) - timedelta(hours=1))
+    jobs_module.get_job_recommendations(user)
+    _, expires_at, _ = recommendation_cache.get_cache()._entries[user.id]
+    assert abs(expires_at - (time.time() + 3600)) < 60
+    assert abs(jobs_module.get_fresh_boost_deadline() - expires_at) < 60
+
+
+def test_health_endpoint_reports_stats(app):
+    """/health/recommendations 返回命中率"""
+    response = app.test_client().get('/health/recommendations')
+    assert response.status_code == 200
+    assert 'hit_rate' in response.get_json()['cache']
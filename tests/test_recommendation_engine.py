@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+向量化推荐打分测试：对随机生成的职位与用户，分数与逐职位函数逐项完全相同，推荐列表（含同分顺序）一致
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.job_skills import save_job_skills
+from app.models import User, Job
+from smartrecruit_system.candidate_module import jobs as jobs_module
+from smartrecruit_system.candidate_module import recommendation_engine
+from smartrecruit_system.candidate_module.recommendation_config import SKILL_CATEGORIES, CHINESE_SKILLS
+
+VOCAB = [s for skills in list(SKILL_CATEGORIES.values()) + list(CHINESE_SKILLS.values()) for s in skills]
+COMPANIES = ['星辰科技', '华信银行', '远航咨询', '东方制造', '北辰教育', '未知公司', '']
+LEVELS = ['初级', '中级', '高级', 'Senior', '专家', '不限', '', None]
+POSITIONS = ['高级工程师', '初级开发', '产品经理', 'Architect', '', None]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'rec.db'}")
+    recommendation_engine.reset_engine()
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    recommendation_engine.reset_engine()
+
+
+def _populate(rng, n_jobs=80, n_users=12):
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    now = datetime.utcnow()
+    jobs = []
+    for i in range(n_jobs):
+        words = rng.sample(VOCAB, rng.randrange(0, 8))
+        # 发布时间距离 7 天边界至少半天，避免两次取当前时间之间跨过边界
+        posted = now - timedelta(days=rng.randrange(0, 20), hours=6 + rng.randrange(12))
+        job = Job(title=f'job{i}', company_name=rng.choice(COMPANIES), location='北京',
+                  description='，'.join(words) or '负责接待来访客人', salary='10k', user_id=hr.id,
+                  experience_level=rng.choice(LEVELS), date_posted=posted)
+        db.session.add(job)
+        db.session.flush()
+        save_job_skills(job)
+        jobs.append(job)
+    users = []
+    for i in range(n_users):
+        skills = rng.sample(VOCAB, rng.randrange(0, 6)) + rng.sample(['Python开发', '数据分析师', 'Java 后端', '市场营销经理'], 2)
+        user = User(first_name='u', last_name=str(i), company_name=rng.choice(COMPANIES), email=f'u{i}@example.com',
+                    phone_number='0', birthday='2000-01-01', password='x', position=rng.choice(POSITIONS),
+                    skills=json.dumps(skills, ensure_ascii=False) if rng.random() < 0.8 else None)
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+    return jobs, users
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_scores_identical_to_per_job_functions(app, seed):
+    """每个 (用户, 职位) 的分数与 calculate_job_match + apply_optimization_factors 完全相同"""
+    rng = random.Random(seed)
+    jobs, users = _populate(rng)
+    features = recommendation_engine.get_engine().features()
+    keywords = jobs_module.get_job_keywords_map(jobs)
+    for user in users:
+        rows, scores = features.scores(user)
+        expected = {job.id: jobs_module.apply_optimization_factors(
+            user, job, jobs_module.calculate_job_match(user, job, keywords[job.id]), keywords[job.id])
+            for job in jobs}
+        assert {int(features.ids[r]): s for r, s in zip(rows, scores.tolist())} == expected
+
+        semantic = {job.id: rng.uniform(-0.2, 1.0) for job in rng.sample(jobs, 30)}
+        for semantic_scores in ({}, semantic):
+            legacy = [(rec['job'].id, rec['match_score'])
+                      for rec in jobs_module.score_job_recommendations(user, semantic_scores)]
+            vectorized = features.recommend(user, semantic_scores)
+            assert vectorized == legacy
+            assert [type(s) for _, s in vectorized] == [type(s) for _, s in legacy]
+
+
+def test_get_job_recommendations_refreshes_after_publish(app, monkeypatch):
+    """推荐走向量化路径；职位变化后标记过期即重新构建"""
+    jobs, users = _populate(random.Random(7), n_jobs=20, n_users=1)
+    monkeypatch.setattr(jobs_module, 'get_semantic_job_candidates', lambda user: {})
+    user = users[0]
+    user.skills = json.dumps(['Python开发'])
+    db.session.commit()
+    before = {rec['job'].id for rec in jobs_module.get_job_recommendations(user)}
+
+    job = Job(title='new', company_name='c', location='北京', description='Python 开发', salary='10k',
+              user_id=jobs[0].user_id, experience_level='中级')
+    db.session.add(job)
+    db.session.flush()
+    save_job_skills(job)
+    db.session.commit()
+    recommendation_engine.mark_jobs_changed()
+    after = jobs_module.get_job_recommendations(user)
+    assert job.id in {rec['job'].id for rec in after} - before
+    assert after == [{'job': Job.query.get(i), 'match_score': s}
+                     for i, s in recommendation_engine.get_engine().recommend(user)]
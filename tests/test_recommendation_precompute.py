@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线推荐测试：批量结果与实时打分一致、增量重算、在线优先读取离线结果
+"""
+
+import json
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.job_skills import save_job_skills
+from app.models import User, Job, JobRecommendation
+from smartrecruit_system.candidate_module import jobs as jobs_module
+from smartrecruit_system.candidate_module import recommendation_cache, recommendation_engine
+from smartrecruit_system.candidate_module.recommendation_precompute import precompute_recommendations
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'precompute.db'}")
+    monkeypatch.setattr(jobs_module, 'get_semantic_job_candidates', lambda user: {})
+    recommendation_engine.reset_engine()
+    recommendation_cache.reset_cache()
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    recommendation_engine.reset_engine()
+    recommendation_cache.reset_cache()
+
+
+def _user(email, skills, **kwargs):
+    user = User(first_name='u', last_name='x', company_name='c', email=email, phone_number='0',
+                birthday='2000-01-01', password='x', skills=json.dumps(skills, ensure_ascii=False), **kwargs)
+    db.session.add(user)
+    return user
+
+
+def _job(hr, text):
+    job = Job(title=text, location='北京', description=text, salary='10k', user_id=hr.id)
+    db.session.add(job)
+    db.session.flush()
+    save_job_skills(job)
+    return job
+
+
+def _setup():
+    hr = _user('hr@example.com', [], is_hr=True)
+    db.session.flush()
+    for text in ['Python 开发', 'Java 开发', '数据分析', '负责接待来访客人']:
+        _job(hr, text)
+    users = [_user(f'u{i}@example.com', skills) for i, skills in
+             enumerate([['Python开发'], ['Java 后端', '数据分析师'], ['摄影']])]
+    db.session.commit()
+    return hr, users
+
+
+def _stored(user_id):
+    rows = JobRecommendation.query.filter_by(user_id=user_id).order_by(JobRecommendation.rank).all()
+    return [(row.job_id, row.score) for row in rows if row.job_id is not None]
+
+
+def test_incremental_precompute(app):
+    """首次全部计算；再次运行全部跳过；资料或职位变化后只重算受影响的用户"""
+    hr, users = _setup()
+    stats = precompute_recommendations(chunk_size=2)
+    assert stats['candidates'] == 3 and stats['computed'] == 3 and stats['users_per_sec'] > 0
+    features = recommendation_engine.get_engine().features()
+    for user in users:
+        assert _stored(user.id) == jobs_module.rank_jobs(user, features)
+    assert JobRecommendation.query.filter_by(user_id=hr.id).count() == 0
+
+    assert precompute_recommendations()['computed'] == 0
+    users[2].skills = json.dumps(['Python开发'])
+    db.session.commit()
+    assert precompute_recommendations()['computed'] == 1
+
+    _job(hr, 'Python 后端')
+    db.session.commit()
+    assert precompute_recommendations()['computed'] == 3
+
+    # 其它进程只修改职位字段（行数、ID、发布时间都不变，也不会调用本进程的 mark_jobs_changed）
+    features = recommendation_engine.get_engine().features()
+    job = Job.query.filter_by(title='Java 开发').one()
+    updated_at = job.updated_at
+    job.experience_level = '高级'
+    db.session.commit()
+    assert job.updated_at > updated_at
+    assert precompute_recommendations()['computed'] == 3
+    assert recommendation_engine.get_engine().features().version == features.version + 1
+    for user in users:
+        assert _stored(user.id) == jobs_module.rank_jobs(user, recommendation_engine.get_engine().features())
+
+
+def test_online_reads_precomputed_until_profile_changes(app, monkeypatch):
+    """资料未变化时直接读取离线结果，变化后回退到实时打分"""
+    hr, users = _setup()
+    precompute_recommendations()
+    user = users[0]
+    expected = _stored(user.id)
+    assert expected
+
+    live = jobs_module.rank_jobs
+    calls = []
+    monkeypatch.setattr(jobs_module, 'rank_jobs', lambda *a: calls.append(1) or live(*a))
+    assert [(rec['job'].id, rec['match_score']) for rec in jobs_module.get_job_recommendations(user)] == expected
+    assert calls == []
+
+    user.skills = json.dumps(['Java 后端'])
+    db.session.commit()
+    assert jobs_module.load_precomputed_recommendations(user) is None
+    jobs_module.get_job_recommendations(user)
+    assert calls == [1]
+
+
+def test_precomputed_ignored_after_jobs_change_or_expiry(app):
+    """职位表变化或新职位提升窗口已过（expires_at）后，离线结果不再使用"""
+    from datetime import datetime, timedelta
+    hr, users = _setup()
+    precompute_recommendations()
+    user = users[0]
+    assert jobs_module.load_precomputed_recommendations(user) == _stored(user.id)
+
+    JobRecommendation.query.filter_by(user_id=user.id).update({'expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+    assert jobs_module.load_precomputed_recommendations(user) is None
+
+    precompute_recommendations()
+    assert jobs_module.load_precomputed_recommendations(user) == _stored(user.id)
+    _job(hr, 'Python 后端')
+    db.session.commit()
+    assert jobs_module.load_precomputed_recommendations(user) is None
+    recommendation_engine.mark_jobs_changed()  # 发布接口会调用，使本进程的职位特征立即重建
+    ranked = [(rec['job'].id, rec['match_score']) for rec in jobs_module.get_job_recommendations(user)]
+    assert ranked == jobs_module.rank_jobs(user, recommendation_engine.get_engine().features())
+    assert any(job_id == Job.query.filter_by(title='Python 后端').one().id for job_id, _ in ranked)
+
+
+def test_embedding_change_recomputes_user(app):
+    """简历向量写入后（如 worker 进程完成简历处理），该用户的离线结果作废并在下次运行时重算"""
+    from app.models import CandidateEmbedding
+    hr, users = _setup()
+    precompute_recommendations()
+    db.session.add(CandidateEmbedding(user_id=users[1].id, model='m', dim=1, vector=b'\0' * 4, text_hash='a' * 64))
+    db.session.commit()
+    assert jobs_module.load_precomputed_recommendations(users[1]) is None
+    assert jobs_module.load_precomputed_recommendations(users[0]) is not None
+    assert precompute_recommendations()['computed'] == 1
+    assert jobs_module.load_precomputed_recommendations(users[1]) == _stored(users[1].id)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+简历二进制存储测试：按内容去重、加载用户时不读取简历、孤立数据清理
+"""
+
+import pytest
+from sqlalchemy import inspect
+
+from app import create_app, db, utils
+from app.config import Config
+from app.models import User, ResumeBlob
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'blob.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _user(i, cv=None):
+    user = User(first_name=f'u{i}', last_name='t', company_name='-', email=f'u{i}@example.com',
+                phone_number='0', birthday='2000-01-01', password='x', cv_file='cv.pdf')
+    user.cv_data = cv
+    db.session.add(user)
+    return user
+
+
+def test_cv_data_is_deduplicated_and_loaded_on_demand(app):
+    """相同简历只存一份；User.query.get 不加载简历二进制"""
+    a = _user(1, b'same-pdf')
+    _user(2, b'same-pdf')
+    db.session.commit()
+    assert ResumeBlob.query.count() == 1
+
+    user_id = a.id
+    db.session.remove()
+    user = User.query.get(user_id)
+    state = inspect(user)
+    assert 'cv_blob' in state.unloaded and 'legacy_cv_data' in state.unloaded
+    assert user.cv_data == b'same-pdf'
+
+
+def test_legacy_column_fallback_and_orphan_purge(app):
+    """未迁移的旧数据仍可读取；删除简历后孤立二进制可被清理"""
+    user = _user(1)
+    db.session.flush()
+    db.session.execute(db.text("UPDATE user SET cv_data = :d WHERE id = :id"), {'d': b'old', 'id': user.id})
+    db.session.commit()
+    user_id = user.id
+    db.session.remove()
+    user = User.query.get(user_id)
+    assert user.cv_data == b'old'
+
+    user.cv_data = b'new'
+    db.session.commit()
+    user.cv_data = None
+    db.session.commit()
+    assert user.cv_sha256 is None and user.cv_data is None
+    assert ResumeBlob.purge_orphans() == 1
+
+
+def test_user_resume_text_uses_hash_without_loading_blob(app, monkeypatch):
+    """已缓存文本时，按 cv_sha256 直接读取，不加载简历二进制"""
+    monkeypatch.setattr(utils, '_extract_resume_uncached', lambda data, name: ('简历文本', 1))
+    user = _user(1, b'pdf-bytes')
+    db.session.commit()
+    assert utils.get_user_resume_text(user) == '简历文本'
+
+    user_id = user.id
+    db.session.remove()
+    monkeypatch.setattr(utils, '_extract_resume_uncached', lambda data, name: pytest.fail('should hit cache'))
+    user = User.query.get(user_id)
+    assert utils.get_user_resume_text(user) == '简历文本'
+    assert 'cv_blob' in inspect(user).unloaded
+
+
+def test_cv_data_readable_before_flush(app):
+    """刚赋值、尚未 flush 的简历即可读取（cv_sha256 此时仍为空）"""
+    user = _user(1, b'fresh')
+    assert user.cv_sha256 is None
+    assert user.cv_data == b'fresh' and user.has_cv
+
+
+def test_interview_uses_legacy_resume(app, monkeypatch):
+    """未迁移（仅旧 cv_data 列有数据）的用户开始面试时仍使用简历文本"""
+    from app.models import Job
+    from smartrecruit_system.candidate_module import interview
+    user = _user(1)
+    db.session.flush()
+    db.session.execute(db.text("UPDATE user SET cv_data = :d WHERE id = :id"), {'d': b'old', 'id': user.id})
+    job = Job(title='后端', location='北京', description='Python', salary='10k', user_id=user.id)
+    db.session.add(job)
+    db.session.commit()
+    user_id, job_id = user.id, job.id
+    db.session.remove()
+    assert User.query.get(user_id).has_cv
+    assert not _user(2).has_cv
+
+    monkeypatch.setattr(utils, '_extract_resume_uncached', lambda data, name: (f'简历:{data.decode()}', 1))
+    seen = []
+    monkeypatch.setattr(interview, 'generate_interview_questions', lambda cv, jd: seen.append(cv) or ['q1'])
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+    resp = client.post(f'/smartrecruit/candidate/interview/start/{job_id}')
+    assert resp.get_json()['success']
+    assert seen == ['简历:old']
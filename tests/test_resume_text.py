@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+简历文本缓存测试：同一文件只提取一次，提取器版本变化后重新提取
+"""
+
+import pytest
+
+from app import create_app, db, utils
+from app.config import Config
+from app.models import ResumeText
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'resume.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def test_resume_text_extracted_once_per_content(app, monkeypatch):
+    """相同内容的简历命中缓存，不同内容或版本变化时重新提取"""
+    calls = []
+
+    def fake_extract(file_bytes, filename):
+        calls.append(file_bytes)
+        return f'text:{file_bytes.decode()}', 2
+
+    monkeypatch.setattr(utils, '_extract_resume_uncached', fake_extract)
+    assert utils.extract_text_from_resume(b'cv-a', 'a.pdf') == 'text:cv-a'
+    assert utils.extract_text_from_resume(b'cv-a', 'renamed.pdf') == 'text:cv-a'
+    assert calls == [b'cv-a']
+
+    row = ResumeText.query.one()
+    assert row.page_count == 2
+    assert row.extractor_version == utils.resume_extractor_version()
+
+    utils.extract_text_from_resume(b'cv-b', 'b.pdf')
+    assert calls == [b'cv-a', b'cv-b']
+
+    monkeypatch.setattr(utils, 'RESUME_EXTRACTOR_VERSION', 'next')
+    utils.extract_text_from_resume(b'cv-a', 'a.pdf')
+    assert calls == [b'cv-a', b'cv-b', b'cv-a']
+    assert ResumeText.query.count() == 2
+
+
+def test_extraction_failure_is_not_cached(app, monkeypatch):
+    """提取异常返回空文本且不写入缓存，下次仍会重试"""
+    def broken(file_bytes, filename):
+        raise ValueError('bad pdf')
+
+    monkeypatch.setattr(utils, '_extract_resume_uncached', broken)
+    assert utils.extract_text_from_resume(b'cv-x', 'x.pdf') == ''
+    assert ResumeText.query.count() == 0
+
+
+def test_unsupported_extension_is_not_cached(app, monkeypatch):
+    """不支持的格式不提取也不缓存，相同内容之后以 DOCX 上传时正常提取"""
+    calls = []
+
+    def fake_extract(file_bytes, filename):
+        calls.append(filename)
+        return {'pages': [' 简历正文 '], 'page_count': 1}
+
+    monkeypatch.setattr(utils.extraction, 'extract', fake_extract)
+    assert utils.extract_text_from_resume(b'cv-same', 'photo.png') == ''
+    assert ResumeText.query.count() == 0
+    assert utils.extract_text_from_resume(b'cv-same', 'cv.docx') == '简历正文'
+    assert utils.extract_text_from_resume(b'cv-same', 'photo.png') == ''
+    assert calls == ['cv.docx']
+    assert ResumeText.query.one().text == '简历正文'
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+薪资文本解析与薪资区间筛选测试
+"""
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.models import User, Job
+from app.salary import parse_salary
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('15k-25k', (15000, 25000, 'month')),
+    ('15-25K·14薪', (15000, 25000, 'month')),
+    ('1.5万/月', (15000, 15000, 'month')),
+    ('1-1.5万', (10000, 15000, 'month')),
+    ('8000~12000元/月', (8000, 12000, 'month')),
+    ('12000.00', (12000, 12000, 'month')),
+    ('8-10', (8000, 10000, 'month')),
+    ('30-50万/年', (25000, 41667, 'year')),
+    ('年薪 24万', (20000, 20000, 'year')),
+    ('200元/天', (4350, 4350, 'day')),
+    ('50/小时', (8700, 8700, 'hour')),
+    ('20k以上', (20000, 20000, 'month')),
+    ('25k-15k', (15000, 25000, 'month')),
+    ('10,000 - 20,000 per month', (10000, 20000, 'month')),
+    # 周期以紧跟数字的写法或「月薪」等为准，其它位置的「年」不算
+    ('15k/月，年终奖', (15000, 15000, 'month')),
+    ('10-15k 月薪，年底双薪', (10000, 15000, 'month')),
+    ('8000-12000元/月（一年调薪两次）', (8000, 12000, 'month')),
+    ('1.5万每月', (15000, 15000, 'month')),
+    ('2-3年经验 15k', (15000, 15000, 'month')),
+    ('经验3年以上，20-30k', (20000, 30000, 'month')),
+    ('面议', (None, None, None)),
+    ('', (None, None, None)),
+    (None, (None, None, None)),
+])
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'salary.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def test_salary_filter_uses_parsed_range(app):
+    """发布时写入结构化薪资，搜索接口按区间交集筛选"""
+    hr = User(first_name='hr', last_name='x', company_name='c', email='hr@example.com',
+              phone_number='0', birthday='2000-01-01', password='x', is_hr=True)
+    db.session.add(hr)
+    db.session.flush()
+    for title, salary in [('a', '8k-12k'), ('b', '15k-25k'), ('c', '30-50万/年'), ('d', '面议')]:
+        db.session.add(Job(title=title, location='北京', description='x', salary=salary, user_id=hr.id))
+    db.session.commit()
+    job = Job.query.filter_by(title='a').one()
+    job.salary = '2万/月'
+    db.session.commit()
+    assert (job.salary_min, job.salary_max, job.salary_period) == (20000, 20000, 'month')
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = hr.id
+
+    def titles(**params):
+        data = client.get('/smartrecruit/candidate/jobs/api/search_jobs', query_string=params).get_json()
+        return sorted(job['title'] for job in data['jobs'])
+
+    assert titles(salary_min=20000) == ['a', 'b', 'c']
+    assert titles(salary_min=26000) == ['c']
+    assert titles(salary_max=16000) == ['b']
+    assert titles(salary_min=16000, salary_max=22000) == ['a', 'b']
+    assert titles() == ['a', 'b', 'c', 'd']
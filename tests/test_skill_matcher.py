@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+技能匹配自动机测试：与逐词子串扫描一致、英文短词的词边界、分类信息与各提取函数的接入
+"""
+
+import random
+
+import pytest
+
+from app import create_app, skill_matcher
+from app.skill_matcher import SkillMatcher, get_matcher, extract_skills, RECRUIT, LEARNING, PROFILE
+
+
+BACKENDS = ['python'] + (['pyahocorasick'] if skill_matcher.ahocorasick is not None else [])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_matches_naive_scan_on_random_text(backend):
+    """自动机结果与逐个模式做子串+边界检查的朴素实现一致（含重叠、共享前后缀的模式）"""
+    words = ['he', 'she', 'his', 'hers', 'sql', 'sql server', 'java', 'javascript', '数据', '数据分析', '分析']
+    matcher = SkillMatcher(((w, 't', None) for w in words), backend=backend)
+    assert matcher.backend == backend
+    alphabet = list('hesirsqlvajt /+') + ['数', '据', '分', '析', ' server']
+    rng = random.Random(0)
+
+    def naive(text):
+        found = set()
+        for w in words:
+            start = text.find(w)
+            while start != -1:
+                end = start + len(w)
+                before = text[start - 1] if start else ' '
+                after = text[end] if end < len(text) else ' '
+                ok_left = not (w[0].isascii() and w[0].isalnum() and before.isascii() and before.isalnum())
+                ok_right = not (w[-1].isascii() and w[-1].isalnum() and after.isascii() and after.isalnum())
+                if ok_left and ok_right:
+                    found.add((w, start, end))
+                start = text.find(w, start + 1)
+        return found
+
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        expected = naive(text)
+        assert sorted(m.skill_id for m in matcher.find_all(text)) == sorted(w for w, _, _ in expected)
+        assert set(matcher.extract(text)) == {w for w, _, _ in expected}
+
+
+def test_word_boundaries_for_short_english_tokens():
+    """'r'、'go'、'java' 等英文技能不再命中其他单词的片段，中文技能仍按子串匹配"""
+    create_app()
+    skills = extract_skills('熟悉Docker与Google Cloud，精通JavaScript；会R语言和Go。负责数据分析', RECRUIT)
+    assert 'docker' in skills and 'javascript' in skills and 'r' in skills and 'go' in skills
+    assert 'java' not in skills
+    assert '数据' in skills and '分析' in skills
+    assert 'r' not in extract_skills('worker docker', RECRUIT)
+    assert extract_skills('Experienced with C++ and node.js', RECRUIT) == ['c++', 'node.js']
+
+
+def test_sources_categories_and_callers():
+    """按词典过滤、返回分类；各模块提取函数使用共享自动机"""
+    app = create_app()
+    matcher = get_matcher()
+    categories = matcher.categorize('python 和 项目管理', sources={LEARNING})
+    assert categories['python'] == {(LEARNING, 'technical.programming')}
+    assert categories['项目管理'] == {(LEARNING, 'soft_skills.leadership')}
+    assert extract_skills('Python, SQL Server 与 Docker', PROFILE, labels=True) == ['Python', 'SQL Server', 'Docker']
+
+    with app.app_context():
+        from smartrecruit_system.candidate_module.jobs import extract_job_keywords
+        from talent_management_system.employee_manager_module.learning_recommendation import analyze_job_requirements
+        from talent_management_system.employee_manager_module.smart_goals import extract_skills_from_text
+        assert set(extract_job_keywords('招聘Python后端开发，熟悉Django与MySQL')) >= {'python', 'django', 'mysql', '开发'}
+        assert set(analyze_job_requirements('Need PyTorch and pandas, 团队管理')) == {'pytorch', 'pandas', '团队管理'}
+        assert extract_skills_from_text('python and Go developer') == ['Python', 'Go']
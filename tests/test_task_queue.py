@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务队列测试：领取、重试退避、最大次数与 worker 循环
+"""
+
+import time
+
+import pytest
+
+from app import task_queue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setenv('TASK_QUEUE_DB', str(tmp_path / 'tasks.db'))
+    monkeypatch.setenv('TASK_RETRY_BACKOFF', '10')
+    task_queue.reset_queue()
+    yield task_queue.get_queue()
+    task_queue.reset_queue()
+
+
+def test_claim_marks_running_and_complete_stores_result(queue):
+    """领取任务后为 running，完成后结果可通过状态视图读取"""
+    job_id = queue.enqueue('demo', {'x': 1}, user_id=7)
+    job = queue.claim('w1')
+    assert job['id'] == job_id and job['status'] == task_queue.RUNNING and job['attempts'] == 1
+    assert queue.claim('w2') is None
+    queue.complete(job_id, {'ok': True})
+    status = task_queue.job_status(queue.get(job_id))
+    assert status['status'] == task_queue.SUCCEEDED
+    assert status['result'] == {'ok': True}
+    assert queue.latest('demo', 7)['id'] == job_id
+
+
+def test_failed_job_retries_with_backoff_then_fails(queue):
+    """失败后按退避时间重新排队，超过最大次数标记为 failed"""
+    job_id = queue.enqueue('demo', {}, max_attempts=2)
+    queue.claim('w1')
+    queue.fail(job_id, 'boom')
+    job = queue.get(job_id)
+    assert job['status'] == task_queue.QUEUED
+    assert job['run_after'] >= time.time() + 9
+    assert queue.claim('w1') is None  # 退避期内不可领取
+
+    with queue._transaction() as conn:
+        conn.execute('UPDATE background_job SET run_after = 0 WHERE id = ?', (job_id,))
+    assert queue.claim('w1')['attempts'] == 2
+    queue.fail(job_id, 'boom again')
+    job = queue.get(job_id)
+    assert job['status'] == task_queue.FAILED
+    assert job['last_error'] == 'boom again'
+
+
+def test_stale_running_job_is_reclaimed(queue, monkeypatch):
+    """worker 丢失：running 超过可见性超时后可被其他 worker 重新领取"""
+    job_id = queue.enqueue('demo', {})
+    queue.claim('dead-worker')
+    monkeypatch.setenv('TASK_VISIBILITY_TIMEOUT', '0')
+    time.sleep(0.01)
+    job = queue.claim('w2')
+    assert job['id'] == job_id and job['locked_by'] == 'w2'
+
+
+def test_run_worker_once_executes_registered_handler(queue, monkeypatch):
+    """worker 执行已注册的处理函数；处理函数抛错时按重试计数"""
+    seen = []
+    monkeypatch.setitem(task_queue._handlers, 'echo', lambda payload: seen.append(payload) or payload['n'] * 2)
+    monkeypatch.setitem(task_queue._handlers, 'explode', lambda payload: 1 / 0)
+    ok_id = task_queue.enqueue('echo', {'n': 21})
+    bad_id = task_queue.enqueue('explode', {})
+    assert task_queue.run_worker(once=True) == 2
+    assert queue.get(ok_id)['result'] == 42
+    bad = queue.get(bad_id)
+    assert bad['status'] == task_queue.QUEUED and 'ZeroDivisionError' in bad['last_error']
+    assert seen == [{'n': 21}]
+
+
+def test_eager_mode_runs_inline(queue, monkeypatch):
+    """TASK_QUEUE_EAGER=1：enqueue 时同步执行"""
+    monkeypatch.setenv('TASK_QUEUE_EAGER', '1')
+    monkeypatch.setitem(task_queue._handlers, 'echo', lambda payload: payload)
+    job_id = task_queue.enqueue('echo', {'a': 'b'})
+    assert queue.get(job_id)['status'] == task_queue.SUCCEEDED
+    with pytest.raises(task_queue.UnknownTaskError):
+        task_queue.enqueue('missing', {})
+
+
+def test_embedded_worker_thread_runs_queued_jobs(queue, monkeypatch):
+    """进程内 worker 线程：无独立 worker 时也会执行排队的任务；TASK_WORKER_EMBEDDED=0 时不启动"""
+    import threading
+    monkeypatch.setenv('TASK_POLL_INTERVAL', '0.01')
+    monkeypatch.setitem(task_queue._handlers, 'echo', lambda payload: payload['n'])
+    stop = threading.Event()
+    thread = task_queue.start_embedded_worker(None, stop_event=stop)
+    try:
+        job_id = task_queue.enqueue('echo', {'n': 5})
+        deadline = time.time() + 5
+        while queue.get(job_id)['status'] != task_queue.SUCCEEDED and time.time() < deadline:
+            time.sleep(0.01)
+        job = queue.get(job_id)
+        assert job['result'] == 5 and job['locked_by'] is None
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+    monkeypatch.setenv('TASK_WORKER_EMBEDDED', '0')
+    assert task_queue.start_embedded_worker(None) is None
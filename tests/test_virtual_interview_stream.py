@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+虚拟面试 SSE 接口测试：逐题/逐片推送与缓冲降级
+"""
+
+import json
+
+import pytest
+
+from app import create_app, db
+from app.config import Config
+from app.models import User
+from smartrecruit_system.candidate_module import applications
+
+BASE = '/smartrecruit/candidate/applications/api/virtual_interview'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'vi.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(first_name='u', last_name='x', company_name='c', email='u@example.com', phone_number='0',
+                    birthday='2000-01-01', password='x', skills='Python')
+        db.session.add(user)
+        db.session.commit()
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = user.id
+        yield client
+        db.session.remove()
+
+
+def _events(resp):
+    """把 SSE 响应体解析为 [(event, data)]"""
+    events = []
+    for block in resp.get_data(as_text=True).split('\n\n'):
+        if not block.strip():
+            continue
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def _fake_stream(monkeypatch, chunks):
+    def stream(prompt, max_tokens, providers=('gemini', 'deepseek'), cache_ttl=None):
+        yield from chunks
+    monkeypatch.setattr(applications, 'stream_generate', stream)
+
+
+def test_start_stream_pushes_each_question(client, monkeypatch):
+    """开始面试：跨分片的行被拼接，编号/引号被清理，最多推送 5 题"""
+    _fake_stream(monkeypatch, ['1. 介绍一个', '项目\n"如何排查', '慢查询"\n', '\n'.join(f'问题{i}' for i in range(5))])
+    resp = client.get(f'{BASE}/start/stream?job_desc=后端')
+    assert resp.mimetype == 'text/event-stream'
+    events = _events(resp)
+    questions = ['介绍一个项目', '如何排查慢查询', '问题0', '问题1', '问题2']
+    assert events[:-1] == [('question', {'index': i, 'question': q}) for i, q in enumerate(questions)]
+    assert events[-1] == ('done', {'success': True, 'questions': questions})
+
+
+def test_start_stream_falls_back_when_empty(client, monkeypatch):
+    """开始面试：流式无输出时降级到通用生成"""
+    _fake_stream(monkeypatch, [])
+    monkeypatch.setattr(applications, 'generate_interview_questions', lambda cv, jd: ['a', 'b'])
+    events = _events(client.get(f'{BASE}/start/stream'))
+    assert events == [('question', {'index': 0, 'question': 'a'}), ('question', {'index': 1, 'question': 'b'}),
+                      ('done', {'success': True, 'questions': ['a', 'b']})]
+
+
+def test_score_stream_pushes_tokens(client, monkeypatch):
+    """评分：逐片推送 token，done 携带完整反馈；缺少参数返回 400"""
+    _fake_stream(monkeypatch, ['回答清晰。', '评分：8/10'])
+    resp = client.post(f'{BASE}/score/stream', json={'question': 'q', 'answer': 'a'})
+    assert _events(resp) == [('token', {'text': '回答清晰。'}), ('token', {'text': '评分：8/10'}),
+                             ('done', {'success': True, 'feedback': '回答清晰。评分：8/10'})]
+    assert client.post(f'{BASE}/score/stream', json={'question': 'q'}).status_code == 400
+
+
+def test_score_stream_falls_back_on_error(client, monkeypatch):
+    """评分：流式失败时降级到缓冲评分"""
+    def broken(prompt, max_tokens, providers=('gemini',), cache_ttl=None):
+        raise RuntimeError('down')
+        yield  # pragma: no cover
+    monkeypatch.setattr(applications, 'stream_generate', broken)
+    monkeypatch.setattr(applications, 'generate_feedback', lambda q, a, jd: '本地评分：6/10')
+    events = _events(client.post(f'{BASE}/score/stream', json={'question': 'q', 'answer': 'a'}))
+    assert events == [('token', {'text': '本地评分：6/10'}), ('done', {'success': True, 'feedback': '本地评分：6/10'})]
+
+
+def test_stream_endpoints_require_login(client):
+    """未登录返回 401"""
+    with client.session_transaction() as sess:
+        sess.clear()
+    assert client.get(f'{BASE}/start/stream').status_code == 401
+    assert client.post(f'{BASE}/score/stream', json={'question': 'q', 'answer': 'a'}).status_code == 401